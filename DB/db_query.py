@@ -1,18 +1,73 @@
 
 import mysql.connector
 import pandas as pd
+import json
 import os
 from dotenv import load_dotenv
 
 # 환경변수 로드 (현재 파일의 디렉토리에서 .env 찾기)
+# import 시점이 아니라 첫 DatabaseConnection 생성 시 한 번만 로드
 current_dir = os.path.dirname(os.path.abspath(__file__))
 dotenv_path = os.path.join(current_dir, '.env')
-load_dotenv(dotenv_path)
+_env_loaded = False
+
+def load_env():
+    """DB 환경변수(.env) 로드 (프로세스당 한 번)"""
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv(dotenv_path)
+        _env_loaded = True
+
+# final_features 테이블의 피쳐 컬럼 (date 제외, DDL 순서)
+FINAL_FEATURE_COLUMNS = [
+    'construction_bsi_actual_diff', 'housing_sale_price_diff', 'm2_growth_diff',
+    'credit_spread_diff', 'base_rate_diff', 'construction_bsi_mom', 'housing_sale_price_diff_ma3',
+    'm2_growth_lag1', 'base_rate_mdiff_bp', 'credit_spread_diff_ma3', 'construction_bsi_ma3',
+    'leading_index', 'housing_sale_price_diff_lag6', 'construction_bsi_actual_lag3',
+    'construction_bsi_actual_diff_ma3', 'base_rate_diff_ma6', 'term_spread',
+    'construction_bsi_actual_diff_ma6', 'credit_spread_diff_lag1', 'market_rate_treasury_bond_3yr',
+    'credit_spread_diff_ma6', 'base_rate_diff_ma3', 'base_rate_lag1', 'esi',
+    'base_rate_diff_lag3', 'm2_growth_diff_ma6'
+]
+
+# risk_scores 테이블 컬럼 (id/시스템 컬럼 제외, DDL 순서)
+RISK_SCORE_COLUMNS = [
+    'corp_code', 'corp_name', 'year', 'quarter',
+    'flag_score', 'debt_score', 'equity_score', 'roa_score', 'roe_score',
+    'sales_growth_score', 'profit_growth_score', 'net_growth_score',
+    'bsi_score', 'rate_score', 'housing_score', 'm2_score', 'spread_score',
+    'company_size', 'heuristic_score', 'heuristic_label', 'heuristic_label_name', 'source_updated_at',
+    'weights_version'
+]
+RISK_SCORE_KEY = ['corp_code', 'year', 'quarter']
+
+# dart_data 테이블 컬럼 (id/시스템 컬럼 제외, DDL 순서)과 수집 결과(한글 컬럼) → DB 컬럼
+DART_DATA_COLUMNS = [
+    'corp_name', 'corp_code', 'year', 'quarter', 'report_date',
+    'total_assets', 'total_liabilities', 'total_equity', 'revenue', 'operating_profit', 'quarterly_profit'
+]
+DART_DATA_KEY = ['corp_code', 'year', 'quarter']
+DART_DATA_RENAME = {
+    '자산총계': 'total_assets', '부채총계': 'total_liabilities', '자본총계': 'total_equity',
+    '매출액': 'revenue', '영업이익': 'operating_profit', '분기순이익': 'quarterly_profit'
+}
+
+def _to_db_value(value):
+    """numpy/pandas 값 → mysql.connector가 변환 가능한 파이썬 값 (결측은 NULL)"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value.item() if hasattr(value, 'item') else value
 
 class DatabaseConnection:
     """MySQL 데이터베이스 연결 클래스"""
     
+    # 프로세스 공유 연결 풀 (init_pool 호출 시에만 사용, 없으면 매번 새 연결)
+    _pool = None
+    
     def __init__(self):
+        load_env()
         self.config = {
             'host': os.getenv('DB_HOST', 'localhost'),
             'user': os.getenv('DB_USER', 'root'),
@@ -21,10 +76,40 @@ class DatabaseConnection:
             'charset': 'utf8mb4'
         }
         self.connection = None
+        # 이 연결에서 실행한 쿼리 수 (서비스 계측용 DB 왕복 횟수)
+        self.round_trips = 0
+    
+    @classmethod
+    def init_pool(cls, pool_size=5):
+        """
+        연결 풀 생성 (pool_size개의 연결을 미리 열어 둠)
+        이후 connect()는 풀에서 연결을 빌리고 disconnect()는 풀에 반납
+        """
+        if cls._pool is not None:
+            return True
+        if pool_size <= 0:
+            return False
+        
+        from mysql.connector import pooling
+        config = cls().config
+        try:
+            cls._pool = pooling.MySQLConnectionPool(pool_name='ie_project', pool_size=pool_size, **config)
+            print(f"MySQL 연결 풀 생성 (크기: {pool_size})")
+            return True
+        except mysql.connector.Error as e:
+            print(f"MySQL 연결 풀 생성 오류: {e}")
+            return False
     
     def connect(self):
         """데이터베이스 연결"""
         try:
+            if DatabaseConnection._pool is not None:
+                try:
+                    self.connection = DatabaseConnection._pool.get_connection()
+                    return True
+                except mysql.connector.errors.PoolError:
+                    # 풀의 연결이 모두 사용 중이면 일반 연결로 대체
+                    pass
             self.connection = mysql.connector.connect(**self.config)
             print("MySQL 데이터베이스 연결 성공")
             return True
@@ -38,7 +123,30 @@ class DatabaseConnection:
             self.connection.close()
             print("MySQL 연결 해제")
     
-    def execute_query(self, query):
+    def commit(self):
+        """열린 트랜잭션 커밋 (실패 시 롤백 후 False)"""
+        if not self.connection:
+            print("데이터베이스에 연결되지 않았습니다.")
+            return False
+        try:
+            self.connection.commit()
+            return True
+        except mysql.connector.Error as e:
+            self.connection.rollback()
+            print(f"커밋 오류: {e}")
+            return False
+    
+    def _execute(self, cursor, query, params=None):
+        """커서 실행 + 왕복 횟수 집계"""
+        self.round_trips += 1
+        return cursor.execute(query, params)
+    
+    def _executemany(self, cursor, query, rows):
+        """다중 행 실행 (INSERT는 mysql.connector가 한 문장의 multi-row INSERT로 보냄) + 왕복 횟수 집계"""
+        self.round_trips += 1
+        return cursor.executemany(query, rows)
+    
+    def execute_query(self, query, params=None):
         """쿼리 실행"""
         if not self.connection:
             print("데이터베이스에 연결되지 않았습니다.")
@@ -46,7 +154,7 @@ class DatabaseConnection:
         
         try:
             cursor = self.connection.cursor()
-            cursor.execute(query)
+            self._execute(cursor, query, params)
             result = cursor.fetchall()
             columns = [desc[0] for desc in cursor.description]
             cursor.close()
@@ -55,6 +163,47 @@ class DatabaseConnection:
             print(f"쿼리 실행 오류: {e}")
             return None
     
+    def iter_query(self, query, params=None, chunk_size=5000):
+        """쿼리 결과를 chunk_size 행씩 (컬럼명, 행 튜플 리스트)로 순회 (전체 결과를 메모리에 올리지 않음)"""
+        if not self.connection:
+            print("데이터베이스에 연결되지 않았습니다.")
+            return
+        
+        cursor = self.connection.cursor()
+        try:
+            self._execute(cursor, query, params)
+            columns = [desc[0] for desc in cursor.description]
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield columns, rows
+        finally:
+            cursor.close()
+    
+    def iter_final_features(self, columns=None, start_date=None, end_date=None, chunk_size=5000):
+        """
+        final_features를 청크 단위로 조회
+        - columns: 조회할 피쳐 컬럼 (None이면 전체, date는 항상 포함)
+        - start_date/end_date: YYYYMM 범위 필터 (양끝 포함)
+        """
+        columns = FINAL_FEATURE_COLUMNS if columns is None else columns
+        unknown = [col for col in columns if col not in FINAL_FEATURE_COLUMNS]
+        if unknown:
+            raise ValueError(f"알 수 없는 피쳐 컬럼: {unknown}")
+        
+        conditions, params = [], []
+        if start_date:
+            conditions.append("date >= %s")
+            params.append(start_date)
+        if end_date:
+            conditions.append("date <= %s")
+            params.append(end_date)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        query = f"SELECT date, {', '.join(columns)} FROM final_features {where} ORDER BY date"
+        yield from self.iter_query(query, tuple(params), chunk_size)
+    
     def get_ecos_data(self):
         """ECOS 경제지표 데이터 조회 (시스템 컬럼 제외)"""
         query = """
@@ -69,16 +218,76 @@ class DatabaseConnection:
         """
         return self.execute_query(query)
     
-    def get_dart_data(self):
-        """DART 재무데이터 조회 (시스템 컬럼 제외)"""
-        query = """
+    def get_dart_data(self, corp_codes=None):
+        """DART 재무데이터 조회 (시스템 컬럼 제외, corp_codes가 있으면 해당 기업만)"""
+        where, params = "", None
+        if corp_codes is not None:
+            params = tuple(corp_codes)
+            where = f"WHERE corp_code IN ({', '.join(['%s'] * len(params))})"
+        query = f"""
         SELECT corp_name, corp_code, year, quarter, report_date,
                total_assets, total_liabilities, total_equity, revenue,
                operating_profit, quarterly_profit
-        FROM dart_data 
+        FROM dart_data {where}
         ORDER BY corp_name, year, quarter
         """
-        return self.execute_query(query)
+        return self.execute_query(query, params)
+    
+    def get_dart_corp_codes(self):
+        """dart_data의 전체 기업 코드 (기업 청크 단위 조회용, 조회 실패 시 None)"""
+        result = self.execute_query("SELECT DISTINCT corp_code FROM dart_data ORDER BY corp_code")
+        return None if result is None else result['corp_code'].astype(str).tolist()
+    
+    def get_dart_changes(self, since):
+        """
+        since 이후(같은 시각 포함) 수정/추가된 dart_data 행의 키와 수정 시각
+        TIMESTAMP는 초 단위라 워터마크와 같은 초에 나중에 커밋된 행도 포함하도록 >=
+        (이미 반영한 같은 초의 키는 호출하는 쪽에서 제외, incremental_scoring.drop_seen)
+        """
+        query = """
+        SELECT corp_code, year, quarter, updated_at
+        FROM dart_data
+        WHERE updated_at >= %s
+        """
+        return self.execute_query(query, (since,))
+    
+    def get_dart_keys(self, periods):
+        """(year, quarter) 목록에 해당하는 dart_data 행의 키"""
+        conditions = ' OR '.join(['(year = %s AND quarter = %s)'] * len(periods))
+        query = f"SELECT corp_code, year, quarter FROM dart_data WHERE {conditions}"
+        return self.execute_query(query, tuple(value for period in periods for value in period))
+    
+    def get_ecos_changes(self, since):
+        """since 이후(같은 시각 포함, get_dart_changes와 같은 이유) 수정/추가된 ecos_data 월과 수정 시각"""
+        query = "SELECT date, updated_at FROM ecos_data WHERE updated_at >= %s"
+        return self.execute_query(query, (since,))
+    
+    def get_source_watermark(self):
+        """위험점수 입력 테이블(dart_data, ecos_data)의 최종 수정 시각"""
+        result = self.execute_query("""
+        SELECT GREATEST(COALESCE((SELECT MAX(updated_at) FROM dart_data), '1970-01-01'),
+                        COALESCE((SELECT MAX(updated_at) FROM ecos_data), '1970-01-01')) AS watermark
+        """)
+        return None if result is None or result.empty else result.iloc[0, 0]
+    
+    def get_risk_score_watermark(self):
+        """저장된 위험점수에 반영된 입력 데이터의 최종 수정 시각 (저장된 점수가 없으면 None)"""
+        result = self.execute_query("SELECT MAX(source_updated_at) AS watermark FROM risk_scores")
+        if result is None or result.empty or pd.isna(result.iloc[0, 0]):
+            return None
+        return result.iloc[0, 0]
+    
+    def get_risk_scores(self, since=None):
+        """위험점수 조회 (since가 있으면 그 시각 이후(같은 초 포함) 갱신된 행만, TIMESTAMP가 초 단위이므로)"""
+        where, params = "", None
+        if since is not None:
+            where, params = "WHERE updated_at >= %s", (since,)
+        query = f"""
+        SELECT {', '.join(RISK_SCORE_COLUMNS)}, updated_at
+        FROM risk_scores {where}
+        ORDER BY corp_code, year, quarter
+        """
+        return self.execute_query(query, params)
     
     def get_final_features(self):
         """최종 피쳐 데이터 조회 (시스템 컬럼 제외)"""
@@ -123,7 +332,7 @@ class DatabaseConnection:
             
             if 'prediction_quarter' in predictions_df.columns:
                 quarter = predictions_df['prediction_quarter'].iloc[0]
-                cursor.execute(delete_query, (quarter,))
+                self._execute(cursor, delete_query, (quarter,))
             
             # 새 데이터 삽입
             insert_query = """
@@ -146,7 +355,7 @@ class DatabaseConnection:
                     row.get('predicted_operating_profit', 0),
                     row.get('predicted_quarterly_profit', 0)
                 )
-                cursor.execute(insert_query, values)
+                self._execute(cursor, insert_query, values)
             
             self.connection.commit()
             cursor.close()
@@ -170,7 +379,7 @@ class DatabaseConnection:
             # 기존 데이터 삭제 (같은 날짜)
             for _, row in features_df.iterrows():
                 delete_query = "DELETE FROM final_features WHERE date = %s"
-                cursor.execute(delete_query, (row['date'],))
+                self._execute(cursor, delete_query, (row['date'],))
             
             # 새 데이터 삽입
             insert_query = """
@@ -216,7 +425,7 @@ class DatabaseConnection:
                     row.get('base_rate_diff_lag3'),
                     row.get('m2_growth_diff_ma6')
                 )
-                cursor.execute(insert_query, values)
+                self._execute(cursor, insert_query, values)
             
             self.connection.commit()
             cursor.close()
@@ -239,7 +448,7 @@ class DatabaseConnection:
             # 기존 데이터 삭제 (같은 날짜)
             for _, row in predictions_df.iterrows():
                 delete_query = "DELETE FROM model_output WHERE date = %s"
-                cursor.execute(delete_query, (row['date'],))
+                self._execute(cursor, delete_query, (row['date'],))
             
             # 새 데이터 삽입
             insert_query = """
@@ -257,7 +466,7 @@ class DatabaseConnection:
                     row.get('m2_growth'),
                     row.get('credit_spread')
                 )
-                cursor.execute(insert_query, values)
+                self._execute(cursor, insert_query, values)
             
             self.connection.commit()
             cursor.close()
@@ -268,4 +477,153 @@ class DatabaseConnection:
             print(f"모델 예측 결과 저장 오류: {e}")
             return False
     
-
+    def upsert_risk_scores(self, scores_df, chunk_size=1000, commit=True):
+        """
+        위험점수를 risk_scores 테이블에 bulk upsert
+        (corp_code, year, quarter) 유니크 키 기준 INSERT ... ON DUPLICATE KEY UPDATE, chunk_size행당 한 번 왕복
+        commit=False면 커밋하지 않음 (여러 번 호출한 뒤 commit()으로 한 번에 반영, 실패 시 열린 트랜잭션 전체 롤백)
+        """
+        if not self.connection:
+            print("데이터베이스에 연결되지 않았습니다.")
+            return False
+        
+        columns = [col for col in RISK_SCORE_COLUMNS if col in scores_df.columns]
+        updates = ', '.join(f"{col} = VALUES({col})" for col in columns if col not in RISK_SCORE_KEY)
+        insert_query = f"""
+        INSERT INTO risk_scores ({', '.join(columns)})
+        VALUES ({', '.join(['%s'] * len(columns))})
+        ON DUPLICATE KEY UPDATE {updates}
+        """
+        rows = [tuple(_to_db_value(value) for value in row)
+                for row in scores_df[columns].itertuples(index=False, name=None)]
+        
+        try:
+            cursor = self.connection.cursor()
+            for start in range(0, len(rows), chunk_size):
+                self._executemany(cursor, insert_query, rows[start:start + chunk_size])
+            if commit:
+                self.connection.commit()
+            cursor.close()
+            print(f"위험점수 {len(rows)}건 저장{' 완료' if commit else ' (커밋 대기)'}")
+            return True
+            
+        except mysql.connector.Error as e:
+            self.connection.rollback()
+            print(f"위험점수 저장 오류: {e}")
+            return False
+    
+    def save_risk_score_weights(self, version, weights, commit=True):
+        """점수 계산에 쓴 가중치 저장 (같은 version은 한 번만), commit=False면 upsert_risk_scores와 같은 트랜잭션"""
+        if not self.connection:
+            print("데이터베이스에 연결되지 않았습니다.")
+            return False
+        try:
+            cursor = self.connection.cursor()
+            self._execute(cursor, "INSERT IGNORE INTO risk_score_weights (version, weights) VALUES (%s, %s)",
+                          (version, json.dumps({name: float(value) for name, value in weights.items()})))
+            if commit:
+                self.connection.commit()
+            cursor.close()
+            return True
+        except mysql.connector.Error as e:
+            self.connection.rollback()
+            print(f"가중치 저장 오류: {e}")
+            return False
+    
+    def get_risk_score_weights(self):
+        """저장된 가중치 {version: {구성 요소: 가중치}} (조회 실패 시 None)"""
+        result = self.execute_query("SELECT version, weights FROM risk_score_weights")
+        if result is None:
+            return None
+        return {version: json.loads(weights) for version, weights in zip(result['version'], result['weights'])}
+    
+    def merge_dart_data(self, dart_df, chunk_size=5000):
+        """
+        DART 재무데이터를 dart_data에 set 기반으로 병합 (수집 결과 한글 컬럼/압축 패널도 가능)
+        1) 새 데이터를 임시 테이블에 bulk insert (chunk_size행당 왕복 1회)
+        2) (corp_code, year, quarter) 유니크 키로 조인해 신규/값이 바뀐 행만 골라
+           INSERT ... SELECT ... ON DUPLICATE KEY UPDATE 한 문장으로 반영 (같은 값인 행은 updated_at도 그대로)
+        기존 키를 파이썬으로 가져오지 않으므로 비용은 테이블 크기가 아니라 새 데이터/변경분 크기에 비례
+        반환: {'inserted', 'updated', 'unchanged', 'skipped'} 건수 (실패 시 None)
+        """
+        if not self.connection:
+            print("데이터베이스에 연결되지 않았습니다.")
+            return None
+        
+        df = dart_df.rename(columns=DART_DATA_RENAME)
+        missing = [col for col in DART_DATA_COLUMNS if col not in df.columns]
+        if missing:
+            print(f"dart_data 컬럼 누락: {missing}")
+            return None
+        df = df[DART_DATA_COLUMNS].copy()
+        df['corp_name'] = df['corp_name'].astype(str)
+        # CSV로 읽으면 앞자리 0이 빠지므로 8자리로 복원
+        df['corp_code'] = df['corp_code'].astype(str).str.replace(r'\.0$', '', regex=True).str.zfill(8)
+        df['year'] = pd.to_numeric(df['year'], errors='coerce')
+        quarter = df['quarter'].astype(str)
+        df['quarter'] = quarter.where(quarter.str.startswith('Q'), 'Q' + quarter)  # 압축 패널의 1~4 → 'Q1'~'Q4'
+        df['report_date'] = pd.to_datetime(df['report_date'], errors='coerce').dt.date
+        for col in DART_DATA_RENAME.values():
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        # 키/보고서기준일(NOT NULL)이 없는 행 제외, 같은 키는 마지막 행 사용
+        valid = df['year'].notna() & df['report_date'].notna()
+        skipped = int((~valid).sum())
+        df = df[valid].drop_duplicates(DART_DATA_KEY, keep='last')
+        df['year'] = df['year'].astype(int)
+        rows = [tuple(_to_db_value(value) for value in row) for row in df.itertuples(index=False, name=None)]
+        
+        columns = ', '.join(DART_DATA_COLUMNS)
+        join = ' AND '.join(f"d.{col} = s.{col}" for col in DART_DATA_KEY)
+        # NULL도 같은 값으로 비교 (<=>)
+        changed = ' OR '.join(f"NOT (d.{col} <=> s.{col})" for col in DART_DATA_COLUMNS if col not in DART_DATA_KEY)
+        delta = f"""
+        FROM dart_data_stage s
+        LEFT JOIN dart_data d ON {join}
+        WHERE d.id IS NULL OR {changed}
+        """
+        updates = ', '.join(f"{col} = c.{col}" for col in DART_DATA_COLUMNS if col not in DART_DATA_KEY)
+        
+        try:
+            cursor = self.connection.cursor()
+            self._execute(cursor, "DROP TEMPORARY TABLE IF EXISTS dart_data_stage")
+            self._execute(cursor, """
+            CREATE TEMPORARY TABLE dart_data_stage (
+                corp_name VARCHAR(50) NOT NULL,
+                corp_code VARCHAR(8) NOT NULL,
+                year INT NOT NULL,
+                quarter VARCHAR(2) NOT NULL,
+                report_date DATE NOT NULL,
+                total_assets DECIMAL(20, 2),
+                total_liabilities DECIMAL(20, 2),
+                total_equity DECIMAL(20, 2),
+                revenue DECIMAL(20, 2),
+                operating_profit DECIMAL(20, 2),
+                quarterly_profit DECIMAL(20, 2),
+                PRIMARY KEY (corp_code, year, quarter)
+            )
+            """)
+            stage_query = f"INSERT INTO dart_data_stage ({columns}) VALUES ({', '.join(['%s'] * len(DART_DATA_COLUMNS))})"
+            for start in range(0, len(rows), chunk_size):
+                self._executemany(cursor, stage_query, rows[start:start + chunk_size])
+            
+            self._execute(cursor, f"SELECT COUNT(*), COALESCE(SUM(d.id IS NULL), 0) {delta}")
+            n_changed, n_inserted = (int(value) for value in cursor.fetchone())
+            if n_changed:
+                self._execute(cursor, f"""
+                INSERT INTO dart_data ({columns})
+                SELECT {columns} FROM (SELECT s.* {delta}) AS c
+                ON DUPLICATE KEY UPDATE {updates}
+                """)
+            self._execute(cursor, "DROP TEMPORARY TABLE dart_data_stage")
+            self.connection.commit()
+            cursor.close()
+            result = {'inserted': n_inserted, 'updated': n_changed - n_inserted,
+                      'unchanged': len(rows) - n_changed, 'skipped': skipped}
+            print(f"DART 데이터 병합 완료: 신규 {result['inserted']}건, 수정 {result['updated']}건, "
+                  f"변경 없음 {result['unchanged']}건, 제외 {skipped}건")
+            return result
+            
+        except mysql.connector.Error as e:
+            self.connection.rollback()
+            print(f"DART 데이터 병합 오류: {e}")
+            return None
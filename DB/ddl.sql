@@ -79,10 +79,13 @@ operating_profit DECIMAL(20, 2),
 quarterly_profit DECIMAL(20, 2),
 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-UNIQUE KEY unique_corp_period (corp_name, year, quarter),
+-- 병합(db_query.merge_dart_data) 기준 키: 기업명은 사명변경으로 바뀌므로 corp_code로 식별
+UNIQUE KEY unique_corp_period (corp_code, year, quarter),
 INDEX idx_corp_name (corp_name),
 INDEX idx_report_date (report_date)
 );
+-- 기존 DB (corp_name 기준 유니크 키) 전환:
+-- ALTER TABLE dart_data DROP INDEX unique_corp_period, ADD UNIQUE KEY unique_corp_period (corp_code, year, quarter);
 
 -- 3. 학습 전 최종 피쳐 저장 테이블 
 -- 피쳐 엔지니어링 후 최종 피쳐셋 저장 
@@ -139,3 +142,57 @@ CREATE TABLE model_output (
 
 
 
+
+-- 5. 휴리스틱 위험점수 테이블
+-- 데이터 소스: Heuristic/incremental_scoring.py (dart_data + ecos_data 증분 계산, bulk upsert)
+CREATE TABLE risk_scores (
+	id INT AUTO_INCREMENT PRIMARY KEY,
+	-- 기업코드
+	corp_code VARCHAR(8) NOT NULL,
+	-- 기업명
+	corp_name VARCHAR(50) NOT NULL,
+	-- 연도
+	year INT NOT NULL,
+	-- 분기(Q1,Q2,Q3,Q4)
+	quarter VARCHAR(2) NOT NULL,
+	-- 구성 요소 점수 (0~10, flag_score는 위험 플래그 가중합)
+	flag_score DECIMAL(8, 4),
+	debt_score DECIMAL(8, 4),
+	equity_score DECIMAL(8, 4),
+	roa_score DECIMAL(8, 4),
+	roe_score DECIMAL(8, 4),
+	sales_growth_score DECIMAL(8, 4),
+	profit_growth_score DECIMAL(8, 4),
+	net_growth_score DECIMAL(8, 4),
+	bsi_score DECIMAL(8, 4),
+	rate_score DECIMAL(8, 4),
+	housing_score DECIMAL(8, 4),
+	m2_score DECIMAL(8, 4),
+	spread_score DECIMAL(8, 4),
+	-- 기업 규모 (중소기업/중견기업/대기업)
+	company_size VARCHAR(10),
+	-- 휴리스틱 위험점수 (0~100)
+	heuristic_score DECIMAL(8, 4),
+	-- 위험 등급 (0~3)
+	heuristic_label TINYINT,
+	-- 위험 등급명 (안전/주의/위험/매우위험)
+	heuristic_label_name VARCHAR(10),
+	-- 점수 계산에 반영된 입력 데이터(dart_data/ecos_data)의 최종 수정 시각 (증분 계산 워터마크)
+	source_updated_at TIMESTAMP NULL,
+	-- 점수 계산에 쓴 가중치 (risk_score_weights.version, 조회 서비스의 기여도 계산용)
+	weights_version CHAR(16) NULL,
+	created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+	updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+	UNIQUE KEY unique_corp_period (corp_code, year, quarter),
+	INDEX idx_period (year, quarter),
+	INDEX idx_updated_at (updated_at)
+);
+-- 기존 DB 전환:
+-- ALTER TABLE risk_scores ADD COLUMN weights_version CHAR(16) NULL AFTER source_updated_at;
+
+-- 위험점수 가중치 (risk_scores.weights_version → 구성 요소별 가중치 JSON)
+CREATE TABLE risk_score_weights (
+	version CHAR(16) PRIMARY KEY,
+	weights JSON NOT NULL,
+	created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
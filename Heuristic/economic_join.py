@@ -0,0 +1,137 @@
+"""
+월별 경제지표(ecos_data / model_output) → 분기 값 리샘플링과 DART 분기 패널에 붙이는 as-of 조인
+(노트북 입력 dart_with_economic_indicators.csv의 경제지표 컬럼을 재현, integrated_panel.py / incremental_scoring.py에서 사용)
+
+- resample_quarterly: 월 → 분기 (컬럼별 집계 방식 선택, 기본은 분기 마지막 월 값)
+- join_economics: 보고서 기준일(report_date)이 속한 분기(+ offset 분기)의 경제지표를 행 순서 그대로 붙임
+  분기 코드(연도 × 4 + 분기 - 1) 정수 배열의 searchsorted/get_indexer 한 번으로 처리 (merge, groupby 없음)
+  offset=1이면 다음 분기 경제지표로 노트북 Task 1-1의 *_shifted와 같은 구조 (t-1분기 재무 + t분기 경제지표)
+  offset 분기는 정확히 같은 분기만 조회 (as-of로 거슬러 가면 기준 분기 값이 다음 분기 값으로 붙음)
+"""
+
+import os
+import sys
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from risk_flags import QUARTERS
+
+# 분기 코드 (상위 폴더의 dart 디렉토리)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dart'))
+from panel import period_codes
+
+ECONOMIC_COLUMNS = ['construction_bsi_actual', 'base_rate', 'housing_sale_price', 'm2_growth', 'credit_spread']
+# credit_spread 원천 컬럼 (ecos_data, model_output에는 credit_spread가 이미 있음)
+CREDIT_SPREAD_SOURCES = ('market_rate_corporate_bond_3yr_BBB', 'market_rate_corporate_bond_3yr_AA')
+
+# 분기 집계 방식: 'end'는 분기 마지막 월(3/6/9/12월) 행의 값 (없으면 결측),
+# 'first'/'last'는 분기 안에서 결측이 아닌 첫/마지막 월 값, 나머지는 분기 내 월 값 집계
+AGGREGATIONS = ('end', 'first', 'last', 'mean', 'median', 'min', 'max', 'sum')
+
+Aggregation = Union[str, Dict[str, str]]
+
+def monthly_periods(dates: pd.Series) -> pd.DataFrame:
+    """'YYYY-MM-DD' / 'YYYYMM' 날짜 → year, month, period (분기 코드)"""
+    text = dates.astype(str).str.replace('-', '', regex=False)
+    year = pd.to_numeric(text.str[:4], errors='coerce').to_numpy()
+    month = pd.to_numeric(text.str[4:6], errors='coerce').to_numpy()
+    if np.isnan(year).any() or np.isnan(month).any():
+        raise ValueError(f"알 수 없는 날짜 형식: {sorted(set(dates[np.isnan(year) | np.isnan(month)].astype(str)))[:5]}")
+    year, month = year.astype(np.int64), month.astype(np.int64)
+    return pd.DataFrame({'year': year, 'month': month, 'period': year * 4 + (month - 1) // 3}, index=dates.index)
+
+def _aggregations(agg: Aggregation, columns: Sequence[str]) -> Dict[str, str]:
+    aggs = {column: agg for column in columns} if isinstance(agg, str) else {column: agg.get(column, 'end')
+                                                                              for column in columns}
+    unknown = sorted(set(aggs.values()) - set(AGGREGATIONS))
+    if unknown:
+        raise ValueError(f"알 수 없는 집계 방식: {unknown} (가능: {', '.join(AGGREGATIONS)})")
+    return aggs
+
+def resample_quarterly(monthly: pd.DataFrame, agg: Aggregation = 'end',
+                       columns: Optional[Sequence[str]] = None, date_col: str = 'date') -> pd.DataFrame:
+    """
+    월별 지표 → 분기 지표 (year, quarter 'Qn', period, 지표 컬럼, period 오름차순)
+    agg: 전체 컬럼 공통 집계 방식 또는 {컬럼: 방식} (지정하지 않은 컬럼은 'end')
+    columns: 생략 시 ECONOMIC_COLUMNS, credit_spread가 없으면 회사채 BBB - AA로 계산
+    모든 컬럼이 'end'면 분기 마지막 월 행이 있는 분기만, 아니면 한 달이라도 있는 분기 모두 반환
+    """
+    columns = list(ECONOMIC_COLUMNS if columns is None else columns)
+    aggs = _aggregations(agg, columns)
+    df = pd.concat([monthly_periods(monthly[date_col]),
+                    monthly[[column for column in columns if column in monthly.columns]]
+                    .apply(pd.to_numeric, errors='coerce').astype(np.float64)], axis=1)
+    if 'credit_spread' in columns and 'credit_spread' not in monthly.columns:
+        bbb, aa = (pd.to_numeric(monthly[column], errors='coerce').astype(np.float64)
+                   for column in CREDIT_SPREAD_SOURCES)
+        df['credit_spread'] = bbb - aa
+    df = df.sort_values(['year', 'month'], kind='stable')
+
+    end = df[df['month'] % 3 == 0].drop_duplicates('period', keep='last').set_index('period')
+    if all(how == 'end' for how in aggs.values()):
+        periods = end.index
+    else:
+        periods = pd.Index(np.unique(df['period'].to_numpy()), name='period')
+    grouped = df.groupby('period')
+    out = pd.DataFrame(index=periods)
+    for column, how in aggs.items():
+        values = end[column] if how == 'end' else grouped[column].agg(how)
+        out[column] = values.reindex(periods).to_numpy(dtype=np.float64)
+
+    period = periods.to_numpy(dtype=np.int64)
+    out.insert(0, 'period', period)
+    out.insert(0, 'quarter', np.asarray(QUARTERS)[period % 4])
+    out.insert(0, 'year', period // 4)
+    return out.reset_index(drop=True)
+
+def report_periods(panel: pd.DataFrame, on: str = 'report_date') -> np.ndarray:
+    """
+    패널 행의 기준 분기 코드: on 날짜가 속한 분기 (on='period'이거나 날짜가 없으면 year/quarter)
+    """
+    period = period_codes(panel['year'], panel['quarter'])
+    if on == 'period' or on not in panel.columns:
+        return period
+    dates = pd.to_datetime(panel[on], errors='coerce')
+    valid = dates.notna().to_numpy()
+    if valid.any():
+        period = period.copy()
+        period[valid] = (dates[valid].dt.year.to_numpy(dtype=np.int64) * 4
+                         + (dates[valid].dt.month.to_numpy(dtype=np.int64) - 1) // 3)
+    return period
+
+def join_economics(panel: pd.DataFrame, economics: pd.DataFrame, columns: Optional[Sequence[str]] = None,
+                   on: str = 'report_date', offset: int = 0, asof: bool = True,
+                   tolerance: Optional[int] = None, suffix: str = '') -> pd.DataFrame:
+    """
+    패널(행 순서 유지)에 분기 경제지표를 붙인 복사본 (컬럼명 = 지표 + suffix, float32)
+    economics: resample_quarterly 결과
+    on: 기준 분기를 정할 날짜 컬럼 ('period'면 year/quarter 그대로)
+    offset: 기준 분기에서 몇 분기 뒤의 경제지표를 쓸지 (1: 다음 분기, -1: 직전 분기)
+            0이 아니면 그 분기 값이 있을 때만 붙임 (asof/tolerance는 offset=0에만 적용)
+    asof: 해당 분기 값이 없으면 그 이전 가장 최근 분기 값 사용 (False면 정확히 같은 분기만)
+    tolerance: asof일 때 허용하는 최대 분기 차이 (None이면 제한 없음)
+    """
+    columns = [column for column in (ECONOMIC_COLUMNS if columns is None else columns) if column in economics]
+    economics = economics.sort_values('period', kind='stable')
+    periods = economics['period'].to_numpy(dtype=np.int64)
+    if len(np.unique(periods)) != len(periods):
+        raise ValueError("economics의 분기(period)가 중복됩니다")
+    target = report_periods(panel, on) + offset
+
+    if asof and offset == 0:
+        position = np.searchsorted(periods, target, side='right') - 1
+        matched = position >= 0
+        if tolerance is not None and len(periods):
+            matched &= target - periods[np.maximum(position, 0)] <= tolerance
+        position = np.where(matched, position, -1)
+    else:
+        position = pd.Index(periods).get_indexer(target)
+
+    df = panel.copy()
+    for column in columns:
+        # 마지막 원소 NaN: 위치 -1(매칭 없음)이 NaN을 가리키도록
+        values = np.append(economics[column].to_numpy(dtype=np.float64), np.nan)
+        df[f'{column}{suffix}'] = values[position].astype(np.float32)
+    return df
@@ -0,0 +1,490 @@
+"""
+분기 위험점수 증분 계산 (dart_data / ecos_data → risk_scores 테이블)
+새 dart_data 분기나 ecos_data 월이 들어오면 영향받는 (기업, 분기) 행만 다시 계산해 bulk upsert
+
+영향 범위:
+- dart_data 행 변경 (기업 c, 위치 p): 같은 기업의 p-1 ~ p+ROLLING_TAIL
+  (p-1은 다음 분기 경제지표 시프트, p 이후는 성장률(전분기 대비)과 윈도우 플래그가 p를 포함하는 구간)
+- ecos_data 월 변경 (분기 Q): 다음 행이 Q인 행 (t-1분기 재무 + t분기 경제지표 구조, 노트북 Task 1-1)
+- 상대평가 순위는 마지막 전체 재계산 시점의 기준 분포(ReferenceDistribution) 대비로 계산해
+  새 분기가 들어와도 이미 저장된 점수의 척도가 바뀌지 않음 (전체 재계산 시 기준 분포 갱신)
+
+기업 청크 처리:
+- 기업 간 의존은 상대평가 순위(기준 분포)뿐이므로 전체 재계산은 기업 chunk_size개씩 두 번 순회
+  (1차: 기준 분포 원본 값만 수집, 2차: 청크별 패널 구성/점수 계산/upsert), 메모리는 청크 크기로 제한
+- 패널은 압축 dtype (dart/panel.py의 compact_panel: corp_code category, year/quarter int16,
+  재무 금액과 파생 비율 float32)
+
+사용법:
+    python incremental_scoring.py              # 마지막 실행 이후 변경분만 계산/저장
+    python incremental_scoring.py --rebuild    # 전체 재계산 + 기준 분포 갱신
+    python incremental_scoring.py --benchmark --scales 1 10 100   # 현재 패널 크기 배수별 청크 처리 벤치마크
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from economic_join import ECONOMIC_COLUMNS, resample_quarterly
+from risk_flags import QUARTERS, ROLLING_FLAGS, PanelIndex, compute_flags, flag_score, quarter_codes
+from risk_score import COMPONENTS, DEFAULT_WEIGHTS, ReferenceDistribution, score_frame, weights_version
+
+# 패널 스키마/압축 dtype (상위 폴더의 dart 디렉토리)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dart'))
+from panel import AMOUNT_DTYPE, compact_panel, panel_memory, period_codes, quarter_labels
+
+DEFAULT_REFERENCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'risk_reference.npz')
+# 청크당 기업 수 (기업당 약 40분기)
+DEFAULT_CHUNK_SIZE = 500
+
+# dart_data 컬럼 → 노트북 컬럼명 (전처리 노트북 매핑)
+DART_COLUMNS = {
+    'total_assets': '자산총계',
+    'total_liabilities': '부채총계',
+    'total_equity': '자본총계',
+    'revenue': '매출액',
+    'operating_profit': '영업이익',
+    'quarterly_profit': '분기순이익',
+}
+# 성장률 컬럼 → 원천 컬럼 (전분기 대비)
+GROWTH_SOURCES = {
+    '매출액성장률': '매출액',
+    '영업이익성장률': '영업이익',
+    '순이익성장률': '분기순이익',
+}
+
+# 한 행의 변경이 점수에 영향을 주는 뒤쪽 행 수: 윈도우 길이 - 1 (+1 성장률 컬럼은 다음 분기 성장률도 바뀜)
+ROLLING_TAIL = max(flag.window - 1 + (flag.column in GROWTH_SOURCES) for flag in ROLLING_FLAGS)
+
+# risk_scores 테이블 저장 컬럼 (DDL 순서)
+SCORE_COLUMNS = ['corp_code', 'corp_name', 'year', 'quarter'] + COMPONENTS + [
+    'company_size', 'heuristic_score', 'heuristic_label', 'heuristic_label_name'
+]
+
+def derive_financials(dart: pd.DataFrame, amount_dtype=AMOUNT_DTYPE) -> pd.DataFrame:
+    """
+    dart_data 행 → 노트북 재무비율 (기업/연도/분기 정렬, 성장률은 같은 기업의 전분기 대비)
+    압축 dtype 패널, quarter는 'Q1'~'Q4' Categorical (비율 계산은 float64, 저장은 float32)
+    amount_dtype: 재무 금액 dtype (점수 계산용 메모리 패널은 float32, CSV/파일로 내보낼 패널은 STORAGE_AMOUNT_DTYPE)
+    """
+    df = compact_panel(dart.rename(columns=DART_COLUMNS), amount_dtype=amount_dtype)
+    panel = PanelIndex.from_frame(df, 'corp_code')
+    df = df.iloc[panel.order].reset_index(drop=True)
+    df['quarter'] = quarter_labels(df['quarter'])
+    first = panel.position == 0
+    amounts = {column: df[column].to_numpy(dtype=np.float64) for column in DART_COLUMNS.values()}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = {
+            '부채비율': amounts['부채총계'] / amounts['자본총계'] * 100,
+            '자기자본비율': amounts['자본총계'] / amounts['자산총계'] * 100,
+            'ROA': amounts['분기순이익'] / amounts['자산총계'] * 100,
+            'ROE': np.where(amounts['자본총계'] != 0, amounts['분기순이익'] / amounts['자본총계'] * 100, np.nan),
+        }
+        for rate, source in GROWTH_SOURCES.items():
+            values = amounts[source]
+            previous = np.concatenate([[np.nan], values[:-1]])
+            previous[first] = np.nan
+            ratios[rate] = (values / previous - 1) * 100
+    for column, values in ratios.items():
+        df[column] = values.astype(np.float32)
+    return df
+
+def quarterly_economics(ecos: pd.DataFrame) -> pd.DataFrame:
+    """ecos_data 월별 값 → 분기 값 (분기 마지막 월, 보고서 기준일과 같은 시점), credit_spread = BBB - AA"""
+    return resample_quarterly(ecos, 'end')
+
+def build_panel(dart: pd.DataFrame, ecos: Optional[pd.DataFrame] = None,
+                economics: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    dart_with_economic_indicators.csv + 노트북 Task 1-1과 같은 패널
+    (재무비율, 기업별로 다음 행의 경제지표를 붙인 *_shifted 컬럼, 기업/연도/분기 정렬)
+    economics: quarterly_economics(ecos) 결과 (청크마다 다시 계산하지 않도록 미리 계산해 전달 가능)
+    """
+    economics = quarterly_economics(ecos) if economics is None else economics
+    df = derive_financials(dart)
+    period = period_codes(df['year'], df['quarter'])
+    # 분기 코드로 경제지표 행 위치 조회 (merge 없이 행 순서 유지)
+    position = pd.Index(economics['period']).get_indexer(period)
+    codes = df['corp_code'].cat.codes.to_numpy()
+    last = np.r_[codes[1:] != codes[:-1], True]
+    next_position = np.append(position[1:], -1)
+    next_position[last] = -1
+    for column in ECONOMIC_COLUMNS:
+        values = np.append(economics[column].to_numpy(dtype=np.float64), np.nan)
+        df[f'{column}_shifted'] = values[next_position].astype(np.float32)
+    return df
+
+def affected_rows(panel: pd.DataFrame, changed_keys: Optional[pd.DataFrame] = None,
+                  changed_periods: Iterable = ()) -> np.ndarray:
+    """
+    다시 계산해야 하는 panel 행 마스크 (panel은 build_panel 결과, 기업/연도/분기 정렬)
+    changed_keys: 변경된 dart_data 행 (corp_code, year, quarter)
+    changed_periods: 변경된 ecos 분기 (year, 'Qn') 목록
+    """
+    n = len(panel)
+    corp = panel['corp_code'].astype(str).to_numpy()
+    period = panel['year'].to_numpy(dtype=np.int64) * 4 + quarter_codes(panel['quarter'])
+    same_corp_next = np.r_[corp[1:] == corp[:-1], False]
+    # 변경 행 위치에 +1, 영향 구간 끝 다음 위치에 -1 → 누적합 > 0 인 행이 영향 범위
+    delta = np.zeros(n + 1, dtype=np.int64)
+
+    if changed_keys is not None and len(changed_keys):
+        keys = pd.MultiIndex.from_arrays([corp, period])
+        changed = pd.MultiIndex.from_arrays([
+            changed_keys['corp_code'].astype(str).to_numpy(),
+            changed_keys['year'].to_numpy(dtype=np.int64) * 4 + quarter_codes(changed_keys['quarter']),
+        ])
+        hit = np.flatnonzero(keys.isin(changed))
+        # 구간을 기업 경계에서 자르기 위해 행별 기업 끝 위치
+        boundary = np.flatnonzero(~same_corp_next)
+        corp_end = boundary[np.searchsorted(boundary, np.arange(n))] + 1
+        start = np.where(np.r_[False, same_corp_next[:-1]][hit], hit - 1, hit)
+        stop = np.minimum(hit + ROLLING_TAIL + 1, corp_end[hit])
+        np.add.at(delta, start, 1)
+        np.add.at(delta, stop, -1)
+
+    mask = np.cumsum(delta[:-1]) > 0
+    periods = [year * 4 + quarter_codes([quarter])[0] for year, quarter in changed_periods]
+    if periods:
+        next_period = np.append(period[1:], -1)
+        mask |= same_corp_next & np.isin(next_period, periods)
+    return mask
+
+def score_panel(panel: pd.DataFrame, reference: ReferenceDistribution, rows: Optional[np.ndarray] = None,
+                weights: Optional[Dict[str, float]] = None, thresholds: Optional[Sequence[float]] = None,
+                params: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    panel 전체로 플래그(윈도우)를 계산한 뒤 rows 행만 기준 분포 대비 점수 계산
+    반환: SCORE_COLUMNS 컬럼의 DataFrame
+    """
+    panel = panel.copy()
+    panel['flag_score'] = flag_score(compute_flags(panel, corp_col='corp_code'))
+    target = panel if rows is None else panel[rows]
+    scores = score_frame(target, weights, thresholds, params, reference=reference)
+    scores[['corp_code', 'corp_name', 'year', 'quarter']] = target[['corp_code', 'corp_name', 'year', 'quarter']]
+    return scores[SCORE_COLUMNS].reset_index(drop=True)
+
+def company_chunks(corp_codes: Sequence[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[str]]:
+    corp_codes = list(corp_codes)
+    for start in range(0, len(corp_codes), chunk_size):
+        yield corp_codes[start:start + chunk_size]
+
+def reference_from_chunks(load_dart: Callable[[List[str]], pd.DataFrame], corp_codes: Sequence[str],
+                          economics: pd.DataFrame, chunk_size: int = DEFAULT_CHUNK_SIZE) -> ReferenceDistribution:
+    """
+    기업 청크별 패널에서 기준 분포 원본 값 컬럼만 모아 기준 분포 생성 (전체 패널을 한 번에 만들지 않음)
+    load_dart: 기업 코드 목록 → 해당 기업의 dart_data 행
+    """
+    columns = ReferenceDistribution.source_columns()
+    parts = []
+    for chunk in company_chunks(corp_codes, chunk_size):
+        panel = build_panel(load_dart(chunk), economics=economics)
+        parts.append(panel[[column for column in columns if column in panel.columns]])
+    return ReferenceDistribution.from_frames(parts)
+
+def iter_chunk_scores(load_dart: Callable[[List[str]], pd.DataFrame], corp_codes: Sequence[str],
+                      economics: pd.DataFrame, reference: ReferenceDistribution,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE, weights: Optional[Dict[str, float]] = None,
+                      thresholds: Optional[Sequence[float]] = None,
+                      params: Optional[Dict] = None) -> Iterator[pd.DataFrame]:
+    """기업 청크별 점수 (SCORE_COLUMNS), 플래그/성장률/경제지표 시프트는 기업 안에서만 계산되므로 청크 결과가 전체 결과와 같음"""
+    for chunk in company_chunks(corp_codes, chunk_size):
+        panel = build_panel(load_dart(chunk), economics=economics)
+        yield score_panel(panel, reference, None, weights, thresholds, params)
+
+# 변경 키 컬럼 (워터마크와 같은 초에 반영한 키 기록용)
+DART_KEY = ('corp_code', 'year', 'quarter')
+ECOS_KEY = ('date',)
+
+def change_keys(changes: pd.DataFrame, columns: Sequence[str], at=None) -> List[Tuple[str, ...]]:
+    """변경 행의 키 (문자열 튜플), at이 있으면 updated_at이 그 시각인 행만"""
+    if at is not None:
+        changes = changes[(pd.to_datetime(changes['updated_at']) == pd.Timestamp(at)).to_numpy()]
+    return list(zip(*(changes[column].astype(str) for column in columns)))
+
+def drop_seen(changes: pd.DataFrame, columns: Sequence[str], since, seen: Set[Tuple[str, ...]]) -> pd.DataFrame:
+    """updated_at이 since와 같고 이미 반영한 키(seen)인 행 제외 (>= 조회에서 이전 실행이 처리한 같은 초의 행)"""
+    if not seen or changes.empty:
+        return changes
+    at = (pd.to_datetime(changes['updated_at']) == pd.Timestamp(since)).to_numpy()
+    done = np.fromiter((key in seen for key in change_keys(changes, columns)), dtype=bool, count=len(changes))
+    return changes[~(at & done)]
+
+class IncrementalRiskScorer:
+    """
+    risk_scores 테이블 증분 갱신 (db: DB/db_query.py의 DatabaseConnection, 연결된 상태)
+    워터마크는 저장된 점수의 입력 데이터 최종 수정 시각(source_updated_at) 최댓값
+    워터마크와 같은 초의 변경은 >=로 다시 조회되므로 그 초에 반영한 키를 seen_path(기준 분포 옆 JSON)에 기록해 제외
+    (적재 배치 하나가 같은 updated_at을 가지므로, 기록이 없으면 변경이 없어도 매번 그 배치를 다시 계산)
+    """
+
+    def __init__(self, db, reference_path: str = DEFAULT_REFERENCE_PATH,
+                 weights: Optional[Dict[str, float]] = None, thresholds: Optional[Sequence[float]] = None,
+                 params: Optional[Dict] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.db = db
+        self.reference_path = reference_path
+        self.weights = weights
+        self.thresholds = thresholds
+        self.params = params
+        self.chunk_size = chunk_size
+        self.seen_path = f"{os.path.splitext(reference_path)[0]}_seen.json"
+
+    def _load_seen(self, since) -> Tuple[Set[Tuple[str, ...]], Set[Tuple[str, ...]]]:
+        """since와 같은 초에 이미 반영한 (dart_data 키, ecos_data 월), 기록이 없거나 다른 워터마크의 기록이면 빈 집합"""
+        if not os.path.exists(self.seen_path):
+            return set(), set()
+        with open(self.seen_path, encoding='utf-8') as f:
+            seen = json.load(f)
+        if pd.Timestamp(seen['watermark']) != pd.Timestamp(since):
+            return set(), set()
+        return {tuple(key) for key in seen['dart']}, {tuple(key) for key in seen['ecos']}
+
+    def _save_seen(self, watermark, dart_keys: Iterable[Tuple[str, ...]], ecos_keys: Iterable[Tuple[str, ...]]):
+        """커밋 후 기록 (기록 전에 중단되면 다음 실행이 같은 초의 행을 다시 계산할 뿐)"""
+        tmp_path = f"{self.seen_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'watermark': str(pd.Timestamp(watermark)), 'dart': sorted(set(dart_keys)),
+                       'ecos': sorted(set(ecos_keys))}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.seen_path)
+
+    def _changes(self, since) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        dart_changes = self.db.get_dart_changes(since)
+        if dart_changes is None:
+            raise RuntimeError("dart_data 변경 조회 실패")
+        ecos_changes = self.db.get_ecos_changes(since)
+        if ecos_changes is None:
+            raise RuntimeError("ecos_data 변경 조회 실패")
+        return dart_changes, ecos_changes
+
+    def _score(self, panel, reference, rows=None):
+        return score_panel(panel, reference, rows, self.weights, self.thresholds, self.params)
+
+    def _load_dart(self, corp_codes):
+        return self.db.get_dart_data(corp_codes=corp_codes)
+
+    def _save_weights(self) -> str:
+        """이번 실행의 가중치를 점수와 같은 트랜잭션으로 저장, 반환: weights_version (조회 서비스의 기여도 계산용)"""
+        weights = self.weights or DEFAULT_WEIGHTS
+        version = weights_version(weights)
+        if not self.db.save_risk_score_weights(version, weights, commit=False):
+            raise RuntimeError("risk_score_weights 저장 실패")
+        return version
+
+    def _upsert(self, scores):
+        """청크 점수 저장 (커밋은 _commit에서 한 번), 실패하면 열린 트랜잭션 전체가 롤백되므로 실행 중단"""
+        if not self.db.upsert_risk_scores(scores, commit=False):
+            raise RuntimeError("risk_scores 저장 실패: 이번 실행의 점수는 모두 롤백됨 (워터마크 그대로)")
+
+    def _commit(self):
+        # 모든 청크가 성공한 뒤에만 커밋해 일부 청크만 반영된 채 워터마크(MAX(source_updated_at))가 앞서가지 않게 함
+        if not self.db.commit():
+            raise RuntimeError("risk_scores 커밋 실패: 이번 실행의 점수는 모두 롤백됨 (워터마크 그대로)")
+
+    def rebuild(self) -> int:
+        """전체 재계산: 기업 청크별로 기준 분포 수집 → 저장 → 청크별 점수 계산/upsert"""
+        watermark = self.db.get_source_watermark()
+        if watermark is None:
+            raise RuntimeError("입력 데이터 워터마크 조회 실패")
+        # 워터마크 초의 행은 아래 로드에 포함되므로 다음 증분 계산에서 제외하도록 키 기록
+        dart_at, ecos_at = self._changes(watermark)
+        corp_codes = self.db.get_dart_corp_codes()
+        if corp_codes is None:
+            raise RuntimeError("dart_data 기업 코드 조회 실패")
+        economics = quarterly_economics(self.db.get_ecos_data())
+        reference = reference_from_chunks(self._load_dart, corp_codes, economics, self.chunk_size)
+        version = self._save_weights()
+        total = 0
+        for scores in iter_chunk_scores(self._load_dart, corp_codes, economics, reference, self.chunk_size,
+                                        self.weights, self.thresholds, self.params):
+            scores['source_updated_at'] = watermark
+            scores['weights_version'] = version
+            self._upsert(scores)
+            total += len(scores)
+        self._commit()
+        # 점수가 모두 커밋된 뒤 기준 분포 교체 (저장 실패 시 이전 점수와 이전 기준 분포가 그대로 짝을 이룸)
+        reference.save(self.reference_path)
+        self._save_seen(watermark, change_keys(dart_at, DART_KEY, watermark),
+                        change_keys(ecos_at, ECOS_KEY, watermark))
+        print(f"위험점수 전체 재계산: 기업 {len(corp_codes)}개, {total}행 (기준 분포 저장: {self.reference_path})")
+        return total
+
+    def update(self) -> int:
+        """마지막 실행 이후 변경된 dart_data/ecos_data의 영향 행만 재계산"""
+        since = self.db.get_risk_score_watermark()
+        if since is None or not os.path.exists(self.reference_path):
+            return self.rebuild()
+
+        dart_changes, ecos_changes = self._changes(since)
+        seen_dart, seen_ecos = self._load_seen(since)
+        dart_changes = drop_seen(dart_changes, DART_KEY, since, seen_dart)
+        ecos_changes = drop_seen(ecos_changes, ECOS_KEY, since, seen_ecos)
+        if dart_changes.empty and ecos_changes.empty:
+            print("변경된 입력 데이터 없음")
+            return 0
+
+        months = ecos_changes['date'].astype(str).str.replace('-', '', regex=False)
+        periods = sorted({(int(date[:4]), QUARTERS[(int(date[4:6]) - 1) // 3]) for date in months})
+        period_keys = self.db.get_dart_keys(periods) if periods else dart_changes.iloc[:0]
+        if period_keys is None:
+            raise RuntimeError("dart_data 키 조회 실패")
+        corp_codes = sorted(set(dart_changes['corp_code']) | set(period_keys['corp_code']))
+        if not corp_codes:
+            return 0
+
+        reference = ReferenceDistribution.load(self.reference_path)
+        economics = quarterly_economics(self.db.get_ecos_data())
+        watermark = max(pd.concat([dart_changes['updated_at'], ecos_changes['updated_at']]))
+        version = self._save_weights()
+        total = loaded = 0
+        # 경제지표 변경은 거의 모든 기업에 영향 → 기업 청크 단위로 로드/계산/저장
+        for chunk in company_chunks(corp_codes, self.chunk_size):
+            panel = build_panel(self._load_dart(chunk), economics=economics)
+            scores = self._score(panel, reference, affected_rows(panel, dart_changes, periods))
+            if scores.empty:
+                continue
+            scores['source_updated_at'] = watermark
+            scores['weights_version'] = version
+            self._upsert(scores)
+            total += len(scores)
+            loaded += len(panel)
+        self._commit()
+        dart_keys = change_keys(dart_changes, DART_KEY, watermark)
+        ecos_keys = change_keys(ecos_changes, ECOS_KEY, watermark)
+        if pd.Timestamp(watermark) == pd.Timestamp(since):
+            # 워터마크가 그대로면 이전 실행이 그 초에 반영한 키도 유지
+            dart_keys, ecos_keys = dart_keys + list(seen_dart), ecos_keys + list(seen_ecos)
+        self._save_seen(watermark, dart_keys, ecos_keys)
+        print(f"위험점수 증분 계산: 기업 {len(corp_codes)}개, {total}행 / 로드 {loaded}행")
+        return total
+
+# 현재 패널 크기: 건설업 32개 기업 × 2015 Q4 ~ 2025 Q2 (39분기)
+BASE_CORPS, BASE_QUARTERS = 32, 39
+
+def synthetic_dart(n_corps: int = BASE_CORPS, n_quarters: int = BASE_QUARTERS, seed: int = 0) -> pd.DataFrame:
+    """dart_data 조회 결과와 같은 컬럼/dtype의 합성 패널 (기업마다 시작 분기가 다르고 일부 결측, 단위 억원)"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(max(1, n_quarters // 2), n_quarters + 1, size=n_corps)
+    codes = np.asarray([f'{i:08d}' for i in range(n_corps)])
+    corp = np.repeat(np.arange(n_corps), lengths)
+    period = np.concatenate([np.arange(n_quarters - length, n_quarters) for length in lengths]) + 2015 * 4 + 3
+    n = len(corp)
+    assets = np.abs(rng.normal(2e4, 3e4, n)) + 100
+    equity = rng.normal(5e3, 4e3, n)
+    df = pd.DataFrame({
+        'corp_name': np.char.add('기업', codes[corp]),
+        'corp_code': codes[corp],
+        'year': period // 4,
+        'quarter': np.asarray(QUARTERS)[period % 4],
+        'report_date': None,
+        'total_assets': assets.round(2),
+        'total_liabilities': (assets - equity).round(2),
+        'total_equity': equity.round(2),
+        'revenue': rng.normal(1e3, 5e2, n).round(2),
+        'operating_profit': rng.normal(50, 100, n).round(2),
+        'quarterly_profit': rng.normal(30, 100, n).round(2),
+    })
+    df.loc[rng.random(n) < 0.03, 'revenue'] = np.nan
+    return df
+
+def synthetic_ecos(start: str = '2015-01', n_months: int = 132, seed: int = 0) -> pd.DataFrame:
+    """ecos_data 조회 결과 중 위험점수에 쓰는 컬럼만 가진 합성 월별 데이터"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'date': pd.period_range(start, periods=n_months, freq='M').strftime('%Y%m')})
+    for column in ['construction_bsi_actual', 'base_rate', 'housing_sale_price', 'm2_growth',
+                   'market_rate_corporate_bond_3yr_BBB', 'market_rate_corporate_bond_3yr_AA']:
+        df[column] = rng.normal(10, 3, n_months).round(2)
+    return df
+
+def _measure(func):
+    """(반환값, 소요 시간 초, 추적된 최대 할당 바이트), 시간은 tracemalloc 없이 따로 측정"""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def benchmark(scales: Sequence[int], chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    현재 패널 크기 배수별 전체 재계산: 한 번에(전체 패널) vs 기업 청크 2회 순회
+    청크 방식은 rebuild처럼 청크 점수를 바로 내보내고(upsert 대신 점수 열만 보관) 결과 일치와 최대 메모리 비교
+    """
+    ecos = synthetic_ecos()
+    economics = quarterly_economics(ecos)
+    key = ['corp_code', 'year', 'quarter']
+    mb = 1024 ** 2
+    print(f"기준 패널: 기업 {BASE_CORPS}개 × {BASE_QUARTERS}분기, 청크 {chunk_size}개 기업")
+    print(f"{'배수':>4} {'기업':>7} {'행':>9} {'원본 MB':>8} {'압축 MB':>8} | {'전체 s':>7} {'최대 MB':>8} | "
+          f"{'청크 s':>7} {'최대 MB':>8} | 최대 차이")
+    # numba 컴파일 등 첫 호출 비용 제외
+    build_panel(synthetic_dart(4, 8), economics=economics)
+    score_panel(build_panel(synthetic_dart(4, 8), economics=economics),
+                ReferenceDistribution.from_frame(build_panel(synthetic_dart(4, 8), economics=economics)))
+    for scale in scales:
+        dart = synthetic_dart(BASE_CORPS * scale, BASE_QUARTERS, seed=scale)
+        rows_by_corp = dart.groupby('corp_code').indices
+        corp_codes = sorted(rows_by_corp)
+
+        def load_dart(codes):
+            # DB의 get_dart_data(corp_codes=...) 대신 (청크 기업 행만 복사)
+            return dart.take(np.concatenate([rows_by_corp[code] for code in codes]))
+
+        def single_pass():
+            panel = build_panel(dart, economics=economics)
+            scores = score_panel(panel, ReferenceDistribution.from_frame(panel))
+            return scores[key + ['heuristic_score', 'heuristic_label']]
+
+        def chunked():
+            reference = reference_from_chunks(load_dart, corp_codes, economics, chunk_size)
+            return pd.concat([scores[key + ['heuristic_score', 'heuristic_label']] for scores in
+                              iter_chunk_scores(load_dart, corp_codes, economics, reference, chunk_size)],
+                             ignore_index=True)
+
+        expected, single_time, single_peak = _measure(single_pass)
+        result, chunk_time, chunk_peak = _measure(chunked)
+        expected = expected.astype({'corp_code': str}).sort_values(key).reset_index(drop=True)
+        result = result.astype({'corp_code': str}).sort_values(key).reset_index(drop=True)
+        diff = np.abs(expected['heuristic_score'].to_numpy() - result['heuristic_score'].to_numpy()).max()
+        same_labels = (expected['heuristic_label'].to_numpy() == result['heuristic_label'].to_numpy()).all()
+        print(f"{scale:>3}x {len(corp_codes):>7,} {len(dart):>9,} {panel_memory(dart) / mb:>8.1f} "
+              f"{panel_memory(compact_panel(dart)) / mb:>8.1f} | {single_time:>7.2f} {single_peak / mb:>8.1f} | "
+              f"{chunk_time:>7.2f} {chunk_peak / mb:>8.1f} | {diff:.1e}{'' if same_labels else ' (등급 불일치)'}")
+
+def main():
+    parser = argparse.ArgumentParser(description="분기 위험점수 증분 계산 (risk_scores 테이블)")
+    parser.add_argument('--rebuild', action='store_true', help="전체 재계산 + 기준 분포 갱신")
+    parser.add_argument('--reference', default=DEFAULT_REFERENCE_PATH, help="기준 분포 파일 경로")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="청크당 기업 수")
+    parser.add_argument('--benchmark', action='store_true', help="합성 패널로 청크 처리 벤치마크 (DB 불필요)")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100], help="현재 패널 크기 배수")
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark(args.scales, args.chunk_size)
+        return
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DB'))
+    from db_query import DatabaseConnection
+
+    db = DatabaseConnection()
+    if not db.connect():
+        sys.exit(1)
+    try:
+        start = time.perf_counter()
+        scorer = IncrementalRiskScorer(db, reference_path=args.reference, chunk_size=args.chunk_size)
+        scorer.rebuild() if args.rebuild else scorer.update()
+        print(f"소요 시간: {time.perf_counter() - start:.2f}s, DB 왕복: {db.round_trips}회")
+    finally:
+        db.disconnect()
+
+if __name__ == "__main__":
+    main()
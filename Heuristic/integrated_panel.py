@@ -0,0 +1,265 @@
+"""
+DART 분기 재무 + 분기 경제지표 통합 패널 (dart_with_economic_indicators.csv를 한 단계로 재현)
+dart_data → 재무비율(derive_financials) → 경제지표 as-of 조인(economic_join.py) 결과를 로컬 parquet에 저장하고
+마지막 실행 이후 바뀐 입력만 반영해 갱신
+
+캐시 디렉토리 (기본 Heuristic/integrated_panel/):
+- panel.parquet: 통합 패널 (압축 dtype, 재무 금액은 원 단위가 정확한 float64, 기업/연도/분기 정렬)
+- economics.parquet: 조인에 쓴 분기 경제지표 (resample_quarterly 결과)
+- meta.json: 워터마크(입력 테이블 최종 수정 시각)와 그 초에 반영한 dart_data 키, 경제지표 원천/집계/조인 설정
+
+증분 갱신:
+- dart_data: 워터마크 이후(같은 초 포함) 바뀐 기업만 다시 로드해 재무비율을 만들고 해당 기업 행을 교체
+  (성장률이 기업 안에서만 계산되므로 다른 기업 행은 그대로), 워터마크 초에 이미 반영한 키는 제외
+  dart_data에서 삭제된 기업은 패널에서도 삭제
+- 경제지표: 월별 원천은 수백 행이라 매번 다시 읽어 분기 값을 만들고, 저장된 값이나 설정과 다르면
+  전체 행에 다시 조인 (조인은 분기 코드 배열 연산 한 번), 같으면 새로 만든 기업 행에만 조인
+
+사용법:
+    python integrated_panel.py                         # 변경분만 반영 (캐시가 없으면 전체 생성)
+    python integrated_panel.py --rebuild               # 전체 다시 생성
+    python integrated_panel.py --source model_output --agg mean --offset 1
+    python integrated_panel.py --csv dart_with_economic_indicators.csv   # 노트북 입력 CSV로 내보내기
+    python integrated_panel.py --check                 # 합성 패널로 시차 조인 = 노트북 shift(-1) 확인 (DB 불필요)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from economic_join import AGGREGATIONS, ECONOMIC_COLUMNS, join_economics, resample_quarterly
+from incremental_scoring import DART_KEY, change_keys, derive_financials, drop_seen, synthetic_dart, synthetic_ecos
+
+# 패널 스키마/압축 dtype (상위 폴더의 dart 디렉토리)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dart'))
+from panel import STORAGE_AMOUNT_DTYPE, quarter_numbers
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'integrated_panel')
+# 경제지표 원천 테이블 (model_output에는 credit_spread 컬럼이 있음)
+SOURCES = ('ecos_data', 'model_output')
+
+def sort_panel(df: pd.DataFrame) -> pd.DataFrame:
+    """기업 코드/연도/분기 순 정렬, corp_code/corp_name은 합친 뒤 범주를 다시 만듦"""
+    df = df.astype({column: str for column in ('corp_code', 'corp_name') if column in df.columns})
+    order = np.lexsort((quarter_numbers(df['quarter']), df['year'].to_numpy(), df['corp_code'].to_numpy()))
+    df = df.iloc[order].reset_index(drop=True)
+    return df.astype({column: 'category' for column in ('corp_code', 'corp_name') if column in df.columns})
+
+class IntegratedPanel:
+    """
+    통합 패널 캐시 (db: DB/db_query.py의 DatabaseConnection, 연결된 상태)
+    source/agg/on/offset/asof/tolerance는 economic_join.resample_quarterly / join_economics 인자
+    """
+
+    def __init__(self, db, cache_dir: str = DEFAULT_CACHE_DIR, source: str = 'ecos_data',
+                 agg: Union[str, Dict[str, str]] = 'end', on: str = 'report_date', offset: int = 0,
+                 asof: bool = True, tolerance: Optional[int] = None):
+        if source not in SOURCES:
+            raise ValueError(f"알 수 없는 경제지표 원천: {source} (가능: {', '.join(SOURCES)})")
+        self.db = db
+        self.cache_dir = cache_dir
+        self.source = source
+        self.agg = agg
+        self.on = on
+        self.offset = offset
+        self.asof = asof
+        self.tolerance = tolerance
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    def config(self) -> dict:
+        return {'source': self.source, 'agg': self.agg, 'on': self.on, 'offset': self.offset,
+                'asof': self.asof, 'tolerance': self.tolerance}
+
+    def load_meta(self) -> Optional[dict]:
+        path = self._path('meta.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def load(self, columns=None) -> pd.DataFrame:
+        """저장된 통합 패널 (없으면 FileNotFoundError)"""
+        return pd.read_parquet(self._path('panel.parquet'), columns=columns)
+
+    def economics(self) -> pd.DataFrame:
+        """원천 테이블 월별 값 → 분기 경제지표"""
+        monthly = self.db.get_ecos_data() if self.source == 'ecos_data' else self.db.get_model_output()
+        if monthly is None:
+            raise RuntimeError(f"{self.source} 조회 실패")
+        return resample_quarterly(monthly, self.agg)
+
+    def _join(self, financials: pd.DataFrame, economics: pd.DataFrame) -> pd.DataFrame:
+        return join_economics(financials, economics, on=self.on, offset=self.offset, asof=self.asof,
+                              tolerance=self.tolerance)
+
+    def _financials(self, corp_codes=None) -> pd.DataFrame:
+        # 패널은 CSV로 내보내므로 금액은 float64 (float32는 원 단위 금액의 하위 자리가 바뀜)
+        dart = self.db.get_dart_data(corp_codes=corp_codes)
+        if dart is None:
+            raise RuntimeError("dart_data 조회 실패")
+        return derive_financials(dart, amount_dtype=STORAGE_AMOUNT_DTYPE)
+
+    def _changes(self, since) -> pd.DataFrame:
+        changes = self.db.get_dart_changes(since)
+        if changes is None:
+            raise RuntimeError("dart_data 변경 조회 실패")
+        return changes
+
+    def _watermark(self):
+        watermark = self.db.get_source_watermark()
+        if watermark is None:
+            raise RuntimeError("입력 데이터 워터마크 조회 실패")
+        return watermark
+
+    def _save(self, panel: pd.DataFrame, economics: pd.DataFrame, watermark, seen) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # 패널/경제지표를 먼저 쓰고 meta를 마지막에 교체 (중간에 중단되면 다음 실행이 이전 워터마크부터 다시 반영)
+        for name, df in (('panel.parquet', panel), ('economics.parquet', economics)):
+            tmp_path = self._path(f"{name}.tmp")
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, self._path(name))
+        # seen: 워터마크와 같은 초에 반영한 (corp_code, year, quarter) (다음 갱신의 >= 조회에서 제외)
+        meta = dict(self.config(), watermark=None if watermark is None else str(watermark),
+                    seen=sorted(set(seen)), amount_dtype=np.dtype(STORAGE_AMOUNT_DTYPE).name, rows=len(panel),
+                    built_at=time.time())
+        tmp_path = self._path('meta.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path('meta.json'))
+
+    def rebuild(self) -> pd.DataFrame:
+        """전체 생성: dart_data 전체 로드 → 재무비율 → 경제지표 조인 → 저장"""
+        # 워터마크를 먼저 읽어야 로드 도중 바뀐 행을 다음 갱신에서 다시 반영
+        watermark = self._watermark()
+        # 워터마크 초의 행은 아래 로드에 포함되므로 다음 갱신에서 제외하도록 키 기록
+        seen = change_keys(self._changes(watermark), DART_KEY, watermark)
+        economics = self.economics()
+        panel = sort_panel(self._join(self._financials(), economics))
+        self._save(panel, economics, watermark, seen)
+        print(f"통합 패널 생성: {len(panel):,}행, 기업 {panel['corp_code'].nunique():,}개 ({self.cache_dir})")
+        return panel
+
+    def refresh(self) -> pd.DataFrame:
+        """마지막 실행 이후 바뀐 dart_data 기업과 경제지표만 반영 (캐시가 없으면 전체 생성)"""
+        meta = self.load_meta()
+        if meta is None or meta.get('watermark') is None or not os.path.exists(self._path('panel.parquet')):
+            return self.rebuild()
+        if meta.get('amount_dtype') != np.dtype(STORAGE_AMOUNT_DTYPE).name:
+            # 금액을 float32로 저장한 이전 캐시는 값이 이미 바뀌어 있으므로 다시 생성
+            print("이전 캐시의 재무 금액이 float32라 전체 다시 생성")
+            return self.rebuild()
+
+        since = meta['watermark']
+        watermark = self._watermark()
+        # >= 조회라 이전 실행이 워터마크 초에 반영한 키는 제외 (적재 배치 하나가 같은 updated_at을 가짐)
+        previous = [tuple(key) for key in meta.get('seen', [])]
+        changes = drop_seen(self._changes(since), DART_KEY, since, set(previous))
+        current = self.db.get_dart_corp_codes()
+        if current is None:
+            raise RuntimeError("dart_data 기업 코드 조회 실패")
+        deleted = sorted(set(self.load(columns=['corp_code'])['corp_code'].astype(str)) - set(current))
+        economics = self.economics()
+        cached_economics = pd.read_parquet(self._path('economics.parquet'))
+        same_config = {key: meta.get(key) for key in self.config()} == self.config()
+        economics_changed = not same_config or not economics.equals(cached_economics)
+        corp_codes = sorted(set(changes['corp_code'].astype(str)))
+        if not corp_codes and not deleted and not economics_changed:
+            print("변경된 입력 데이터 없음")
+            return self.load()
+
+        panel = self.load()
+        if deleted:
+            panel = panel[~panel['corp_code'].astype(str).isin(deleted)]
+        if corp_codes:
+            fresh = self._financials(corp_codes)
+            if not economics_changed:
+                fresh = self._join(fresh, economics)
+            kept = panel[~panel['corp_code'].astype(str).isin(corp_codes)]
+            panel = pd.concat([kept, fresh[[column for column in panel.columns if column in fresh.columns]]],
+                              ignore_index=True)
+        if economics_changed:
+            panel = self._join(panel.drop(columns=[c for c in ECONOMIC_COLUMNS if c in panel.columns]), economics)
+        panel = sort_panel(panel)
+        seen = change_keys(changes, DART_KEY, watermark)
+        if pd.Timestamp(watermark) == pd.Timestamp(since):
+            seen += previous
+        self._save(panel, economics, watermark, seen)
+        print(f"통합 패널 갱신: 기업 {len(corp_codes)}개 교체, {len(deleted)}개 삭제, "
+              f"경제지표 {'다시 조인' if economics_changed else '변경 없음'}, 전체 {len(panel):,}행")
+        return panel
+
+def export_csv(panel: pd.DataFrame, path: str) -> str:
+    """노트북 입력 형식 CSV (quarter 'Q1'~'Q4', 경제지표는 시프트 전 값, 시프트는 노트북 Task 1-1에서)"""
+    df = panel.copy()
+    for column in ('corp_code', 'corp_name', 'quarter'):
+        if column in df.columns:
+            df[column] = df[column].astype(str)
+    df.to_csv(path, index=False)
+    return path
+
+def check_offset_join(n_corps: int = 32, n_quarters: int = 39) -> int:
+    """
+    합성 패널에서 join_economics(offset=1)과 노트북 Task 1-1 방식(offset=0 조인 후 기업별 shift(-1)) 비교
+    경제지표는 패널 마지막 분기까지만 만들어 기업 마지막 분기(다음 분기 지표 없음)가 결측인지도 확인
+    반환: 값이 다른 행 수
+    """
+    dart = synthetic_dart(n_corps, n_quarters)
+    # synthetic_dart의 마지막 분기(2015 Q4 + n_quarters - 1)까지의 월 수
+    economics = resample_quarterly(synthetic_ecos(n_months=(2015 * 4 + 3 + n_quarters) * 3 - 2015 * 12))
+    financials = derive_financials(dart)
+    shifted = IntegratedPanel(None, offset=1)._join(financials, economics)
+    expected = IntegratedPanel(None)._join(financials, economics)
+    expected[ECONOMIC_COLUMNS] = expected.groupby('corp_code', observed=True)[ECONOMIC_COLUMNS].shift(-1)
+    last = ~financials['corp_code'].duplicated(keep='last').to_numpy()
+    mismatch = 0
+    for column in ECONOMIC_COLUMNS:
+        left, right = shifted[column].to_numpy(), expected[column].to_numpy()
+        mismatch += int((~((left == right) | (np.isnan(left) & np.isnan(right)))).sum())
+    filled_last = int(shifted.loc[last, ECONOMIC_COLUMNS].notna().any(axis=1).sum())
+    print(f"시차 조인 확인: {len(financials):,}행, 기업 {n_corps}개 | shift(-1)과 다른 값 {mismatch}개, "
+          f"다음 분기 지표 없이 값이 채워진 마지막 분기 {filled_last}개")
+    return mismatch + filled_last
+
+def main():
+    parser = argparse.ArgumentParser(description="DART + 경제지표 통합 패널 생성/증분 갱신")
+    parser.add_argument('--rebuild', action='store_true', help="캐시를 무시하고 전체 다시 생성")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="통합 패널 캐시 디렉토리")
+    parser.add_argument('--source', choices=SOURCES, default='ecos_data', help="경제지표 원천 테이블")
+    parser.add_argument('--agg', choices=AGGREGATIONS, default='end', help="월 → 분기 집계 방식")
+    parser.add_argument('--on', default='report_date', help="기준 분기 컬럼 (report_date 또는 period)")
+    parser.add_argument('--offset', type=int, default=0, help="기준 분기 대비 경제지표 분기 (1: 다음 분기)")
+    parser.add_argument('--exact', action='store_true', help="as-of 대신 같은 분기만 조인")
+    parser.add_argument('--tolerance', type=int, default=None, help="as-of 최대 분기 차이")
+    parser.add_argument('--csv', default=None, help="통합 패널을 노트북 입력 CSV로 내보낼 경로")
+    parser.add_argument('--check', action='store_true', help="합성 패널로 시차 조인 확인 (DB 불필요)")
+    args = parser.parse_args()
+    if args.check:
+        sys.exit(1 if check_offset_join() else 0)
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DB'))
+    from db_query import DatabaseConnection
+
+    db = DatabaseConnection()
+    if not db.connect():
+        sys.exit(1)
+    try:
+        start = time.perf_counter()
+        store = IntegratedPanel(db, args.cache_dir, source=args.source, agg=args.agg, on=args.on,
+                                offset=args.offset, asof=not args.exact, tolerance=args.tolerance)
+        panel = store.rebuild() if args.rebuild else store.refresh()
+        if args.csv:
+            print(f"CSV 저장: {export_csv(panel, args.csv)}")
+        print(f"소요 시간: {time.perf_counter() - start:.2f}s, DB 왕복: {db.round_trips}회")
+    finally:
+        db.disconnect()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+휴리스틱 모델 위험 플래그 계산 (노트북 Task 2)
+기업별 groupby + transform(lambda ... rolling) 대신 (기업, 연도, 분기)로 한 번만 정렬하고
+그룹 경계를 구해 모든 윈도우 플래그를 연속 배열 위에서 한 번에 계산
+
+- 임계값 플래그: 컬럼 값 비교 (완전자본잠식, 고부채비율, ROA악화, 자기자본부족, 매출급감)
+- 윈도우 플래그: 기업별 최근 window분기 중 음수인 분기 수 (연속매출감소, 영업손실연속, 영업이익성장률악화)
+  노트북의 (s < 0).rolling(window, min_periods).sum() 규칙과 같음 (관측 수가 min_periods 미만이면 플래그 0)
+- 윈도우 합은 누적합 차이로 계산 (numpy), numba가 설치되어 있으면 행 단위 jit 커널 사용 가능
+
+사용법:
+    from risk_flags import RISK_FLAGS, add_risk_flags
+    df = add_risk_flags(df)                          # 플래그 컬럼 + flag_score 추가
+    python risk_flags.py --benchmark --corps 2000    # 합성 패널로 노트북 방식과 속도/결과 비교
+"""
+
+import argparse
+import importlib.util
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+QUARTERS = ['Q1', 'Q2', 'Q3', 'Q4']
+
+@dataclass(frozen=True)
+class ThresholdFlag:
+    """column op value 이면 1 (결측은 0)"""
+    name: str
+    column: str
+    op: str
+    value: float
+
+@dataclass(frozen=True)
+class RollingFlag:
+    """
+    기업별 최근 window분기 중 column < 0 인 분기 수를 count와 비교 (op: 'ge' 또는 'eq')
+    그룹 내 관측 수가 min_periods 미만인 행은 0
+    """
+    name: str
+    column: str
+    window: int
+    min_periods: int
+    op: str
+    count: int
+
+THRESHOLD_FLAGS = [
+    ThresholdFlag('완전자본잠식', '자본총계', 'lt', 0),
+    ThresholdFlag('고부채비율', '부채비율', 'ge', 200),
+    ThresholdFlag('ROA악화', 'ROA', 'lt', -5),
+    ThresholdFlag('자기자본부족', '자기자본비율', 'lt', 20),
+    ThresholdFlag('매출급감', '매출액성장률', 'lt', -30),
+]
+
+ROLLING_FLAGS = [
+    RollingFlag('연속매출감소', '매출액성장률', window=3, min_periods=2, op='ge', count=2),
+    # 노트북 기준 그대로 유지: 최근 4분기 중 영업손실이 정확히 2분기
+    RollingFlag('영업손실연속', '영업이익', window=4, min_periods=3, op='eq', count=2),
+    RollingFlag('영업이익성장률악화', '영업이익성장률', window=3, min_periods=2, op='ge', count=2),
+]
+
+# 노트북 risk_flags 순서
+RISK_FLAGS = ['완전자본잠식', '연속매출감소', '고부채비율', '영업손실연속',
+              'ROA악화', '자기자본부족', '매출급감', '영업이익성장률악화']
+
+# 플래그 기반 점수 가중치 (노트북 Task 3)
+RISK_WEIGHTS = {
+    '완전자본잠식': 10, 'ROA악화': 6, '영업손실연속': 5, '고부채비율': 4,
+    '연속매출감소': 3, '자기자본부족': 3, '매출급감': 2, '영업이익성장률악화': 1
+}
+
+_COMPARE = {
+    'lt': np.less,
+    'le': np.less_equal,
+    'gt': np.greater,
+    'ge': np.greater_equal,
+    'eq': np.equal,
+}
+
+def quarter_codes(quarter) -> np.ndarray:
+    """'Q1'~'Q4' 문자열, 순서형 Categorical, 정수 분기를 0~3 코드로"""
+    quarter = pd.Series(quarter)
+    if isinstance(quarter.dtype, pd.CategoricalDtype):
+        quarter = quarter.astype(str)
+    if pd.api.types.is_numeric_dtype(quarter):
+        return quarter.to_numpy(dtype=np.int64) - 1
+    codes = pd.Categorical(quarter, categories=QUARTERS).codes.astype(np.int64)
+    if (codes < 0).any():
+        raise ValueError(f"알 수 없는 분기 값: {sorted(set(quarter[codes < 0]))}")
+    return codes
+
+@dataclass
+class PanelIndex:
+    """
+    (기업, 연도, 분기) 정렬 결과
+    order: 원래 행 → 정렬 위치 순서 (df.iloc[order]가 정렬된 패널)
+    group_start: 정렬된 각 행이 속한 기업 구간의 시작 위치
+    """
+    order: np.ndarray
+    group_start: np.ndarray
+
+    @property
+    def position(self) -> np.ndarray:
+        """기업 구간 안에서의 위치 (0부터)"""
+        return np.arange(len(self.order)) - self.group_start
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, corp_col: str = 'corp_name') -> 'PanelIndex':
+        corp = pd.factorize(df[corp_col], sort=True)[0]
+        year = df['year'].to_numpy(dtype=np.int64)
+        quarter = quarter_codes(df['quarter'])
+        # lexsort는 마지막 키가 1순위
+        order = np.lexsort((quarter, year, corp))
+        corp_sorted = corp[order]
+        boundary = np.empty(len(order), dtype=bool)
+        boundary[:1] = True
+        boundary[1:] = corp_sorted[1:] != corp_sorted[:-1]
+        group_start = np.maximum.accumulate(np.where(boundary, np.arange(len(order)), 0))
+        return cls(order=order, group_start=group_start)
+
+def rolling_counts_numpy(indicators: np.ndarray, group_start: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """
+    (n, F) 0/1 지표의 그룹별 윈도우 합 (n, F)
+    누적합 C에서 합 = C[i + 1] - C[max(i - window + 1, group_start)]
+    """
+    n = len(indicators)
+    cumsum = np.zeros((n + 1, indicators.shape[1]), dtype=np.int32)
+    np.cumsum(indicators, axis=0, out=cumsum[1:])
+    rows = np.arange(n)
+    lower = np.maximum(rows[:, None] - windows[None, :] + 1, group_start[:, None])
+    return cumsum[rows + 1] - np.take_along_axis(cumsum, lower, axis=0)
+
+if NUMBA_AVAILABLE:
+    import numba
+
+    @numba.njit(cache=True)
+    def _rolling_counts_kernel(indicators, group_start, windows, out):
+        n, n_flags = indicators.shape
+        for i in range(n):
+            for f in range(n_flags):
+                lower = max(i - windows[f] + 1, group_start[i])
+                total = 0
+                for j in range(lower, i + 1):
+                    total += indicators[j, f]
+                out[i, f] = total
+
+def rolling_counts_numba(indicators: np.ndarray, group_start: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    out = np.empty(indicators.shape, dtype=np.int32)
+    _rolling_counts_kernel(np.ascontiguousarray(indicators), group_start.astype(np.int64),
+                           windows.astype(np.int64), out)
+    return out
+
+def rolling_counts(indicators: np.ndarray, group_start: np.ndarray, windows: Sequence[int],
+                   engine: str = 'auto') -> np.ndarray:
+    """engine: 'numpy', 'numba', 'auto' (numba 설치 시 numba)"""
+    windows = np.asarray(windows, dtype=np.int64)
+    if engine == 'auto':
+        engine = 'numba' if NUMBA_AVAILABLE else 'numpy'
+    if engine == 'numba':
+        if not NUMBA_AVAILABLE:
+            raise ImportError("numba가 설치되어 있지 않습니다. engine='numpy'를 사용하세요.")
+        return rolling_counts_numba(indicators, group_start, windows)
+    if engine != 'numpy':
+        raise ValueError(f"알 수 없는 engine: {engine}")
+    return rolling_counts_numpy(indicators, group_start, windows)
+
+def _numeric(df: pd.DataFrame, column: str, order: Optional[np.ndarray] = None) -> np.ndarray:
+    values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)
+    return values if order is None else values[order]
+
+def compute_flags(df: pd.DataFrame, corp_col: str = 'corp_name', engine: str = 'auto',
+                  threshold_flags: Sequence[ThresholdFlag] = THRESHOLD_FLAGS,
+                  rolling_flags: Sequence[RollingFlag] = ROLLING_FLAGS,
+                  panel: Optional[PanelIndex] = None) -> pd.DataFrame:
+    """
+    df와 같은 인덱스/행 순서의 플래그 DataFrame (int 0/1)
+    df는 정렬되어 있지 않아도 되며, 필요한 컬럼: corp_col, year, quarter, 각 플래그의 column
+    """
+    flags = {}
+    with np.errstate(invalid='ignore'):
+        for flag in threshold_flags:
+            flags[flag.name] = _COMPARE[flag.op](_numeric(df, flag.column), flag.value).astype(np.int64)
+
+        if rolling_flags:
+            panel = panel or PanelIndex.from_frame(df, corp_col)
+            # 정렬된 순서의 (n, F) 음수 지표 → 한 번에 윈도우 합
+            indicators = np.column_stack([
+                _numeric(df, flag.column, panel.order) < 0 for flag in rolling_flags
+            ]).astype(np.int32)
+            counts = rolling_counts(indicators, panel.group_start, [flag.window for flag in rolling_flags], engine)
+            observed = np.minimum(panel.position[:, None] + 1, [flag.window for flag in rolling_flags])
+            for f, flag in enumerate(rolling_flags):
+                hit = _COMPARE[flag.op](counts[:, f], flag.count) & (observed[:, f] >= flag.min_periods)
+                values = np.empty(len(df), dtype=np.int64)
+                values[panel.order] = hit
+                flags[flag.name] = values
+
+    ordered = [name for name in RISK_FLAGS if name in flags] + [name for name in flags if name not in RISK_FLAGS]
+    return pd.DataFrame({name: flags[name] for name in ordered}, index=df.index)
+
+def flag_score(flags: pd.DataFrame, weights: Optional[dict] = None) -> pd.Series:
+    """플래그 가중합 (노트북 Task 3의 flag_score)"""
+    weights = weights or RISK_WEIGHTS
+    columns = list(flags.columns)
+    return pd.Series(flags.to_numpy() @ np.array([weights.get(name, 1) for name in columns]),
+                     index=flags.index, name='flag_score')
+
+def add_risk_flags(df: pd.DataFrame, corp_col: str = 'corp_name', engine: str = 'auto') -> pd.DataFrame:
+    """플래그 컬럼과 flag_score를 추가한 복사본"""
+    flags = compute_flags(df, corp_col=corp_col, engine=engine)
+    result = df.copy()
+    result[flags.columns] = flags
+    result['flag_score'] = flag_score(flags)
+    return result
+
+def notebook_flags(df: pd.DataFrame) -> pd.DataFrame:
+    """노트북 Task 2의 groupby + transform(lambda) 방식 (비교/검증용, df는 기업/연도/분기 정렬 상태)"""
+    g = df.groupby('corp_name', group_keys=False)
+    out = pd.DataFrame(index=df.index)
+    out['완전자본잠식'] = (df['자본총계'] < 0).astype(int)
+    out['연속매출감소'] = g['매출액성장률'].transform(
+        lambda s: (s < 0).astype('int8').rolling(3, min_periods=2).sum()
+    ).ge(2).astype(int)
+    out['고부채비율'] = (df['부채비율'] >= 200).astype(int)
+    out['영업손실연속'] = g['영업이익'].transform(
+        lambda s: (s < 0).astype('int8').rolling(4, min_periods=3).sum()
+    ).eq(2).astype(int)
+    out['ROA악화'] = (df['ROA'] < -5).astype(int)
+    out['자기자본부족'] = (df['자기자본비율'] < 20).astype(int)
+    out['매출급감'] = (df['매출액성장률'] < -30).astype(int)
+    out['영업이익성장률악화'] = g['영업이익성장률'].transform(
+        lambda s: (s < 0).astype('int8').rolling(3, min_periods=2).sum()
+    ).ge(2).astype(int)
+    return out
+
+def synthetic_panel(n_corps: int = 32, n_quarters: int = 40, seed: int = 0,
+                    missing_rate: float = 0.05) -> pd.DataFrame:
+    """플래그 입력 컬럼만 가진 합성 기업-분기 패널 (기업마다 분기 수가 다르고 일부 결측)"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(max(1, n_quarters // 2), n_quarters + 1, size=n_corps)
+    corp = np.repeat([f'corp{i:05d}' for i in range(n_corps)], lengths)
+    period = np.concatenate([np.arange(n_quarters - length, n_quarters) for length in lengths])
+    n = len(corp)
+    df = pd.DataFrame({
+        'corp_name': corp,
+        'year': 2015 + period // 4,
+        'quarter': np.asarray(QUARTERS)[period % 4],
+        '자본총계': rng.normal(5e11, 3e11, n),
+        '부채비율': rng.gamma(2.0, 90.0, n),
+        'ROA': rng.normal(1.0, 4.0, n),
+        '자기자본비율': rng.uniform(5, 70, n),
+        '매출액성장률': rng.normal(2.0, 20.0, n),
+        '영업이익': rng.normal(1e10, 2e10, n),
+        '영업이익성장률': rng.normal(0.0, 60.0, n),
+    })
+    for column in ['매출액성장률', '영업이익', '영업이익성장률', '부채비율']:
+        df.loc[rng.random(n) < missing_rate, column] = np.nan
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description="위험 플래그 계산 벤치마크 (노트북 groupby 방식 대비)")
+    parser.add_argument('--benchmark', action='store_true', help="합성 패널로 속도/결과 비교")
+    parser.add_argument('--corps', type=int, default=2000, help="합성 기업 수")
+    parser.add_argument('--quarters', type=int, default=40, help="기업당 최대 분기 수")
+    args = parser.parse_args()
+    if not args.benchmark:
+        parser.print_help()
+        return
+
+    df = synthetic_panel(args.corps, args.quarters)
+    # 노트북 방식은 정렬된 입력 필요, 새 방식은 섞인 입력에서도 같은 결과여야 함
+    sorted_df = df.sort_values(['corp_name', 'year', 'quarter']).reset_index(drop=True)
+    shuffled = sorted_df.sample(frac=1.0, random_state=0)
+    print(f"패널: 기업 {args.corps}개, {len(df)}행")
+
+    start = time.perf_counter()
+    expected = notebook_flags(sorted_df)
+    print(f"노트북 방식 (groupby + lambda): {(time.perf_counter() - start) * 1000:9.2f} ms")
+
+    engines = ['numpy'] + (['numba'] if NUMBA_AVAILABLE else [])
+    for engine in engines:
+        compute_flags(shuffled.head(100), engine=engine)
+        start = time.perf_counter()
+        result = compute_flags(shuffled, engine=engine)
+        elapsed = time.perf_counter() - start
+        same = result.loc[sorted_df.index, expected.columns].equals(expected)
+        print(f"그룹 윈도우 엔진 ({engine:5s}):        {elapsed * 1000:9.2f} ms, 결과 일치: {same}")
+
+if __name__ == "__main__":
+    main()
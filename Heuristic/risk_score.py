@@ -0,0 +1,348 @@
+"""
+휴리스틱 위험점수 계산 (노트북 Task 3)
+구성 요소 점수(플래그, 재무비율 상대평가, 경제지표 상대평가) → 가중합(0~100) → 4단계 등급
+
+- calculate_relative_score: 노트북과 같은 백분위 순위 점수 (0~10, NaN은 평균 점수)
+- ClippedRank: 원본 값의 순위를 한 번만 계산해 두고, clip(lo, hi) 후 순위를 닫힌 식으로 계산
+  (clip으로 같은 값이 된 구간은 평균 순위, 나머지 값의 순위는 변하지 않음 → 시행마다 rank를 다시 할 필요 없음)
+- ComponentMatrix: 가중치와 무관한 구성 요소 점수를 (행 × 구성요소) 행렬로 한 번 계산,
+  가중치 벡터 여러 개의 점수를 한 번의 행렬곱으로 계산 (weight_optimizer.py에서 사용)
+- ReferenceDistribution: 전체 재계산 시점의 기준 분포 대비 상대평가 (새 분기만 증분 계산, incremental_scoring.py)
+  기준 분포는 원본 값만 필요하므로 기업 청크별 패널에서 해당 컬럼만 모아 만들 수 있음 (from_frames)
+- score_frame: 노트북 Task 3과 같은 결과 컬럼 (구성 요소 점수, heuristic_score, heuristic_label)
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from risk_flags import RISK_FLAGS, compute_flags, flag_score
+
+# 가중치 순서 (노트북 heuristic_weights 키 순서)
+COMPONENTS = [
+    'flag_score', 'debt_score', 'equity_score', 'roa_score', 'roe_score',
+    'sales_growth_score', 'profit_growth_score', 'net_growth_score',
+    'bsi_score', 'rate_score', 'housing_score', 'm2_score', 'spread_score'
+]
+FINANCIAL_COMPONENTS = COMPONENTS[:8]
+ECONOMIC_COMPONENTS = COMPONENTS[8:]
+
+# 노트북 Task 3 가중치 (Task 2-5 최적화 결과, 합계 1.0)
+DEFAULT_WEIGHTS = {
+    'flag_score': 0.2186109861479083,
+    'debt_score': 0.1648061922791684,
+    'equity_score': 0.10414970442972746,
+    'roa_score': 0.11648413996507813,
+    'roe_score': 0.021853072053031684,
+    'sales_growth_score': 0.021850754599170102,
+    'profit_growth_score': 0.011247643146463301,
+    'net_growth_score': 0.04764726435349774,
+    'bsi_score': 0.0852446010382579,
+    'rate_score': 0.07489427827801784,
+    'housing_score': 0.008840592674468344,
+    'm2_score': 0.06666660872979094,
+    'spread_score': 0.05770416230541982,
+}
+DEFAULT_THRESHOLDS = [20.308477766956905, 35.454749016213015, 56.419157844870185]
+# 노트북 Task 3의 전처리 값
+DEFAULT_PARAMS = {
+    'debt_clip_max': 500,
+    'roa_clip_min': -50,
+    'roa_clip_max': 50,
+    'large_company_debt_weight': 0.5,
+    'medium_company_debt_weight': 0.75,
+}
+LABEL_NAMES = {0: '안전', 1: '주의', 2: '위험', 3: '매우위험'}
+
+# 상대평가 구성 요소: (컬럼, clip 범위, reverse)  reverse=True면 값이 클수록 점수가 높음(위험)
+RELATIVE_COMPONENTS = {
+    'equity_score': ('자기자본비율', (0, 100), False),
+    'roe_score': ('ROE', (-100, 100), False),
+    'sales_growth_score': ('매출액성장률', (-100, 200), False),
+    'profit_growth_score': ('영업이익성장률', (-200, 500), False),
+    'net_growth_score': ('순이익성장률', (-500, 1000), False),
+}
+# 경제지표 구성 요소: 결측을 중앙값으로 채운 뒤 상대평가
+ECONOMIC_SOURCES = {
+    'bsi_score': ('construction_bsi_actual_shifted', False),
+    'rate_score': ('base_rate_shifted', True),
+    'housing_score': ('housing_sale_price_shifted', False),
+    'm2_score': ('m2_growth_shifted', False),
+    'spread_score': ('credit_spread_shifted', True),
+}
+# 기업 규모 (자산총계 기준): 1조 미만 중소기업, 1조~10조 중견기업, 10조 이상 대기업
+SIZE_BINS = [1e12, 1e13]
+SIZE_NAMES = ['중소기업', '중견기업', '대기업']
+
+def calculate_relative_score(series, reverse=False):
+    """노트북의 상대평가 점수 (백분위 순위 × 10, reverse=False면 1 - 백분위)"""
+    pr = pd.Series(series).rank(pct=True)
+    score = pr * 10 if reverse else (1 - pr) * 10
+    return score.fillna(score.mean())
+
+def _to_float(values) -> np.ndarray:
+    return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64)
+
+class ClippedRank:
+    """
+    clip(lo, hi) 후 상대평가 점수를 lo/hi 배치에 대해 계산
+    - lo 이하 값 c_lo개는 모두 lo가 되어 평균 순위 (c_lo + 1) / 2
+    - hi 이상 값 c_hi개는 모두 hi가 되어 평균 순위 n - c_hi + (c_hi + 1) / 2
+    - 그 사이 값은 원래 순위 유지
+    평균 순위의 합은 동점과 관계없이 n(n+1)/2이므로 NaN 행의 점수(평균 점수)는 상수
+    """
+
+    def __init__(self, values):
+        self.values = _to_float(values)
+        self.valid = ~np.isnan(self.values)
+        self.sorted = np.sort(self.values[self.valid])
+        self.n = len(self.sorted)
+        self.base_rank = pd.Series(self.values).rank().to_numpy()
+
+    def scores(self, lo, hi, reverse: bool = False) -> np.ndarray:
+        """lo, hi: 스칼라 또는 (T,) 배열 → (n_rows,) 또는 (T, n_rows) 점수"""
+        lo = np.asarray(lo, dtype=np.float64)
+        hi = np.asarray(hi, dtype=np.float64)
+        batched = lo.ndim > 0 or hi.ndim > 0
+        lo, hi = np.broadcast_arrays(np.atleast_1d(lo), np.atleast_1d(hi))
+        c_lo = np.searchsorted(self.sorted, lo, side='right')[:, None]
+        c_hi = (self.n - np.searchsorted(self.sorted, hi, side='left'))[:, None]
+        x = self.values[None, :]
+        with np.errstate(invalid='ignore'):
+            rank = np.where(x <= lo[:, None], (c_lo + 1) / 2.0,
+                            np.where(x >= hi[:, None], self.n - c_hi + (c_hi + 1) / 2.0, self.base_rank[None, :]))
+        pr = rank / self.n
+        score = pr * 10 if reverse else (1 - pr) * 10
+        mean_pr = (self.n + 1) / (2.0 * self.n)
+        fill = mean_pr * 10 if reverse else (1 - mean_pr) * 10
+        score = np.where(self.valid[None, :], score, fill)
+        return score if batched else score[0]
+
+def company_size_codes(total_assets) -> np.ndarray:
+    """0: 중소기업, 1: 중견기업, 2: 대기업 (자산총계 결측은 0으로 보아 중소기업)"""
+    assets = np.nan_to_num(_to_float(total_assets), nan=0.0)
+    return np.searchsorted(SIZE_BINS, assets, side='right')
+
+def size_debt_weights(size_codes: np.ndarray, large_weight, medium_weight) -> np.ndarray:
+    """규모별 부채 점수 배율 (중소 1.0), 배율이 스칼라면 (n,), (T,) 배열이면 (T, n)"""
+    large, medium = np.broadcast_arrays(np.asarray(large_weight, dtype=np.float64),
+                                        np.asarray(medium_weight, dtype=np.float64))
+    table = np.stack([np.ones_like(large), medium, large], axis=-1)
+    return table[..., size_codes]
+
+def ensure_flag_score(df: pd.DataFrame) -> np.ndarray:
+    """flag_score 컬럼이 있으면 사용, 없으면 플래그 컬럼(없으면 계산)의 가중합"""
+    if 'flag_score' in df.columns:
+        return _to_float(df['flag_score'])
+    if all(name in df.columns for name in RISK_FLAGS):
+        flags = df[RISK_FLAGS]
+    else:
+        flags = compute_flags(df)
+    return flag_score(flags).to_numpy(dtype=np.float64)
+
+@dataclass
+class ComponentMatrix:
+    """
+    가중치와 무관한 구성 요소 점수
+    fixed: (n, len(fixed_components)) 부채/ROA를 제외한 구성 요소 점수
+    debt_rank, roa_rank: clip 파라미터가 시행마다 바뀌는 구성 요소
+    size_codes: 기업 규모 코드 (부채 점수 배율)
+    """
+    fixed: np.ndarray
+    fixed_components: List[str]
+    debt_rank: ClippedRank
+    roa_rank: ClippedRank
+    size_codes: np.ndarray
+    index: pd.Index = field(default_factory=pd.RangeIndex)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'ComponentMatrix':
+        columns = {'flag_score': ensure_flag_score(df)}
+        for name, (column, (lo, hi), reverse) in RELATIVE_COMPONENTS.items():
+            columns[name] = calculate_relative_score(pd.Series(_to_float(df[column])).clip(lo, hi),
+                                                     reverse=reverse).to_numpy()
+        for name, (column, reverse) in ECONOMIC_SOURCES.items():
+            if column in df.columns:
+                values = pd.Series(_to_float(df[column]))
+                columns[name] = calculate_relative_score(values.fillna(values.median()), reverse=reverse).to_numpy()
+            else:
+                # 노트북과 같이 경제지표가 없으면 중간 점수
+                columns[name] = np.full(len(df), 5.0)
+        fixed_components = [name for name in COMPONENTS if name in columns]
+        return cls(
+            fixed=np.column_stack([columns[name] for name in fixed_components]),
+            fixed_components=fixed_components,
+            debt_rank=ClippedRank(df['부채비율']),
+            roa_rank=ClippedRank(df['ROA']),
+            size_codes=company_size_codes(df['자산총계']),
+            index=df.index,
+        )
+
+    def __len__(self):
+        return len(self.fixed)
+
+    def components(self, params: Optional[Dict] = None) -> pd.DataFrame:
+        """전처리 파라미터 하나에 대한 (행 × 13) 구성 요소 점수 (debt_score는 규모 배율 적용 후)"""
+        params = {**DEFAULT_PARAMS, **(params or {})}
+        frame = pd.DataFrame(self.fixed, columns=self.fixed_components, index=self.index)
+        debt_base = self.debt_rank.scores(0, params['debt_clip_max'], reverse=True)
+        frame['debt_score'] = debt_base * size_debt_weights(
+            self.size_codes, params['large_company_debt_weight'], params['medium_company_debt_weight'])
+        frame['roa_score'] = self.roa_rank.scores(params['roa_clip_min'], params['roa_clip_max'])
+        return frame[COMPONENTS]
+
+    def scores(self, weights: np.ndarray, params: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        """
+        weights: (T, 13) COMPONENTS 순서의 가중치 (정규화는 호출 측에서)
+        params: DEFAULT_PARAMS 키별 (T,) 배열 또는 스칼라
+        반환: (T, n) 휴리스틱 점수 (0~100 스케일)
+        """
+        weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        n_trials = len(weights)
+        params = {**DEFAULT_PARAMS, **(params or {})}
+        params = {key: np.broadcast_to(np.asarray(value, dtype=np.float64), (n_trials,))
+                  for key, value in params.items()}
+
+        column = {name: i for i, name in enumerate(COMPONENTS)}
+        fixed_weights = weights[:, [column[name] for name in self.fixed_components]]
+        total = fixed_weights @ self.fixed.T
+
+        debt = self.debt_rank.scores(np.zeros(n_trials), params['debt_clip_max'], reverse=True)
+        debt *= size_debt_weights(self.size_codes, params['large_company_debt_weight'],
+                                  params['medium_company_debt_weight'])
+        total += weights[:, [column['debt_score']]] * debt
+        roa = self.roa_rank.scores(params['roa_clip_min'], params['roa_clip_max'])
+        total += weights[:, [column['roa_score']]] * roa
+        return total * 10
+
+@dataclass
+class ReferenceDistribution:
+    """
+    상대평가 기준 분포 (전체 재계산 시점 패널의 구성 요소별 원본 값, 정렬)
+    새 분기 행을 기존 행의 점수를 바꾸지 않고 같은 척도로 평가 (증분 점수 계산용)
+    - 점수 = 기준 분포에 대한 평균 순위 백분위 (기준 분포에 포함된 행은 calculate_relative_score와 동일)
+    - 경제지표 결측은 기준 분포의 중앙값으로 채움, 경제지표 컬럼이 없던 구성 요소는 중간 점수(5.0)
+    """
+    values: Dict[str, np.ndarray]
+    medians: Dict[str, float] = field(default_factory=dict)
+
+    @staticmethod
+    def source_columns() -> List[str]:
+        """기준 분포를 만드는 데 필요한 패널 컬럼"""
+        return (['부채비율', 'ROA'] + [column for column, _, _ in RELATIVE_COMPONENTS.values()]
+                + [column for column, _ in ECONOMIC_SOURCES.values()])
+
+    @classmethod
+    def from_frames(cls, frames: Iterable[pd.DataFrame]) -> 'ReferenceDistribution':
+        """여러 패널 조각(기업 청크)의 합집합 기준 분포 (from_frame(concat(frames))와 같음, 필요한 컬럼만 보관)"""
+        columns = cls.source_columns()
+        return cls.from_frame(pd.concat([frame[[c for c in columns if c in frame.columns]] for frame in frames],
+                                        ignore_index=True))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'ReferenceDistribution':
+        sources = {'debt_score': '부채비율', 'roa_score': 'ROA'}
+        sources.update({name: column for name, (column, _, _) in RELATIVE_COMPONENTS.items()})
+        values, medians = {}, {}
+        for name, column in sources.items():
+            x = _to_float(df[column])
+            values[name] = np.sort(x[~np.isnan(x)])
+        for name, (column, _) in ECONOMIC_SOURCES.items():
+            if column in df.columns:
+                x = pd.Series(_to_float(df[column]))
+                medians[name] = float(x.median())
+                values[name] = np.sort(x.fillna(medians[name]).to_numpy())
+        return cls(values=values, medians=medians)
+
+    def relative_score(self, name: str, x, lo=None, hi=None, reverse: bool = False) -> np.ndarray:
+        """x의 상대평가 점수 (lo/hi가 있으면 기준 분포와 x를 같이 clip)"""
+        ref = self.values[name]
+        x = _to_float(x)
+        if lo is not None or hi is not None:
+            ref = np.clip(ref, lo, hi)
+            x = np.clip(x, lo, hi)
+        n = len(ref)
+        # 정렬된 x로 검색하면 기준 분포 접근이 순차적이라 빠름 (결과는 원래 순서로 되돌림)
+        order = np.argsort(x, kind='stable')
+        left = np.empty(len(x), dtype=np.int64)
+        right = np.empty(len(x), dtype=np.int64)
+        left[order] = np.searchsorted(ref, x[order], side='left')
+        right[order] = np.searchsorted(ref, x[order], side='right')
+        pr = (left + (right - left + 1) / 2.0) / n
+        pr = np.where(np.isnan(x), (n + 1) / (2.0 * n), pr)
+        return pr * 10 if reverse else (1 - pr) * 10
+
+    def components(self, df: pd.DataFrame, params: Optional[Dict] = None) -> pd.DataFrame:
+        """ComponentMatrix.components와 같은 (행 × 13) 구성 요소 점수 (순위는 기준 분포 대비)"""
+        params = {**DEFAULT_PARAMS, **(params or {})}
+        columns = {'flag_score': ensure_flag_score(df)}
+        columns['debt_score'] = self.relative_score(
+            'debt_score', df['부채비율'], 0, params['debt_clip_max'], reverse=True
+        ) * size_debt_weights(company_size_codes(df['자산총계']), params['large_company_debt_weight'],
+                              params['medium_company_debt_weight'])
+        columns['roa_score'] = self.relative_score('roa_score', df['ROA'], params['roa_clip_min'],
+                                                   params['roa_clip_max'])
+        for name, (column, (lo, hi), reverse) in RELATIVE_COMPONENTS.items():
+            columns[name] = self.relative_score(name, df[column], lo, hi, reverse=reverse)
+        for name, (column, reverse) in ECONOMIC_SOURCES.items():
+            if name in self.values and column in df.columns:
+                x = pd.Series(_to_float(df[column])).fillna(self.medians[name])
+                columns[name] = self.relative_score(name, x, reverse=reverse)
+            else:
+                columns[name] = np.full(len(df), 5.0)
+        return pd.DataFrame({name: columns[name] for name in COMPONENTS}, index=df.index)
+
+    def save(self, path: str):
+        arrays = {f'values__{name}': values for name, values in self.values.items()}
+        arrays.update({f'median__{name}': np.float64(value) for name, value in self.medians.items()})
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'ReferenceDistribution':
+        with np.load(path) as data:
+            values = {key.split('__', 1)[1]: data[key] for key in data.files if key.startswith('values__')}
+            medians = {key.split('__', 1)[1]: float(data[key]) for key in data.files if key.startswith('median__')}
+        return cls(values=values, medians=medians)
+
+def assign_labels(scores: np.ndarray, thresholds) -> np.ndarray:
+    """점수 ≤ t1: 0, ≤ t2: 1, ≤ t3: 2, 그 외 3 (thresholds가 (T, 3)이면 scores (T, n)과 행별 비교)"""
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    if thresholds.ndim == 1:
+        return np.searchsorted(thresholds, scores, side='left')
+    return (scores[..., None] > thresholds[:, None, :]).sum(axis=-1)
+
+def weights_version(weights: Optional[Dict[str, float]] = None) -> str:
+    """가중치 식별자 (구성 요소 순서의 가중치 값 해시 16자리, risk_scores.weights_version)"""
+    weights = weights or DEFAULT_WEIGHTS
+    payload = json.dumps([float(weights[name]) for name in COMPONENTS])
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+def normalize_weights(weights: Dict[str, float]) -> Dict[str, float]:
+    total = sum(weights.get(name, 0.0) for name in COMPONENTS)
+    return {name: weights.get(name, 0.0) / total for name in COMPONENTS}
+
+def score_frame(df: pd.DataFrame, weights: Optional[Dict[str, float]] = None,
+                thresholds: Optional[Sequence[float]] = None, params: Optional[Dict] = None,
+                reference: Optional[ReferenceDistribution] = None) -> pd.DataFrame:
+    """
+    노트북 Task 3 결과 (df와 같은 인덱스)
+    컬럼: 13개 구성 요소 점수, company_size, heuristic_score, heuristic_label, heuristic_label_name
+    reference가 있으면 df 안의 순위 대신 기준 분포 대비 순위로 상대평가 (증분 계산)
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    thresholds = thresholds or DEFAULT_THRESHOLDS
+    if reference is None:
+        result = ComponentMatrix.from_frame(df).components(params)
+    else:
+        result = reference.components(df, params)
+    weight_vector = np.array([weights[name] for name in COMPONENTS])
+    result['company_size'] = np.asarray(SIZE_NAMES)[company_size_codes(df['자산총계'])]
+    result['heuristic_score'] = result[COMPONENTS].to_numpy() @ weight_vector * 10
+    result['heuristic_label'] = assign_labels(result['heuristic_score'].to_numpy(), thresholds)
+    result['heuristic_label_name'] = result['heuristic_label'].map(LABEL_NAMES)
+    return result
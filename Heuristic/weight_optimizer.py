@@ -0,0 +1,325 @@
+"""
+휴리스틱 가중치/임계값 최적화 (노트북 Task 2-5)
+노트북 objective는 시행마다 데이터프레임을 복사하고 모든 상대평가 순위를 다시 계산했지만,
+시행 사이에 바뀌는 것은 가중치/임계값/clip/규모 배율뿐이므로
+- 구성 요소 점수는 ComponentMatrix로 한 번만 계산 (부채/ROA clip은 ClippedRank 닫힌 식)
+- 시행 T개의 점수는 (T, 13) 가중치 × (13, n) 행렬곱 한 번, 라벨은 임계값 비교
+- 정확도/가중 정밀도·재현율·F1/분포 페널티는 시행별 혼동행렬(bincount 한 번)로 계산
+- Optuna ask/tell로 시행을 batch_size개씩 묶어 한 번에 평가 (TPE constant_liar로 배치 내 후보 분산)
+- random_search: Optuna 샘플러 오버헤드 없이 탐색 공간에서 수만 개 후보를 numpy로 뽑아 배치 평가
+- time_series_cv: 분기 순서를 유지한 확장 윈도우 교차검증 (학습 구간에서 최적화, 다음 구간에서 평가)
+  폴드마다 학습 구간 패널만으로 구성 요소 행렬/라벨을 만들고, 검증 행은 학습 구간 기준 분포 대비 순위로 평가
+
+목적 함수 값은 노트북과 같음 (정확도 60% + 정밀도 8% + 재현율 8% + F1 4% + 다양성 5% + 분포 보너스 15%)
+
+사용법:
+    from weight_optimizer import HeuristicWeightOptimizer
+    optimizer = HeuristicWeightOptimizer(df)       # 노트북 Task 2 이후 df (플래그 포함)
+    study = optimizer.optimize(n_trials=2000, batch_size=256)
+    weights, thresholds, params = optimizer.best_config(study.best_params)
+    best_params, best_value = optimizer.random_search(n_samples=100_000)   # 대량 무작위 탐색
+"""
+
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from risk_score import COMPONENTS, DEFAULT_PARAMS, ComponentMatrix, ReferenceDistribution, assign_labels
+from risk_flags import QUARTERS, quarter_codes
+
+N_LABELS = 4
+# 노트북 목표 분포와 허용 오차
+TARGET_DISTRIBUTION = np.array([0.30, 0.375, 0.225, 0.075])
+DISTRIBUTION_TOLERANCE = np.array([0.05, 0.025, 0.025, 0.025])
+MAX_DISTRIBUTION_PENALTY = 0.15
+MIN_ROWS = 100
+
+# 노트북 objective와 같은 탐색 공간 (이름: (하한, 상한, 종류))
+WEIGHT_SPACE = {
+    'flag_score': (0.15, 0.60),
+    'debt_score': (0.05, 0.25),
+    'equity_score': (0.02, 0.20),
+    'roa_score': (0.05, 0.25),
+    'roe_score': (0.01, 0.15),
+    'sales_growth_score': (0.01, 0.15),
+    'profit_growth_score': (0.01, 0.12),
+    'net_growth_score': (0.001, 0.08),
+    'bsi_score': (0.01, 0.20),
+    'rate_score': (0.01, 0.15),
+    'housing_score': (0.01, 0.15),
+    'm2_score': (0.005, 0.10),
+    'spread_score': (0.005, 0.10),
+}
+THRESHOLD_SPACE = {
+    'threshold_safe_caution': (15, 40),
+    'threshold_caution_risk': (30, 60),
+    'threshold_risk_danger': (50, 85),
+}
+INT_PARAM_SPACE = {
+    'debt_clip_max': (300, 800),
+    'roa_clip_min': (-80, -20),
+    'roa_clip_max': (20, 80),
+}
+FLOAT_PARAM_SPACE = {
+    'large_company_debt_weight': (0.3, 0.8),
+    'medium_company_debt_weight': (0.5, 0.9),
+}
+
+def next_quarter_target(df: pd.DataFrame, corp_col: str = 'corp_name') -> pd.Series:
+    """
+    노트북 create_next_quarter_target: 다음 분기 재무지표의 규칙 기반 위험도 라벨 (0~3)
+    다음 분기가 없는 행은 NaN (노트북은 np.where 결과라 NaN이 생기지 않아 마지막 분기가 0으로 들어갔음)
+    """
+    keys = [corp_col, 'year', '_quarter_code']
+    frame = df.assign(_quarter_code=quarter_codes(df['quarter']))
+    ordered = frame.sort_values(keys)
+    following = ordered.groupby(corp_col)[['부채비율', 'ROA', '자기자본비율']].shift(-1)
+    debt = pd.to_numeric(following['부채비율'], errors='coerce')
+    roa = pd.to_numeric(following['ROA'], errors='coerce')
+    equity = pd.to_numeric(following['자기자본비율'], errors='coerce')
+
+    risk = ((debt > 200) * 3 + (roa < -5) * 2 + (equity < 20) * 2 + (debt > 300) * 2 + (roa < -10) * 1)
+    labels = pd.Series(np.select([risk <= 1, risk <= 3, risk <= 5], [0, 1, 2], 3), index=ordered.index, dtype=float)
+    has_next = ordered.groupby(corp_col).cumcount(ascending=False) > 0
+    return labels.where(has_next).reindex(df.index)
+
+def period_codes(df: pd.DataFrame) -> np.ndarray:
+    """연도 × 4 + 분기 (시계열 분할용 정수 기간)"""
+    return df['year'].to_numpy(dtype=np.int64) * len(QUARTERS) + quarter_codes(df['quarter'])
+
+def classification_scores(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    y_true (n,), y_pred (T, n) → 시행별 지표 (T,)
+    precision/recall/f1은 sklearn average='weighted', zero_division=0과 같은 정의
+    """
+    n_trials, n = y_pred.shape
+    flat = (np.arange(n_trials)[:, None] * N_LABELS * N_LABELS + y_true[None, :] * N_LABELS + y_pred).ravel()
+    confusion = np.bincount(flat, minlength=n_trials * N_LABELS * N_LABELS).reshape(n_trials, N_LABELS, N_LABELS)
+    tp = np.diagonal(confusion, axis1=1, axis2=2).astype(np.float64)
+    support = confusion.sum(axis=2).astype(np.float64)
+    predicted = confusion.sum(axis=1).astype(np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        f1 = np.where(support + predicted > 0, 2 * tp / (support + predicted), 0.0)
+    weights = support / n
+    return {
+        'accuracy': tp.sum(axis=1) / n,
+        'precision': (precision * weights).sum(axis=1),
+        'recall': (recall * weights).sum(axis=1),
+        'f1': (f1 * weights).sum(axis=1),
+        'predicted_ratio': predicted / n,
+        'n_true_labels': (support > 0).sum(axis=1),
+        'n_pred_labels': (predicted > 0).sum(axis=1),
+    }
+
+def distribution_penalty(predicted_ratio: np.ndarray) -> np.ndarray:
+    """노트북 분포 제약: 허용 범위를 벗어난 라벨은 |차이| × 2, 아예 없는 라벨은 목표 비율만큼"""
+    gap = np.abs(predicted_ratio - TARGET_DISTRIBUTION)
+    penalty = np.where(gap > DISTRIBUTION_TOLERANCE, gap * 2, 0.0)
+    penalty = np.where(predicted_ratio > 0, penalty, TARGET_DISTRIBUTION)
+    return penalty.sum(axis=1)
+
+class HeuristicWeightOptimizer:
+    """
+    df: 노트북 Task 2(플래그 계산) 이후의 기업-분기 패널
+    구성 요소 행렬과 다음 분기 라벨을 생성 시 한 번 계산하고, 시행 배치를 벡터 연산으로 평가
+    상대평가 순위는 노트북과 같이 전체 패널 기준 (time_series_cv는 폴드마다 학습 구간 기준)
+    """
+
+    def __init__(self, df: pd.DataFrame, corp_col: str = 'corp_name'):
+        target = next_quarter_target(df, corp_col)
+        keep = target.notna().to_numpy()
+        self.panel = df
+        self.corp_col = corp_col
+        self.df = df.loc[keep]
+        self.matrix = ComponentMatrix.from_frame(df)
+        self.rows = np.flatnonzero(keep)
+        self.y_true = target.to_numpy()[keep].astype(np.int64)
+        self.periods = period_codes(self.df)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @staticmethod
+    def suggest(trial) -> Dict[str, float]:
+        """노트북 objective와 같은 이름/범위의 파라미터 제안"""
+        params = {name: trial.suggest_float(name, low, high) for name, (low, high) in WEIGHT_SPACE.items()}
+        params.update({name: trial.suggest_float(name, low, high) for name, (low, high) in THRESHOLD_SPACE.items()})
+        params.update({name: trial.suggest_int(name, low, high) for name, (low, high) in INT_PARAM_SPACE.items()})
+        params.update({name: trial.suggest_float(name, low, high) for name, (low, high) in FLOAT_PARAM_SPACE.items()})
+        return params
+
+    @staticmethod
+    def stack(params_list: Sequence[Dict[str, float]]) -> Dict[str, np.ndarray]:
+        """시행별 파라미터 dict 목록 → 이름별 (T,) 배열"""
+        names = params_list[0].keys()
+        return {name: np.array([params[name] for params in params_list], dtype=np.float64) for name in names}
+
+    def evaluate(self, params: Dict[str, np.ndarray], rows: Optional[np.ndarray] = None,
+                 details: bool = False):
+        """
+        params: 이름별 (T,) 배열 (suggest와 같은 키)
+        rows: 평가할 행 위치 (self 기준, 기본 전체) → 시행별 목적 함수 값 (T,)
+        details=True면 (값, 지표 dict) 반환
+        """
+        weights, thresholds, prep = self._unpack(params)
+        # 전체 패널 기준 점수 중 평가 행만 사용
+        selected = self.rows if rows is None else self.rows[rows]
+        y_true = self.y_true if rows is None else self.y_true[rows]
+        return self._objective(self.matrix.scores(weights, prep)[:, selected], y_true, thresholds, details)
+
+    def evaluate_reference(self, params: Dict[str, np.ndarray], reference: ReferenceDistribution,
+                           rows: Optional[np.ndarray] = None, details: bool = False):
+        """
+        evaluate와 같은 목적 함수, 상대평가 순위는 전체 패널 대신 기준 분포(reference) 대비
+        (교차검증 검증 행을 학습 구간 분포로 평가, 시행마다 구성 요소를 다시 계산하므로 시행 수가 적을 때 사용)
+        """
+        weights, thresholds, prep = self._unpack(params)
+        frame = self.df if rows is None else self.df.iloc[rows]
+        y_true = self.y_true if rows is None else self.y_true[rows]
+        scores = np.stack([reference.components(frame, {name: values[t] for name, values in prep.items()})
+                           .to_numpy() @ weights[t] * 10 for t in range(len(weights))])
+        return self._objective(scores, y_true, thresholds, details)
+
+    @staticmethod
+    def _unpack(params: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """이름별 (T,) 배열 → (정규화 가중치 (T, 13), 임계값 (T, 3), 전처리 파라미터)"""
+        weights = np.column_stack([params[name] for name in COMPONENTS])
+        weights = weights / weights.sum(axis=1, keepdims=True)
+        thresholds = np.column_stack([params[name] for name in THRESHOLD_SPACE])
+        return weights, thresholds, {name: params[name] for name in DEFAULT_PARAMS}
+
+    @staticmethod
+    def _objective(scores: np.ndarray, y_true: np.ndarray, thresholds: np.ndarray, details: bool = False):
+        """(T, n) 점수 → 시행별 목적 함수 값 (T,), details=True면 (값, 지표 dict)"""
+        y_pred = assign_labels(scores, thresholds)
+
+        metrics = classification_scores(y_true, y_pred)
+        penalty = distribution_penalty(metrics['predicted_ratio'])
+        diversity = np.minimum(metrics['n_true_labels'], metrics['n_pred_labels']) / 4.0
+        value = (metrics['accuracy'] * 0.60 +
+                 metrics['precision'] * 0.08 +
+                 metrics['recall'] * 0.08 +
+                 metrics['f1'] * 0.04 +
+                 diversity * 0.05 +
+                 np.maximum(0.0, MAX_DISTRIBUTION_PENALTY - penalty) * 0.15)
+
+        # 노트북의 조기 반환 조건: 임계값 순서 위반, 분포 이탈, 데이터 부족 → 0
+        ordered = (thresholds[:, 0] < thresholds[:, 1]) & (thresholds[:, 1] < thresholds[:, 2])
+        value = np.where(ordered & (penalty <= MAX_DISTRIBUTION_PENALTY) & (len(y_true) >= MIN_ROWS), value, 0.0)
+        if details:
+            metrics['distribution_penalty'] = penalty
+            return value, metrics
+        return value
+
+    def objective(self, trial) -> float:
+        """단일 시행용 Optuna 목적 함수 (study.optimize(optimizer.objective)로 사용 가능)"""
+        params = self.suggest(trial)
+        return float(self.evaluate(self.stack([params]))[0])
+
+    def optimize(self, n_trials: int = 1000, batch_size: int = 128, timeout: Optional[float] = None,
+                 seed: int = 42, study=None, rows: Optional[np.ndarray] = None, verbose: bool = True):
+        """
+        ask/tell로 batch_size개 시행을 묶어 한 번의 행렬곱으로 평가
+        rows: 최적화에 사용할 행 (교차검증 학습 구간), 기본 전체
+        """
+        import optuna
+
+        if study is None:
+            if not verbose:
+                optuna.logging.set_verbosity(optuna.logging.WARNING)
+            study = optuna.create_study(
+                direction='maximize',
+                study_name='heuristic_accuracy_maximization',
+                sampler=optuna.samplers.TPESampler(seed=seed, n_startup_trials=20, n_ei_candidates=50,
+                                                   constant_liar=True)
+            )
+        start = time.perf_counter()
+        done = 0
+        while done < n_trials:
+            if timeout is not None and time.perf_counter() - start > timeout:
+                break
+            trials = [study.ask() for _ in range(min(batch_size, n_trials - done))]
+            values = self.evaluate(self.stack([self.suggest(trial) for trial in trials]), rows=rows)
+            for trial, value in zip(trials, values):
+                study.tell(trial, float(value))
+            done += len(trials)
+        if verbose:
+            elapsed = time.perf_counter() - start
+            print(f"{done}회 시행, {elapsed:.1f}초 ({done / max(elapsed, 1e-9):.0f} 시행/초), 최고 점수 {study.best_value:.6f}")
+        return study
+
+    def random_search(self, n_samples: int = 100_000, batch_size: int = 1024, seed: int = 42,
+                      rows: Optional[np.ndarray] = None) -> Tuple[Dict[str, float], float]:
+        """탐색 공간에서 균등 추출한 후보를 배치로 평가해 (최고 파라미터, 점수) 반환 (임계값 순서 위반 후보는 0점)"""
+        rng = np.random.default_rng(seed)
+        best_params, best_value = None, -np.inf
+        for start in range(0, n_samples, batch_size):
+            size = min(batch_size, n_samples - start)
+            params = {name: rng.uniform(low, high, size)
+                      for name, (low, high) in {**WEIGHT_SPACE, **THRESHOLD_SPACE, **FLOAT_PARAM_SPACE}.items()}
+            params.update({name: rng.integers(low, high + 1, size).astype(np.float64)
+                           for name, (low, high) in INT_PARAM_SPACE.items()})
+            values = self.evaluate(params, rows=rows)
+            i = int(np.argmax(values))
+            if values[i] > best_value:
+                best_value = float(values[i])
+                best_params = {name: (int(array[i]) if name in INT_PARAM_SPACE else float(array[i]))
+                               for name, array in params.items()}
+        return best_params, best_value
+
+    def time_series_cv(self, n_splits: int = 5, n_trials: int = 1000, batch_size: int = 128,
+                       seed: int = 42) -> pd.DataFrame:
+        """
+        분기 순서 확장 윈도우 교차검증 (sklearn TimeSeriesSplit과 같은 분할을 기간 단위로 적용)
+        폴드마다 학습 구간(train_end 이하 분기) 패널만으로 구성 요소 행렬과 다음 분기 라벨을 만들어 최적화
+        (백분위 순위와 라벨 모두 검증 구간 데이터를 보지 않음, 학습 구간 마지막 분기는 다음 분기가 없어 라벨에서 제외)
+        최적 파라미터는 다음 구간 행에서 학습 구간 기준 분포(ReferenceDistribution) 대비 순위로 평가
+        """
+        unique_periods = np.unique(self.periods)
+        fold_size = len(unique_periods) // (n_splits + 1)
+        if fold_size == 0:
+            raise ValueError(f"기간 수({len(unique_periods)})가 n_splits + 1보다 적습니다.")
+        panel_periods = period_codes(self.panel)
+        results = []
+        for fold in range(n_splits):
+            train_end = unique_periods[fold_size * (fold + 1) - 1]
+            test_end = unique_periods[min(fold_size * (fold + 2), len(unique_periods)) - 1]
+            history = self.panel.loc[panel_periods <= train_end]
+            train = HeuristicWeightOptimizer(history, self.corp_col)
+            test_rows = np.flatnonzero((self.periods > train_end) & (self.periods <= test_end))
+            study = train.optimize(n_trials, batch_size, seed=seed + fold, verbose=False)
+            best = self.stack([study.best_params])
+            test_value, metrics = self.evaluate_reference(best, ReferenceDistribution.from_frame(history),
+                                                          rows=test_rows, details=True)
+            results.append({
+                'fold': fold,
+                'train_until': _period_label(train_end),
+                'test_until': _period_label(test_end),
+                'train_rows': len(train),
+                'test_rows': len(test_rows),
+                'train_score': study.best_value,
+                'test_score': float(test_value[0]),
+                'test_accuracy': float(metrics['accuracy'][0]),
+                'test_f1': float(metrics['f1'][0]),
+            })
+        return pd.DataFrame(results)
+
+    @staticmethod
+    def best_config(best_params: Dict[str, float]) -> Tuple[Dict[str, float], List[float], Dict[str, float]]:
+        """
+        최적 파라미터 → (정규화 가중치, 임계값 3개, 전처리 파라미터)
+        risk_score.score_frame(df, weights, thresholds, params)에 그대로 사용
+        """
+        total = sum(best_params[name] for name in COMPONENTS)
+        weights = {name: best_params[name] / total for name in COMPONENTS}
+        thresholds = [best_params[name] for name in THRESHOLD_SPACE]
+        params = {name: best_params[name] for name in DEFAULT_PARAMS}
+        return weights, thresholds, params
+
+def _period_label(period: int) -> str:
+    return f"{period // len(QUARTERS)}-{QUARTERS[period % len(QUARTERS)]}"
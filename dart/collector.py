@@ -0,0 +1,463 @@
+"""
+DART 분기 재무 수집 (dart_data.ipynb 1~3번 셀의 수집 함수를 모듈로 분리)
+유니버스(universe.py)의 기업을 chunk_size개씩 수집해 청크마다 압축 패널(panel.py)로 저장
+- 한 번에 메모리에 있는 원본 결과는 한 청크 분량뿐, 청크 결과는 parquet 파일로 내려씀
+- 연도별 FS 고정(CFS/OFS), sj_div 필터, 누적 → 분기 차분, 라인리지 폴백은 노트북과 같음
+
+동시 수집:
+- 작업 단위는 (기업, 연도), workers개 스레드가 동시에 처리하고 모든 API 호출은 공유 한도(rate_limit.py)를 거침
+  (호출 간 고정 SLEEP 없음, 수집 시간 ≈ 호출 수 / 분당 한도)
+- FS 판별(CFS 조회)에 쓴 응답은 본 조회에 그대로 재사용 (CFS 연도는 보고서당 한 번만 호출)
+- (기업, 연도)가 끝날 때마다 체크포인트(out_dir/checkpoints/{corp_code}.jsonl)에 기록,
+  중단 후 다시 실행하면 기록된 (기업, 연도)는 건너뜀
+  (한도 초과·재시도를 모두 실패한 연도, 조회 오류를 빈 보고서로 처리한 연도는 기록하지 않음)
+  마지막 연도(end_year)는 아직 공시될 보고서가 남아 있으므로 기록하지 않고 매번 다시 조회
+
+원본 캐시 / 재정규화:
+- 받은 보고서 원본은 out_dir/raw(raw_cache.py)에 (corp_code, year, reprt_code, fs_div) 단위로 저장
+- renormalize_universe는 캐시만으로 FS 판별 → 계정 매칭 → 분기 변환을 다시 수행 (API 호출 없음)
+  계정 매핑(normalize.py의 TARGET_ACCOUNTS, clean_account_name, parse_amount)을 고친 뒤 패널과 체크포인트를 다시 만들 때 사용
+  캐시에 없는 보고서가 있는 (기업, 연도)는 체크포인트를 덮어쓰지 않음 (캐시 도입 전에 수집한 연도 등)
+
+사용법:
+    python collector.py --universe universe.json --out dart_out/panel --chunk-size 50 --workers 8
+    python collector.py ... --no-resume      # 체크포인트를 지우고 처음부터
+    python collector.py ... --renormalize    # 원본 캐시만으로 패널 재생성 (API 키 불필요)
+    from collector import collect_universe; collect_universe(companies, "dart_out/panel")
+"""
+
+import argparse
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from tqdm import tqdm
+import dart_fss as dart
+
+from normalize import TARGET_ACCOUNTS, clean_account_name, parse_amount, parse_reports  # noqa: F401 (기존 import 경로 유지)
+from panel import COL_ORDER, NUM_COLS, STORAGE_AMOUNT_DTYPE, compact_panel, panel_parts, trim_panel, write_panel_part
+from rate_limit import RETRY_ERRORS, QuotaExhausted, get_limiter
+from raw_cache import RawCache
+from universe import DEFAULT_UNIVERSE_PATH, Company, company_chunks, load_universe, resolve_corp_codes
+
+START_YEAR_LOAD = 2014  # 2014년부터 로드하여 2015년부터 사용
+DEFAULT_CHUNK_SIZE = 50
+DEFAULT_WORKERS = 8
+
+# ==========================================
+# 보고서 코드 / 분기말 (계정명 정규화·금액 변환은 normalize.py)
+# ==========================================
+REPRT = {"1Q": "11013", "H1": "11012", "3Q": "11014", "ANNUAL": "11011"}
+ORDER = ["1Q", "H1", "3Q", "ANNUAL"]
+Q_END = {"11013": "-03-31", "11012": "-06-30", "11014": "-09-30", "11011": "-12-31"}
+
+def setup_api(api_key: Optional[str] = None):
+    """DART_API_KEY(.env 또는 환경변수)로 dart_fss 설정"""
+    if api_key is None:
+        from dotenv import load_dotenv
+        load_dotenv()
+        api_key = os.getenv("DART_API_KEY")
+    if api_key is None:
+        raise RuntimeError("DART_API_KEY 환경변수가 설정되지 않았습니다.")
+    dart.set_api_key(api_key=api_key)
+
+def collection_range(now: Optional[datetime] = None) -> Tuple[int, Optional[int]]:
+    """
+    현재 날짜 기준 (종료 연도, 종료 연도의 마지막 분기) (마지막 분기 None이면 Q4까지)
+    1-3월: 전년도 Q4, 4-6월: 올해 Q1, 7-9월: 올해 Q2, 10-12월: 올해 Q3
+    """
+    now = now or datetime.now()
+    if now.month <= 3:
+        return now.year - 1, None
+    return now.year, (now.month - 1) // 3
+
+# ==========================================
+# FS 고정 + sj_div 필터 + 계정 매칭
+# ==========================================
+def fetch_report(corp_code: str, year: int, reprt_code: str, fs_div: str, cache: Optional[RawCache] = None) -> list:
+    """단일 보고서 원본 계정 목록 (공유 호출 한도 + 재시도, 데이터 없음은 빈 목록), cache가 있으면 원본 저장"""
+    resp = get_limiter().call(
+        dart.api.finance.fnltt_singl_acnt_all,
+        corp_code=str(corp_code).zfill(8), bsns_year=str(year), reprt_code=reprt_code, fs_div=fs_div
+    )
+    items = resp.get("list", []) if isinstance(resp, dict) else (resp or [])
+    if cache is not None:
+        cache.put(corp_code, year, reprt_code, fs_div, items)
+    return items
+
+class MissingReport(LookupError):
+    """원본 캐시에 없는 보고서 (재정규화에서 빈 보고서로 처리)"""
+
+def cached_report(cache: RawCache) -> Callable[[str, int, str, str], list]:
+    """캐시만 읽는 fetch 함수 (캐시에 없는 보고서는 MissingReport, _fetch_or_empty를 거치면 빈 목록)"""
+    def fetch(corp_code: str, year: int, reprt_code: str, fs_div: str) -> list:
+        items = cache.get(corp_code, year, reprt_code, fs_div)
+        if items is None:
+            raise MissingReport(f"{str(corp_code).zfill(8)} {year} {reprt_code} {fs_div}")
+        return items
+    return fetch
+
+def parse_report(items: list, year: int, reprt_code: str) -> dict:
+    """
+    보고서 원본 계정 목록 → 타겟 6계정 + report_date
+    - 손익 항목은 IS/CIS에서만, 재무상태 항목은 BS에서만 매칭 (normalize.extract_targets)
+    """
+    return parse_reports([items], [year], [reprt_code], Q_END)[0]
+
+def fetch_report_accounts_strict(corp_code: str, year: int, reprt_code: str, fs_div: str):
+    """단일 보고서 로드 (fs_div 고정: 'CFS' 또는 'OFS'), 반환: 타겟 6계정 + report_date"""
+    return parse_report(fetch_report(corp_code, year, reprt_code, fs_div), year, reprt_code)
+
+def _fetch_or_empty(fetch: Callable, corp_code: str, year: int, reprt_code: str, fs_div: str) -> list:
+    """한도/네트워크 오류(재시도 실패 포함)는 그대로 발생시키고, 그 밖의 조회 오류는 빈 보고서 (노트북과 같음)"""
+    try:
+        return fetch(corp_code, year, reprt_code, fs_div)
+    except (QuotaExhausted,) + RETRY_ERRORS:
+        raise
+    except Exception:
+        return []
+
+class FetchErrors:
+    """
+    _fetch_or_empty가 빈 보고서로 바꾸는 조회 오류를 (corp_code, 연도)별로 기록 (스레드 안전)
+    오류가 있던 연도는 보고서가 빠진 결과이므로 체크포인트에 기록하지 않고 다음 실행에서 다시 조회
+    """
+
+    def __init__(self):
+        self.errors: Dict[Tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, fetch: Callable) -> Callable:
+        """오류를 기록한 뒤 그대로 다시 발생시키는 fetch (빈 보고서 처리는 _fetch_or_empty)"""
+        def recorded(corp_code: str, year: int, reprt_code: str, fs_div: str) -> list:
+            try:
+                return fetch(corp_code, year, reprt_code, fs_div)
+            except (QuotaExhausted,) + RETRY_ERRORS:
+                raise
+            except Exception as e:
+                with self._lock:
+                    self.errors.setdefault((str(corp_code).zfill(8), int(year)), []).append(e)
+                raise
+        return recorded
+
+    def failed(self, company: Company, year: int) -> list:
+        """(기업, 연도) 작업에서 난 조회 오류 (라인리지 대상 연도면 레거시 기업 조회 포함)"""
+        codes = [company.corp_code]
+        if company.lineage and company.lineage.corp_code and year <= company.lineage.until_year:
+            codes.append(company.lineage.corp_code)
+        with self._lock:
+            return [e for code in codes for e in self.errors.get((str(code).zfill(8), int(year)), [])]
+
+def fetch_year_reports(corp_code: str, year: int, fetch: Callable = fetch_report) -> Tuple[str, Dict[str, list]]:
+    """
+    (중요) 연도별 FS 기준을 CFS/OFS 중 하나로 '고정'하여 1Q/H1/3Q/ANNUAL 원본 계정 목록 조회
+    대표 보고서(ANNUAL → 3Q → H1 → 1Q) 순으로 CFS를 조회해 하나라도 있으면 CFS, 없으면 OFS
+    CFS 판별에 쓴 응답은 다시 호출하지 않고 그대로 사용 (CFS 연도: 4회, OFS 연도: 8회 호출)
+    fetch: 보고서 조회 함수 (기본 API, 재정규화는 cached_report)
+    """
+    probed = {}
+    fs_fixed = "OFS"
+    for tag in ["ANNUAL", "3Q", "H1", "1Q"]:
+        probed[tag] = _fetch_or_empty(fetch, corp_code, year, REPRT[tag], "CFS")
+        if probed[tag]:
+            fs_fixed = "CFS"
+            break
+
+    reports = {}
+    for tag in ORDER:
+        if fs_fixed == "CFS" and tag in probed:
+            reports[tag] = probed[tag]
+        else:
+            reports[tag] = _fetch_or_empty(fetch, corp_code, year, REPRT[tag], fs_fixed)
+    return fs_fixed, reports
+
+def quarter_tables(entities: List[Tuple[str, str, int]], fetch: Callable = fetch_report) -> List[pd.DataFrame]:
+    """
+    (표시명, corp_code, 연도) 목록 → 연도별 FS 고정 조회 → 분기 4행 목록
+    모든 보고서를 모아 한 번에 정규화 (normalize.parse_reports)
+    손익 항목: add_amount(분기금액) 우선, 없으면 누적→분기 변환(차분) 수행.
+    """
+    reports, years, reprt_codes = [], [], []
+    for _, corp_code, year in entities:
+        _, fetched = fetch_year_reports(corp_code, year, fetch)
+        for tag in ORDER:
+            reports.append(fetched[tag])
+            years.append(year)
+            reprt_codes.append(REPRT[tag])
+    parsed = parse_reports(reports, years, reprt_codes, Q_END)
+    return [quarter_table(corp_name, corp_code, year, dict(zip(ORDER, parsed[4 * i:4 * i + 4])))
+            for i, (corp_name, corp_code, year) in enumerate(entities)]
+
+def yearly_quarter_table_with_fs_lock(corp_name: str, corp_code: str, year: int,
+                                      fetch: Callable = fetch_report) -> pd.DataFrame:
+    """연도별 FS 고정 조회 → 분기 4행"""
+    return quarter_tables([(corp_name, corp_code, year)], fetch)[0]
+
+def quarter_table(corp_name: str, corp_code: str, year: int, raw: dict) -> pd.DataFrame:
+    """
+    보고서별 계정 값(raw: 1Q/H1/3Q/ANNUAL) → 분기 4행
+    손익 항목은 누적 → 분기 차분, 재무상태표 항목은 분기말 잔액 그대로
+    """
+    def d(a, b):
+        return None if (a is None or b is None) else a - b
+
+    def quarterly(name):
+        return {
+            "Q1": raw["1Q"][name],
+            "Q2": d(raw["H1"][name], raw["1Q"][name]),
+            "Q3": d(raw["3Q"][name], raw["H1"][name]),
+            "Q4": d(raw["ANNUAL"][name], raw["3Q"][name]),
+        }
+
+    def balance(name):
+        return {q: raw[tag][name] for q, tag in zip(["Q1", "Q2", "Q3", "Q4"], ORDER)}
+
+    columns = {
+        "report_date": {q: raw[tag].get("report_date") for q, tag in zip(["Q1", "Q2", "Q3", "Q4"], ORDER)},
+        "자산총계": balance("자산총계"),
+        "부채총계": balance("부채총계"),
+        "자본총계": balance("자본총계"),
+        "매출액": quarterly("매출액"),
+        "영업이익": quarterly("영업이익"),
+        "분기순이익": quarterly("당기순이익"),
+    }
+    rows = []
+    for q in ["Q1", "Q2", "Q3", "Q4"]:
+        rows.append({"corp_name": corp_name, "corp_code": str(corp_code).zfill(8), "year": year, "quarter": q}
+                    | {name: values[q] for name, values in columns.items()})
+    return pd.DataFrame(rows, columns=COL_ORDER)
+
+def quarter_tables_with_lineage(tasks: List[Tuple[Company, int]], fetch: Callable = fetch_report) -> List[pd.DataFrame]:
+    """연도 전체가 결측이고 lineage 적용 연도면 레거시 기업 공시로 다시 조회 (표시명/corp_code는 현재 기업)"""
+    tables = quarter_tables([(company.corp_name, company.corp_code, year) for company, year in tasks], fetch)
+    legacy = [i for i, (company, year) in enumerate(tasks)
+              if company.lineage and year <= company.lineage.until_year and tables[i][NUM_COLS].isna().all().all()]
+    for i in legacy:
+        if tasks[i][0].lineage.corp_code is None:
+            raise RuntimeError(f"legacy '{tasks[i][0].lineage.corp_name}' corp_code 미정의")
+    alts = quarter_tables([(tasks[i][0].lineage.corp_name, tasks[i][0].lineage.corp_code, tasks[i][1]) for i in legacy],
+                          fetch)
+    for i, alt in zip(legacy, alts):
+        alt["corp_name"] = tasks[i][0].corp_name
+        alt["corp_code"] = str(tasks[i][0].corp_code).zfill(8)
+        tables[i] = alt
+    return tables
+
+def yearly_quarter_table_with_lineage(company: Company, year: int, fetch: Callable = fetch_report) -> pd.DataFrame:
+    return quarter_tables_with_lineage([(company, year)], fetch)[0]
+
+# ==========================================
+# 체크포인트 / 동시 수집
+# ==========================================
+class Checkpoint:
+    """
+    (corp_code, year) 단위 수집 결과 기록: directory/{corp_code}.jsonl 한 줄 = 한 연도 4행
+    같은 연도가 여러 줄이면 마지막 줄 사용, 쓰다가 중단된 마지막 줄은 읽을 때 무시
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, corp_code: str) -> str:
+        return os.path.join(self.directory, f"{str(corp_code).zfill(8)}.jsonl")
+
+    def load(self, corp_code: str) -> Dict[int, list]:
+        """연도 → 행(dict) 목록"""
+        path = self._path(corp_code)
+        if not os.path.exists(path):
+            return {}
+        years = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                years[int(record["year"])] = record["rows"]
+        return years
+
+    def save(self, corp_code: str, year: int, df: pd.DataFrame):
+        rows = df.astype(object).where(df.notna(), None).to_dict("records")
+        line = json.dumps({"year": int(year), "rows": rows}, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self._path(corp_code), 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".jsonl"):
+                os.remove(os.path.join(self.directory, name))
+
+def collect_companies(companies: List[Company], start_year: int, end_year: int,
+                      workers: int = DEFAULT_WORKERS, checkpoint: Optional[Checkpoint] = None,
+                      cache: Optional[RawCache] = None) -> pd.DataFrame:
+    """
+    기업 목록 × 연도 수집 결과 (원본 dtype), (기업, 연도) 작업을 workers개 스레드로 동시 처리
+    checkpoint가 있으면 기록된 (기업, 연도)는 건너뛰고 새로 끝난 작업을 기록
+    (end_year와 조회 오류로 빈 보고서가 된 연도는 기록하지 않음)
+    cache가 있으면 받은 보고서 원본을 저장
+    일일 한도가 소진되면 남은 작업은 호출 없이 바로 실패하고, 끝난 작업까지 기록한 뒤 QuotaExhausted 발생
+    """
+    frames, tasks = [], []
+    for company in companies:
+        if company.corp_code is None:
+            print(f"{company.corp_name} - corp_code가 없음")
+            continue
+        done = checkpoint.load(company.corp_code) if checkpoint else {}
+        for year in range(start_year, end_year + 1):
+            if year in done and year < end_year:
+                frames.append(pd.DataFrame(done[year], columns=COL_ORDER))
+            else:
+                tasks.append((company, year))
+    if not tasks:
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COL_ORDER)
+
+    errors = FetchErrors()
+    fetch = errors.wrap(partial(fetch_report, cache=cache))
+    exhausted = None
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(yearly_quarter_table_with_lineage, company, year, fetch): (company, year)
+                   for company, year in tasks}
+        for future in as_completed(futures):
+            company, year = futures[future]
+            try:
+                df = future.result()
+            except QuotaExhausted as e:
+                exhausted = exhausted or e
+                continue
+            except Exception as e:
+                print(f"[warn] {company.corp_name} {year}: {e}")
+                continue
+            frames.append(df)
+            failed = errors.failed(company, year)
+            if failed:
+                print(f"[warn] {company.corp_name} {year}: 보고서 {len(failed)}건 조회 실패 ({failed[-1]}), "
+                      f"체크포인트에 기록하지 않음")
+            elif checkpoint and year < end_year:
+                checkpoint.save(company.corp_code, year, df)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    if exhausted is not None:
+        raise exhausted
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COL_ORDER)
+
+# ==========================================
+# 유니버스 청크 수집
+# ==========================================
+def collect_universe(companies: List[Company], out_dir: str, start_year: int = START_YEAR_LOAD,
+                     end_year: Optional[int] = None, max_quarter: Optional[int] = None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = DEFAULT_WORKERS,
+                     resume: bool = True) -> List[str]:
+    """
+    companies를 chunk_size개씩 수집 → 수집 범위로 자르고 압축 dtype으로 out_dir에 청크 파일 저장
+    end_year를 생략하면 현재 날짜 기준 공시된 분기까지 (collection_range)
+    resume=True면 out_dir/checkpoints에 기록된 (기업, 연도)는 다시 조회하지 않음
+    받은 보고서 원본은 out_dir/raw에 저장 (renormalize_universe로 API 없이 재정규화)
+    반환: 저장한 청크 파일 경로 목록 (panel.read_panel(out_dir)로 통합)
+    """
+    if end_year is None:
+        end_year, max_quarter = collection_range()
+    checkpoint = Checkpoint(os.path.join(out_dir, "checkpoints"))
+    cache = RawCache(os.path.join(out_dir, "raw"))
+    if not resume:
+        checkpoint.clear()
+    limiter = get_limiter()
+    calls_before, retries_before = limiter.calls, limiter.retries
+    paths = _write_parts(companies, out_dir, chunk_size, end_year, max_quarter,
+                         lambda chunk: collect_companies(chunk, start_year, end_year, workers, checkpoint, cache))
+    print(f"API 호출 {limiter.calls - calls_before:,}건 (재시도 {limiter.retries - retries_before:,}건)")
+    return paths
+
+def renormalize_universe(companies: List[Company], out_dir: str, start_year: int = START_YEAR_LOAD,
+                         end_year: Optional[int] = None, max_quarter: Optional[int] = None,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE, raw_dir: Optional[str] = None) -> List[str]:
+    """
+    원본 캐시(raw_dir, 기본 out_dir/raw)만으로 청크 파일을 다시 작성 (API 호출 없음)
+    현재 정규화 규칙으로 FS 판별/계정 매칭/분기 변환/라인리지 폴백을 다시 수행하고 체크포인트도 새 결과로 갱신
+    캐시에 없는 보고서가 있는 (기업, 연도)는 체크포인트를 갱신하지 않음
+    (기존 체크포인트가 있으면 그 행을 청크 파일에 그대로 쓰고, 없으면 빠진 보고서는 결측)
+    """
+    if end_year is None:
+        end_year, max_quarter = collection_range()
+    errors = FetchErrors()
+    fetch = errors.wrap(cached_report(RawCache(raw_dir or os.path.join(out_dir, "raw"))))
+    checkpoint = Checkpoint(os.path.join(out_dir, "checkpoints"))
+
+    def normalize(chunk: List[Company]) -> pd.DataFrame:
+        # 청크의 모든 보고서를 한 번에 정규화
+        tasks = [(company, year) for company in chunk if company.corp_code is not None
+                 for year in range(start_year, end_year + 1)]
+        frames = quarter_tables_with_lineage(tasks, fetch)
+        missing, done = 0, {}
+        for i, (company, year) in enumerate(tasks):
+            if errors.failed(company, year):
+                missing += 1
+                if company.corp_code not in done:
+                    done[company.corp_code] = checkpoint.load(company.corp_code)
+                if year in done[company.corp_code]:
+                    frames[i] = pd.DataFrame(done[company.corp_code][year], columns=COL_ORDER)
+            elif year < end_year:
+                checkpoint.save(company.corp_code, year, frames[i])
+        if missing:
+            print(f"[warn] 원본 캐시에 없는 보고서가 있는 (기업, 연도) {missing}개는 체크포인트를 갱신하지 않음")
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COL_ORDER)
+
+    return _write_parts(companies, out_dir, chunk_size, end_year, max_quarter, normalize)
+
+def _write_parts(companies: List[Company], out_dir: str, chunk_size: int, end_year: int,
+                 max_quarter: Optional[int], build: Callable[[List[Company]], pd.DataFrame]) -> List[str]:
+    """청크마다 build 결과를 수집 범위로 자르고 압축 dtype으로 저장 (금액은 원 단위가 정확한 float64)"""
+    # 청크 파일은 체크포인트/캐시로 다시 만들 수 있으므로 매번 새로 작성 (유니버스가 바뀌어도 섞이지 않음)
+    for path in panel_parts(out_dir):
+        os.remove(path)
+    paths = []
+    n_chunks = (len(companies) + chunk_size - 1) // chunk_size
+    for part, chunk in enumerate(tqdm(company_chunks(companies, chunk_size), total=n_chunks, desc="Company chunks")):
+        df = build(chunk)
+        if df.empty:
+            continue
+        df = trim_panel(compact_panel(df, amount_dtype=STORAGE_AMOUNT_DTYPE), end_year, max_quarter)
+        paths.append(write_panel_part(df, out_dir, part))
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="유니버스 기업의 DART 분기 재무 수집 (기업 청크 단위 저장)")
+    parser.add_argument('--universe', default=DEFAULT_UNIVERSE_PATH, help="대상 기업 설정 파일")
+    parser.add_argument('--out', default=os.path.join('dart_out', 'panel'), help="청크 파일 저장 폴더")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="청크당 기업 수")
+    parser.add_argument('--start-year', type=int, default=START_YEAR_LOAD)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="동시 작업 스레드 수")
+    parser.add_argument('--no-resume', action='store_true', help="체크포인트를 지우고 처음부터 수집")
+    parser.add_argument('--renormalize', action='store_true', help="API 호출 없이 원본 캐시만으로 패널 재생성")
+    parser.add_argument('--raw', default=None, help="원본 캐시 폴더 (기본: OUT/raw)")
+    args = parser.parse_args()
+
+    if not args.renormalize:
+        setup_api()
+    companies = resolve_corp_codes(load_universe(args.universe))
+    end_year, max_quarter = collection_range()
+    print(f"대상 기업 {len(companies)}개, 수집 범위: 2015년 Q4 ~ {end_year}년 Q{max_quarter or 4}")
+    if args.renormalize:
+        paths = renormalize_universe(companies, args.out, args.start_year, end_year, max_quarter, args.chunk_size,
+                                     args.raw)
+        print(f"원본 캐시로 청크 파일 {len(paths)}개 재작성: {args.out}")
+        return
+
+    try:
+        paths = collect_universe(companies, args.out, args.start_year, end_year, max_quarter, args.chunk_size,
+                                 args.workers, resume=not args.no_resume)
+    except QuotaExhausted as e:
+        print(f"{e} 수집한 (기업, 연도)는 체크포인트에 기록되었습니다. 한도가 초기화된 뒤 같은 명령으로 이어서 수집하세요.")
+        return
+    print(f"청크 파일 {len(paths)}개 저장: {args.out}")
+
+if __name__ == "__main__":
+    main()
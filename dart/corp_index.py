@@ -0,0 +1,147 @@
+"""
+DART 기업 코드 색인 (corp_list 전체를 한 번 순회해 디스크에 저장, 이후 조회는 dict 한 번)
+- stocks: 주식코드 → [corp_code, 현재 공식 명칭] (상장사)
+- names: 기업명 → corp_code (같은 이름이 여러 개면 상장사 우선)
+- lineage: 합병/사명변경 기업의 레거시 기업 (현재 주식코드 → 레거시 기업과 적용 마지막 연도)
+  예) DL이앤씨 ← 대림산업(2020년까지), HDC현대산업개발 ← 현대산업개발(2017년까지)
+저장 시각(built_at)이 ttl_days보다 오래되면 다시 만들고, 다시 만들 수 없으면(오프라인, API 키 없음)
+기존 파일을 그대로 사용하므로 한 번 만들어 두면 API 없이 앵커링 가능
+
+사용법:
+    from corp_index import load_corp_index
+    index = load_corp_index()                # dart_out/corp_index.json (7일 지나면 갱신)
+    index.by_stock("375500")                 # ('01524093', 'DL이앤씨')
+    index.by_name("대림산업")                 # 레거시 명칭도 lineage로 조회
+    python corp_index.py --refresh           # 강제 갱신
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dart_out', 'corp_index.json')
+DEFAULT_TTL_DAYS = float(os.getenv('DART_CORP_INDEX_TTL_DAYS', '7'))
+
+# 현재 기업 주식코드 → 레거시 기업 (노트북 LINEAGE_RULES + LEGACY_STOCK_ANCHOR)
+DEFAULT_LINEAGE = {
+    "375500": {"corp_name": "대림산업", "stock_code": "000210", "until_year": 2020},       # DL이앤씨
+    "294870": {"corp_name": "현대산업개발", "stock_code": "012630", "until_year": 2017},   # HDC현대산업개발
+}
+
+class CorpIndex:
+    """주식코드/기업명 → corp_code 색인 (조회는 모두 dict 한 번)"""
+
+    def __init__(self, stocks: Dict[str, list], names: Dict[str, str], lineage: Optional[Dict[str, dict]] = None,
+                 built_at: float = 0.0):
+        self.stocks = stocks
+        self.names = names
+        self.lineage = lineage or {}
+        self.built_at = built_at
+        self._legacy_names = {item['corp_name']: item for item in self.lineage.values()}
+
+    @classmethod
+    def from_corp_list(cls, corp_list, lineage: Optional[Dict[str, dict]] = None) -> 'CorpIndex':
+        """corp_list 한 번 순회로 색인 생성, lineage의 레거시 corp_code도 주식코드로 채움"""
+        stocks, names, listed = {}, {}, set()
+        for corp in corp_list:
+            corp_code = str(getattr(corp, 'corp_code')).zfill(8)
+            corp_name = getattr(corp, 'corp_name', '') or ''
+            stock_code = getattr(corp, 'stock_code', None)
+            if stock_code:
+                stocks[stock_code] = [corp_code, corp_name]
+            # 같은 이름은 상장사 우선, 그다음 먼저 나온 기업
+            if corp_name and (corp_name not in names or (stock_code and corp_name not in listed)):
+                names[corp_name] = corp_code
+                if stock_code:
+                    listed.add(corp_name)
+
+        resolved = {}
+        for stock_code, item in (DEFAULT_LINEAGE if lineage is None else lineage).items():
+            item = dict(item)
+            if item.get('stock_code') in stocks:
+                item['corp_code'] = stocks[item['stock_code']][0]
+            resolved[stock_code] = item
+        return cls(stocks, names, resolved, built_at=time.time())
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH) -> 'CorpIndex':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['stocks'], data['names'], data.get('lineage'), data.get('built_at', 0.0))
+
+    def save(self, path: str = DEFAULT_INDEX_PATH) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'built_at': self.built_at, 'stocks': self.stocks, 'names': self.names,
+                       'lineage': self.lineage}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)  # 쓰는 도중 중단돼도 기존 색인 유지
+        return path
+
+    def age_days(self) -> float:
+        return (time.time() - self.built_at) / 86400
+
+    def by_stock(self, stock_code: str) -> Optional[Tuple[str, str]]:
+        """주식코드 → (corp_code, 현재 공식 명칭)"""
+        item = self.stocks.get(stock_code)
+        return None if item is None else (item[0], item[1])
+
+    def by_name(self, corp_name: str) -> Optional[str]:
+        """기업명 → corp_code (현재 명칭에 없으면 lineage의 레거시 명칭)"""
+        corp_code = self.names.get(corp_name)
+        if corp_code is None and corp_name in self._legacy_names:
+            corp_code = self._legacy_names[corp_name].get('corp_code')
+        return corp_code
+
+    def lineage_of(self, stock_code: str) -> Optional[dict]:
+        """현재 기업 주식코드 → 레거시 기업 {corp_name, stock_code, until_year, corp_code}"""
+        return self.lineage.get(stock_code)
+
+    def listed(self) -> List[Tuple[str, str, str]]:
+        """상장사 (stock_code, corp_code, corp_name) 목록"""
+        return [(stock_code, item[0], item[1]) for stock_code, item in self.stocks.items()]
+
+def build_corp_index(corp_list=None, lineage: Optional[Dict[str, dict]] = None) -> CorpIndex:
+    if corp_list is None:
+        import dart_fss as dart
+        corp_list = dart.get_corp_list()
+    return CorpIndex.from_corp_list(corp_list, lineage)
+
+def load_corp_index(path: str = DEFAULT_INDEX_PATH, ttl_days: float = DEFAULT_TTL_DAYS, refresh: bool = False,
+                    corp_list=None) -> CorpIndex:
+    """
+    저장된 색인이 ttl_days 이내면 그대로 사용, 없거나 오래됐으면 corp_list로 다시 만들어 저장
+    다시 만들지 못하면 오래된 색인이라도 사용 (경고 출력), 저장된 색인도 없으면 오류
+    """
+    index = CorpIndex.load(path) if os.path.exists(path) else None
+    if index is not None and not refresh and index.age_days() <= ttl_days:
+        return index
+    try:
+        fresh = build_corp_index(corp_list)
+    except Exception as e:
+        if index is None:
+            raise
+        print(f"[warn] 기업 코드 색인 갱신 실패, {index.age_days():.0f}일 전 색인 사용: {e}")
+        return index
+    fresh.save(path)
+    return fresh
+
+def main():
+    parser = argparse.ArgumentParser(description="DART 기업 코드 색인 생성/확인")
+    parser.add_argument('--path', default=DEFAULT_INDEX_PATH)
+    parser.add_argument('--refresh', action='store_true', help="TTL과 관계없이 다시 생성")
+    args = parser.parse_args()
+
+    from collector import setup_api
+    try:
+        setup_api()
+    except RuntimeError as e:
+        print(f"[warn] {e} 저장된 색인만 사용합니다.")
+    index = load_corp_index(args.path, refresh=args.refresh)
+    print(f"상장사 {len(index.stocks):,}개, 기업명 {len(index.names):,}개, lineage {len(index.lineage)}개 "
+          f"({index.age_days():.1f}일 전 생성): {args.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+DART 보고서 계정 정규화 (dart_fss 없이 사용 가능, collector.py에서 사용)
+여러 보고서의 계정 행을 한 DataFrame으로 모아 한 번에 처리 (보고서/행마다 Python 문자열 처리하지 않음)
+
+- clean_account_names: 계정명은 종류가 적으므로 고유값만 pandas 문자열 연산으로 정리하고 결과를 메모이즈
+- account_lookup: 정리된 계정명 → 타겟 계정 dict (TARGET_ACCOUNTS에서 생성, 호출마다 현재 매핑 반영)
+- parse_amounts: 쉼표 제거, 괄호 음수 '(1,234)' → -1234, 빈 값/'-' → NaN을 컬럼 단위로 변환
+- extract_targets: 보고서별 타겟 계정 값 (재무상태 항목은 BS, 손익 항목은 IS/CIS에서만, ord가 가장 앞선 행)
+clean_account_name / parse_amount는 같은 규칙의 단일 값 버전
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+NOTE_TAIL = re.compile(r"\s*\([^)]*\)\s*\)*\s*$")
+MULTISPACE = re.compile(r"\s+")
+
+TARGET_ACCOUNTS = {
+    "자산총계": ["자산총계", "총자산"],
+    "부채총계": ["부채총계", "총부채"],
+    "자본총계": ["자본총계", "총자본", "자본총계(지배+비지배)"],
+    # 손익(가능하면 보수적으로 우선순위)
+    "매출액": ["매출액", "매출", "매출수익", "영업수익", "수익"],
+    "영업이익": ["영업이익", "영업손익"],
+    "당기순이익": ["분기순이익", "당기순이익", "반기순이익"],
+}
+# 타겟 계정별 허용 재무제표 (재무상태표: BS, 손익: IS/CIS)
+STATEMENTS = {
+    "자산총계": ("BS",), "부채총계": ("BS",), "자본총계": ("BS",),
+    "매출액": ("IS", "CIS"), "영업이익": ("IS", "CIS"), "당기순이익": ("IS", "CIS"),
+}
+EMPTY_AMOUNTS = ["", "-", "None", "nan"]
+
+def clean_account_name(s: str) -> str:
+    if not isinstance(s, str):
+        return s
+    s = s.strip()
+    s = s.replace("수익 (매출액)", "매출액")
+    s = NOTE_TAIL.sub("", s)
+    s = MULTISPACE.sub(" ", s)
+    s = s.replace("영업이익(손실)", "영업이익")
+    s = s.replace("분기(중간)순이익", "분기순이익")
+    s = s.replace("당기순이익(손실)", "당기순이익")
+    return s
+
+def parse_amount(x):
+    if x is None:
+        return None
+    if isinstance(x, (int, float)):
+        return float(x)
+    s = str(x).strip()
+    if s in EMPTY_AMOUNTS:
+        return None
+    s = s.replace(",", "")
+    if s.startswith("(") and s.endswith(")"):  # (1,234) → -1234
+        s = "-" + s[1:-1]
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+# 원본 계정명 → 정리된 계정명 (프로세스 전체 메모이즈, 수집 워커 스레드가 함께 사용)
+_clean_cache: Dict[str, str] = {}
+_clean_lock = threading.Lock()
+
+def _clean_unique(names: pd.Index) -> pd.Index:
+    """clean_account_name과 같은 규칙을 고유 계정명 전체에 한 번에 적용"""
+    s = pd.Series(names, dtype=object).str.strip()
+    s = s.str.replace("수익 (매출액)", "매출액", regex=False)
+    s = s.str.replace(NOTE_TAIL, "", regex=True)
+    s = s.str.replace(MULTISPACE, " ", regex=True)
+    s = s.str.replace("영업이익(손실)", "영업이익", regex=False)
+    s = s.str.replace("분기(중간)순이익", "분기순이익", regex=False)
+    s = s.str.replace("당기순이익(손실)", "당기순이익", regex=False)
+    return pd.Index(s, dtype=object)
+
+def clean_account_names(names: pd.Series) -> pd.Series:
+    """계정명 컬럼 정리 (문자열로 변환 후 고유값만 정리, 처음 보는 계정명만 문자열 연산)"""
+    codes, uniques = pd.factorize(names.astype(str))
+    with _clean_lock:
+        cached = [_clean_cache.get(name) for name in uniques]
+    missing = [name for name, value in zip(uniques, cached) if value is None]
+    if missing:
+        cleaned = dict(zip(missing, _clean_unique(pd.Index(missing, dtype=object))))
+        with _clean_lock:
+            _clean_cache.update(cleaned)
+        cached = [cleaned.get(name, value) for name, value in zip(uniques, cached)]
+    values = np.asarray(cached, dtype=object)[codes]
+    return pd.Series(values, index=names.index, dtype=object)
+
+def account_lookup(targets: Optional[Dict[str, Sequence[str]]] = None) -> Dict[str, str]:
+    """정리된 계정명 → 타겟 계정 (targets 생략 시 현재 TARGET_ACCOUNTS)"""
+    targets = TARGET_ACCOUNTS if targets is None else targets
+    return {alias: target for target, aliases in targets.items() for alias in aliases}
+
+def parse_amounts(values: pd.Series) -> pd.Series:
+    """금액 컬럼 → float64 (쉼표, 괄호 음수 처리, 빈 값/변환 불가는 NaN)"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(np.float64)
+    s = values.astype(object).where(values.notna(), None)
+    numeric = s.map(lambda x: isinstance(x, (int, float)) and not isinstance(x, bool))
+    text = s[~numeric & s.notna()].astype(str).str.strip().str.replace(",", "", regex=False)
+    text = text.str.replace(r"^\((.*)\)$", r"-\1", regex=True)  # (1234) → -1234
+    result = pd.Series(np.nan, index=values.index)
+    result[numeric] = s[numeric].astype(np.float64)
+    result[text.index] = pd.to_numeric(text.where(~text.isin(EMPTY_AMOUNTS)), errors='coerce')
+    return result
+
+def frame_reports(reports: Sequence[list]) -> pd.DataFrame:
+    """보고서별 계정 목록 → 한 DataFrame (report 컬럼: reports의 순번)"""
+    lengths = [len(items) for items in reports]
+    rows = [item for items in reports for item in items]
+    df = pd.DataFrame.from_records(rows) if rows else pd.DataFrame()
+    df["report"] = np.repeat(np.arange(len(reports)), lengths)
+    return df
+
+def extract_targets(df: pd.DataFrame, n_reports: int,
+                    targets: Optional[Dict[str, Sequence[str]]] = None) -> pd.DataFrame:
+    """
+    frame_reports 결과 → 보고서(행) × 타겟 계정 값 + report_date(thstrm_dt 첫 값, 없으면 None)
+    타겟 계정마다 허용 재무제표의 후보 계정 중 ord가 가장 앞선 행 하나를 사용하고,
+    그 행의 thstrm_add_amount(분기금액)가 있으면 우선, 없으면 thstrm_amount(누적금액)
+    """
+    targets = TARGET_ACCOUNTS if targets is None else targets
+    out = pd.DataFrame(index=pd.RangeIndex(n_reports), columns=list(targets) + ["report_date"], dtype=object)
+    if df.empty or "account_nm" not in df.columns:
+        return out
+
+    if "thstrm_dt" in df.columns:
+        dates = df.loc[df["thstrm_dt"].notna(), ["report", "thstrm_dt"]].drop_duplicates("report")
+        out.loc[dates["report"].to_numpy(), "report_date"] = dates["thstrm_dt"].astype(str).to_numpy()
+
+    target = clean_account_names(df["account_nm"]).map(account_lookup(targets))
+    sj_div = df["sj_div"] if "sj_div" in df.columns else pd.Series(None, index=df.index, dtype=object)
+    allowed = pd.Series(False, index=df.index)
+    for name in targets:
+        statements = STATEMENTS.get(name, ("IS", "CIS", "BS"))
+        allowed |= (target == name) & sj_div.isin(statements)
+    picked = df[allowed].assign(target=target[allowed])
+    if picked.empty:
+        return out
+
+    # 보고서 × 타겟 계정별 첫 행 (ord 순, 같으면 원래 순서)
+    sort_cols = ["report", "target"] + (["ord"] if "ord" in picked.columns else [])
+    picked = picked.sort_values(sort_cols, kind="stable").drop_duplicates(["report", "target"])
+
+    amount = pd.Series(np.nan, index=picked.index)
+    if "thstrm_amount" in picked.columns:
+        amount = parse_amounts(picked["thstrm_amount"])
+    if "thstrm_add_amount" in picked.columns:
+        added = parse_amounts(picked["thstrm_add_amount"])
+        amount = added.where(added.notna(), amount)
+    values = amount.astype(object).where(amount.notna(), None)
+    for name, rows in picked.groupby("target", sort=False).groups.items():
+        out.loc[picked.loc[rows, "report"].to_numpy(), name] = values[rows].to_numpy()
+    return out
+
+def parse_reports(reports: Sequence[list], years: Sequence[int], reprt_codes: Sequence[str],
+                  q_end: Dict[str, str]) -> List[dict]:
+    """보고서 여러 개를 한 번에 정규화 → 보고서마다 {타겟 계정: 값, report_date} (report_date 없으면 분기말)"""
+    out = extract_targets(frame_reports(reports), len(reports))
+    records = out.astype(object).where(out.notna(), None).to_dict("records")
+    for record, year, reprt_code in zip(records, years, reprt_codes):
+        if record["report_date"] is None:
+            record["report_date"] = f"{year}{q_end[reprt_code]}"
+    return records
@@ -0,0 +1,156 @@
+"""
+DART 분기 재무 패널 스키마와 저장 형식 (dart_fss 없이 사용 가능, Heuristic/incremental_scoring.py에서도 사용)
+- compact_panel: corp_code/corp_name은 category, year/quarter는 int16(분기는 1~4), 재무 금액은 float32
+  (object 문자열 + float64 대비 행당 메모리 약 1/4, 위험점수 계산용 인메모리 패널)
+- 청크 파일(기록 원본, CSV/DB로 나가는 값)은 재무 금액을 float64로 저장: 원 단위 금액은 float32 유효숫자(약 7자리)를
+  넘어 20,123,456,789,012가 20,123,456,897,024가 되지만 float64는 2^53(약 9천조)까지 정확
+- expand_panel: 압축 패널 → 기존 CSV/DB 형식 (문자열 분기 'Q1'~'Q4')
+- trim_panel: 수집 범위 밖 분기 제거 (노트북의 2015 Q1~Q3 / 미공시 분기 마스크를 분기 코드 비교 한 번으로)
+- write_panel_part / read_panel: 기업 청크별 parquet 파일로 저장하고 필요한 기업/컬럼만 다시 읽기
+"""
+
+import glob
+import os
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+QUARTERS = ['Q1', 'Q2', 'Q3', 'Q4']
+NUM_COLS = ["자산총계", "부채총계", "자본총계", "매출액", "영업이익", "분기순이익"]
+COL_ORDER = ["corp_name", "corp_code", "year", "quarter", "report_date"] + NUM_COLS
+# dart_data 테이블 컬럼명 (DB 조회 결과도 같은 규칙으로 압축)
+DB_NUM_COLS = ['total_assets', 'total_liabilities', 'total_equity', 'revenue', 'operating_profit', 'quarterly_profit']
+KEY_COLS = ['corp_code', 'year', 'quarter']
+
+# 재무 금액 dtype: 인메모리 계산용 / 청크 파일 저장용(원 단위 정확)
+AMOUNT_DTYPE = np.float32
+STORAGE_AMOUNT_DTYPE = np.float64
+
+# 수집 시작 분기 (2014년부터 로드해 2015년 Q4부터 사용)
+FIRST_YEAR, FIRST_QUARTER = 2015, 4
+
+def quarter_numbers(quarter) -> np.ndarray:
+    """'Q1'~'Q4' 문자열, Categorical, 정수 분기 → 1~4 (int16)"""
+    quarter = pd.Series(quarter)
+    if isinstance(quarter.dtype, pd.CategoricalDtype):
+        quarter = quarter.astype(str)
+    if pd.api.types.is_numeric_dtype(quarter):
+        return quarter.to_numpy(dtype=np.int16)
+    codes = pd.Categorical(quarter, categories=QUARTERS).codes
+    if (codes < 0).any():
+        raise ValueError(f"알 수 없는 분기 값: {sorted(set(quarter[codes < 0]))}")
+    return (codes + 1).astype(np.int16)
+
+def quarter_labels(quarter) -> pd.Categorical:
+    """1~4 (또는 'Qn') → 'Q1'~'Q4' Categorical (DB 저장/표시용)"""
+    return pd.Categorical.from_codes(quarter_numbers(quarter) - 1, QUARTERS)
+
+def period_codes(year, quarter) -> np.ndarray:
+    """연도 × 4 + (분기 - 1): 분기 순서 비교/조인용 정수 키"""
+    return np.asarray(year, dtype=np.int64) * 4 + quarter_numbers(quarter).astype(np.int64) - 1
+
+def _categorical(values: pd.Series, zfill: Optional[int] = None) -> pd.Categorical:
+    """고유값만 문자열 변환(+ zfill)해 Categorical 생성 (행마다 문자열 연산하지 않음)"""
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Index(uniques).astype(str)
+    if zfill:
+        uniques = uniques.str.zfill(zfill)
+    # zfill 후 같아진 값('123', '00000123')은 하나의 범주로
+    categories, inverse = np.unique(np.asarray(uniques, dtype=object), return_inverse=True)
+    codes = np.where(codes >= 0, inverse[np.maximum(codes, 0)], -1)
+    return pd.Categorical.from_codes(codes, categories)
+
+def compact_panel(df: pd.DataFrame, copy: bool = True, amount_dtype=AMOUNT_DTYPE) -> pd.DataFrame:
+    """
+    패널 dtype 압축 (컬럼이 있는 것만)
+    corp_code/corp_name → category, year/quarter → int16, 재무 금액 → amount_dtype(기본 float32), report_date → datetime64
+    """
+    df = df.copy() if copy else df
+    for column in ['corp_code', 'corp_name']:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = _categorical(df[column], zfill=8 if column == 'corp_code' else None)
+    if 'year' in df.columns:
+        df['year'] = pd.to_numeric(df['year']).astype(np.int16)
+    if 'quarter' in df.columns:
+        df['quarter'] = quarter_numbers(df['quarter'])
+    if 'report_date' in df.columns:
+        df['report_date'] = pd.to_datetime(df['report_date'], errors='coerce')
+    for column in NUM_COLS + DB_NUM_COLS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype(amount_dtype)
+    return df
+
+def expand_panel(df: pd.DataFrame) -> pd.DataFrame:
+    """압축 패널 → 기존 CSV/DB 형식 (corp_code/corp_name 문자열, quarter 'Q1'~'Q4', COL_ORDER 순서)"""
+    df = df.copy()
+    for column in ['corp_code', 'corp_name']:
+        if column in df.columns:
+            df[column] = df[column].astype(str)
+    if 'quarter' in df.columns:
+        df['quarter'] = np.asarray(QUARTERS)[quarter_numbers(df['quarter']) - 1]
+    if 'year' in df.columns:
+        df['year'] = df['year'].astype(np.int64)
+    return df[[column for column in COL_ORDER if column in df.columns]
+              + [column for column in df.columns if column not in COL_ORDER]]
+
+def trim_panel(df: pd.DataFrame, end_year: int, max_quarter: Optional[int] = None,
+               first_year: int = FIRST_YEAR, first_quarter: int = FIRST_QUARTER) -> pd.DataFrame:
+    """[first_year Q first_quarter, end_year Q max_quarter] 밖의 분기 제거 (max_quarter=None이면 end_year Q4까지)"""
+    period = period_codes(df['year'], df['quarter'])
+    first = first_year * 4 + first_quarter - 1
+    last = end_year * 4 + (max_quarter or 4) - 1
+    return df[(period >= first) & (period <= last)].reset_index(drop=True)
+
+def panel_memory(df: pd.DataFrame) -> int:
+    """패널 메모리 사용량 (바이트, 문자열 포함)"""
+    return int(df.memory_usage(deep=True).sum())
+
+def _float32_amounts(df: pd.DataFrame) -> list:
+    return [column for column in NUM_COLS + DB_NUM_COLS if column in df.columns and df[column].dtype == np.float32]
+
+def write_panel_part(df: pd.DataFrame, out_dir: str, part: int) -> str:
+    """
+    청크 결과를 out_dir/panel_part_{part:05d}.parquet으로 저장 (압축 dtype, 재무 금액은 float64)
+    이미 float32로 줄인 금액은 원래 값을 복원할 수 없으므로 오류
+    """
+    lossy = _float32_amounts(df)
+    if lossy:
+        raise ValueError(f"float32 금액은 원 단위 값이 손실되어 저장할 수 없습니다: {lossy} "
+                         f"(compact_panel(df, amount_dtype=STORAGE_AMOUNT_DTYPE) 사용)")
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"panel_part_{part:05d}.parquet")
+    compact_panel(df, amount_dtype=STORAGE_AMOUNT_DTYPE).to_parquet(path, index=False)
+    return path
+
+def panel_parts(out_dir: str) -> list:
+    return sorted(glob.glob(os.path.join(out_dir, "panel_part_*.parquet")))
+
+def read_panel(out_dir: str, columns: Optional[Sequence[str]] = None,
+               corp_codes: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    청크 파일을 하나의 압축 패널로 (corp_codes가 있으면 해당 기업 행만, 파일 단위로 걸러 메모리 제한)
+    category 컬럼은 파일마다 범주가 달라 union_categoricals로 합침
+    이전 버전이 float32 금액으로 저장한 파일이면 경고 (CSV/DB로 내보내기 전에 collector.py --renormalize로 다시 생성)
+    """
+    wanted = None if corp_codes is None else set(corp_codes)
+    frames = []
+    for path in panel_parts(out_dir):
+        part = pd.read_parquet(path, columns=columns)
+        if wanted is not None:
+            part = part[part['corp_code'].astype(str).isin(wanted)]
+        if len(part):
+            frames.append(part)
+    if not frames:
+        return pd.DataFrame(columns=columns or COL_ORDER)
+    categorical = [column for column in ['corp_code', 'corp_name'] if column in frames[0].columns]
+    combined = {column: pd.api.types.union_categoricals([frame[column] for frame in frames])
+                for column in categorical}
+    lossy = _float32_amounts(frames[0])
+    if lossy:
+        print(f"[warn] {out_dir}의 청크 파일 금액이 float32입니다 ({', '.join(lossy)}). 원 단위 값이 손실되어 있으므로 "
+              f"CSV/DB로 내보내기 전에 `python collector.py --renormalize`로 다시 생성하세요.")
+    result = pd.concat([frame.drop(columns=categorical) for frame in frames], ignore_index=True)
+    for column in categorical:
+        result[column] = combined[column]
+    return result[[column for column in frames[0].columns]]
@@ -0,0 +1,128 @@
+"""
+OpenDART 호출 한도 관리 (프로세스 전체가 공유하는 토큰 버킷 + 일일 한도 + 재시도)
+- 분당 호출 수(DART_CALLS_PER_MINUTE, 기본 600)를 토큰 버킷으로 제한, 버스트는 DART_BURST(기본 10)
+- 일일 한도(DART_DAILY_LIMIT, 기본 20,000 — 개인 인증키 기준)에 도달하거나 OpenDART가 한도 초과(status 020)로
+  응답하면 QuotaExhausted (020은 재시도해도 다음 날까지 풀리지 않으므로 이후 호출도 보내지 않음)
+- 점검(800), 연결 오류/타임아웃은 지수 백오프(+지터) 후 재시도, 데이터 없음(013)은 None
+워커가 몇 개든 모든 호출이 같은 버킷을 거치므로 수집 시간은 호출 지연이 아니라 한도로 정해짐
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+import requests
+
+try:
+    from dart_fss import errors as dart_errors
+except ImportError:
+    dart_errors = None
+
+CALLS_PER_MINUTE = float(os.getenv('DART_CALLS_PER_MINUTE', '600'))
+BURST = int(os.getenv('DART_BURST', '10'))
+DAILY_LIMIT = int(os.getenv('DART_DAILY_LIMIT', '20000'))
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0   # 초, 재시도마다 2배
+BACKOFF_MAX = 60.0
+
+def _dart_error(name: str) -> tuple:
+    error = getattr(dart_errors, name, None) if dart_errors is not None else None
+    return (error,) if isinstance(error, type) else ()
+
+# 잠시 후 다시 시도할 오류 (서비스 점검, 네트워크)
+RETRY_ERRORS = (_dart_error('ServiceClose')
+                + (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+# 호출 한도 초과 (status 020, QuotaExhausted로 바꿔 발생)
+QUOTA_ERRORS = _dart_error('OverQueryLimit')
+# 조회 결과 없음 (빈 응답으로 처리)
+NO_DATA_ERRORS = _dart_error('NoDataReceived')
+
+class QuotaExhausted(RuntimeError):
+    """일일 호출 한도 소진 (체크포인트 이후 다음 날 이어서 수집)"""
+
+class TokenBucket:
+    """rate개/초로 채워지는 capacity개 토큰 버킷 (스레드 안전, acquire는 토큰이 생길 때까지 대기)"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class RateLimiter:
+    """분당 한도 토큰 버킷 + 일일 호출 수 (calls는 이 프로세스에서 보낸 호출 수)"""
+
+    def __init__(self, calls_per_minute: float = CALLS_PER_MINUTE, burst: int = BURST,
+                 daily_limit: int = DAILY_LIMIT):
+        self.bucket = TokenBucket(calls_per_minute / 60.0, burst)
+        self.daily_limit = daily_limit
+        self.calls = 0
+        self.retries = 0
+        self.exhausted = False  # OpenDART가 한도 초과(020)로 응답함
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self.exhausted:
+                raise QuotaExhausted("OpenDART 호출 한도를 초과했습니다 (status 020).")
+            if self.calls >= self.daily_limit:
+                raise QuotaExhausted(f"일일 호출 한도({self.daily_limit:,}건)를 모두 사용했습니다.")
+            self.calls += 1
+        self.bucket.acquire()
+
+    def call(self, func: Callable, *args, max_retries: int = MAX_RETRIES, **kwargs):
+        """
+        한도 안에서 func 호출, 재시도 대상 오류는 지수 백오프 후 재시도
+        데이터 없음 오류는 None 반환, 재시도를 모두 실패하면 마지막 오류를 그대로 발생
+        한도 초과(020) 응답은 QuotaExhausted로 발생시키고 이후 호출은 보내지 않음
+        """
+        for attempt in range(max_retries + 1):
+            self.acquire()
+            try:
+                return func(*args, **kwargs)
+            except NO_DATA_ERRORS:
+                return None
+            except QUOTA_ERRORS as e:
+                with self._lock:
+                    self.exhausted = True
+                raise QuotaExhausted(f"OpenDART 호출 한도를 초과했습니다 (status 020): {e}") from e
+            except RETRY_ERRORS:
+                if attempt == max_retries:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+
+# 프로세스 공유 한도 (collector/universe의 모든 API 호출이 사용)
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+def get_limiter() -> RateLimiter:
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+def set_limiter(limiter: RateLimiter) -> RateLimiter:
+    """한도 설정 교체 (예: 법인 인증키의 더 큰 한도)"""
+    global _limiter
+    with _limiter_lock:
+        _limiter = limiter
+    return limiter
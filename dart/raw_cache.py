@@ -0,0 +1,97 @@
+"""
+DART 원본 보고서 응답 캐시 (dart_fss 없이 사용 가능)
+정규화(normalize.py의 TARGET_ACCOUNTS, 계정명 정리, 금액 변환)를 바꿔도 다시 내려받지 않고 캐시만으로 패널 재생성
+
+- objects/{해시 앞 2자리}/{sha256}.json.gz: 응답 계정 목록을 컬럼 단위({컬럼: [값, ...]})로 gzip 압축 저장
+  내용 주소(content-addressed)라 같은 응답(데이터 없음 포함)은 한 번만 저장, 다시 받아도 내용이 같으면 용량 그대로
+- index/{corp_code}.jsonl: (year, reprt_code, fs_div) → 해시, 같은 키는 마지막 줄 사용
+  데이터 없음(빈 목록)도 기록하므로 CFS/OFS 판별을 캐시만으로 재현 가능
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+Key = Tuple[int, str, str]  # (year, reprt_code, fs_div)
+
+def _columnar(items: list) -> dict:
+    columns = []
+    for item in items:
+        for column in item:
+            if column not in columns:
+                columns.append(column)
+    return {column: [item.get(column) for item in items] for column in columns}
+
+def _rows(data: dict) -> list:
+    columns = list(data)
+    n = len(data[columns[0]]) if columns else 0
+    return [{column: data[column][i] for column in columns} for i in range(n)]
+
+class RawCache:
+    """(corp_code, year, reprt_code, fs_div) → 원본 계정 목록, 스레드 안전"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, Dict[Key, str]] = {}
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "index"), exist_ok=True)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], f"{digest}.json.gz")
+
+    def _index_path(self, corp_code: str) -> str:
+        return os.path.join(self.directory, "index", f"{str(corp_code).zfill(8)}.jsonl")
+
+    def _index(self, corp_code: str) -> Dict[Key, str]:
+        corp_code = str(corp_code).zfill(8)
+        if corp_code not in self._indexes:
+            index = {}
+            path = self._index_path(corp_code)
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        index[(int(record["year"]), record["reprt_code"], record["fs_div"])] = record["hash"]
+            self._indexes[corp_code] = index
+        return self._indexes[corp_code]
+
+    def put(self, corp_code: str, year: int, reprt_code: str, fs_div: str, items: list) -> str:
+        """응답 저장, 반환: 내용 해시"""
+        data = json.dumps(_columnar(items or []), ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        key = (int(year), reprt_code, fs_div)
+        with self._lock:
+            index = self._index(corp_code)
+            if index.get(key) != digest:
+                index[key] = digest
+                with open(self._index_path(corp_code), 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({"year": key[0], "reprt_code": reprt_code, "fs_div": fs_div,
+                                        "hash": digest}) + "\n")
+        return digest
+
+    def get(self, corp_code: str, year: int, reprt_code: str, fs_div: str) -> Optional[list]:
+        """캐시된 응답 (없으면 None, 데이터 없음 응답은 빈 목록)"""
+        with self._lock:
+            digest = self._index(corp_code).get((int(year), reprt_code, fs_div))
+        if digest is None:
+            return None
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return _rows(json.loads(f.read().decode('utf-8')))
+
+    def corp_codes(self) -> list:
+        return sorted(name[:-len(".jsonl")] for name in os.listdir(os.path.join(self.directory, "index"))
+                      if name.endswith(".jsonl"))
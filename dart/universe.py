@@ -0,0 +1,148 @@
+"""
+DART 수집 대상 기업 유니버스
+노트북의 고정 목록(TARGET_NAMES, COMPANIES_11_21, COMPANIES_22_32 + 그룹별 주식코드 앵커) 대신
+설정 파일(universe.json) 또는 업종 코드(KSIC) 조회로 대상 기업을 정의
+
+- companies: 표시명 + 주식코드 (+ corp_code, 합병/사명변경 기업은 lineage: 레거시 기업과 적용 마지막 연도)
+- ksic_codes: 지정하면 해당 업종 코드(앞자리 일치)의 상장사(markets: Y 유가증권, K 코스닥)를 조회해 추가
+- corp_code가 없는 기업은 저장된 기업 코드 색인(corp_index.py)에서 주식코드로 조회 (corp_list 순회 없음, 오프라인 가능)
+- lineage가 없는 기업도 색인의 lineage 표에 있으면 레거시 기업을 붙임 (KSIC 조회로 추가된 DL이앤씨 등)
+
+사용법:
+    from universe import load_universe, resolve_corp_codes, company_chunks
+    companies = resolve_corp_codes(load_universe())          # 기본 설정 (건설업 32개 기업)
+    python universe.py --ksic 41 42 --out universe_ksic.json  # 종합건설업/전문직별 공사업 상장사 전체
+"""
+
+import argparse
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from corp_index import CorpIndex, load_corp_index
+from rate_limit import QuotaExhausted, get_limiter
+
+DEFAULT_UNIVERSE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'universe.json')
+DEFAULT_MARKETS = ('Y', 'K')
+
+@dataclass
+class Lineage:
+    """레거시 기업 (until_year까지는 이 기업의 공시로 대신 조회)"""
+    corp_name: str
+    stock_code: Optional[str]
+    until_year: int
+    corp_code: Optional[str] = None
+
+@dataclass
+class Company:
+    corp_name: str
+    stock_code: Optional[str] = None
+    corp_code: Optional[str] = None
+    lineage: Optional[Lineage] = None
+    induty_code: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Company':
+        lineage = data.get('lineage')
+        return cls(
+            corp_name=data['corp_name'],
+            stock_code=data.get('stock_code'),
+            corp_code=None if data.get('corp_code') is None else str(data['corp_code']).zfill(8),
+            lineage=None if lineage is None else Lineage(**lineage),
+            induty_code=data.get('induty_code'),
+        )
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        return {key: value for key, value in data.items() if value is not None}
+
+def query_universe(ksic_codes: Sequence[str], markets: Sequence[str] = DEFAULT_MARKETS,
+                   index: Optional[CorpIndex] = None) -> List[Company]:
+    """
+    업종 코드(induty_code 앞자리)가 ksic_codes 중 하나로 시작하는 상장사 목록
+    상장사마다 기업개황(company.json)을 한 번씩 조회(공유 호출 한도 적용)하므로 결과는 save_universe로 저장해 재사용
+    """
+    from dart_fss.api.filings import get_corp_info
+
+    prefixes = tuple(str(code) for code in ksic_codes)
+    index = load_corp_index() if index is None else index
+    companies = []
+    for stock_code, corp_code, corp_name in index.listed():
+        try:
+            info = get_limiter().call(get_corp_info, corp_code) or {}
+        except QuotaExhausted:
+            raise
+        except Exception as e:
+            print(f"[warn] 기업개황 조회 실패 {corp_name}: {e}")
+            continue
+        induty_code = str(info.get('induty_code') or '')
+        if info.get('corp_cls') in markets and induty_code.startswith(prefixes):
+            companies.append(Company(corp_name=info.get('corp_name') or corp_name, stock_code=stock_code,
+                                     corp_code=corp_code, induty_code=induty_code))
+    return companies
+
+def load_universe(path: str = DEFAULT_UNIVERSE_PATH, index: Optional[CorpIndex] = None) -> List[Company]:
+    """설정 파일의 기업 목록 (+ ksic_codes 조회 결과 중 목록에 없는 기업), 주식코드/corp_code 기준 중복 제거"""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    companies = [Company.from_dict(item) for item in config.get('companies', [])]
+    if config.get('ksic_codes'):
+        companies += query_universe(config['ksic_codes'], config.get('markets', DEFAULT_MARKETS), index)
+
+    seen, unique = set(), []
+    for company in companies:
+        key = company.stock_code or company.corp_code or company.corp_name
+        if key not in seen:
+            seen.add(key)
+            unique.append(company)
+    return unique
+
+def save_universe(companies: Iterable[Company], path: str, description: str = '') -> str:
+    config = {'description': description, 'ksic_codes': [], 'companies': [c.to_dict() for c in companies]}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False, indent=1)
+    return path
+
+def resolve_corp_codes(companies: List[Company], index: Optional[CorpIndex] = None) -> List[Company]:
+    """
+    주식코드가 있는 기업(레거시 포함)의 corp_code를 기업 코드 색인 기준으로 고정 (노트북의 주식코드 앵커링)
+    주식코드가 없으면 기업명으로 조회, 매핑되지 않는 기업은 경고만 출력하고 기존 corp_code 유지
+    """
+    index = load_corp_index() if index is None else index
+    for company in companies:
+        if company.lineage is None and company.stock_code:
+            legacy = index.lineage_of(company.stock_code)
+            if legacy is not None:
+                company.lineage = Lineage(legacy['corp_name'], legacy.get('stock_code'), legacy['until_year'],
+                                          legacy.get('corp_code'))
+        for ref in [company] + ([company.lineage] if company.lineage else []):
+            if ref.stock_code:
+                found = index.by_stock(ref.stock_code)
+                if found is not None:
+                    ref.corp_code = found[0]
+                else:
+                    print(f"[warn] stock_code '{ref.stock_code}' ({ref.corp_name}) 회사를 찾지 못했습니다.")
+            elif ref.corp_code is None:
+                ref.corp_code = index.by_name(ref.corp_name)
+    return companies
+
+def company_chunks(companies: Sequence[Company], chunk_size: int) -> Iterator[List[Company]]:
+    for start in range(0, len(companies), chunk_size):
+        yield list(companies[start:start + chunk_size])
+
+def main():
+    parser = argparse.ArgumentParser(description="업종 코드(KSIC)로 DART 수집 대상 기업 목록 생성")
+    parser.add_argument('--ksic', nargs='+', required=True, help="업종 코드 앞자리 (예: 41 42)")
+    parser.add_argument('--markets', nargs='+', default=list(DEFAULT_MARKETS), help="Y: 유가증권, K: 코스닥")
+    parser.add_argument('--out', default='universe_ksic.json', help="저장할 설정 파일")
+    args = parser.parse_args()
+
+    from collector import setup_api
+    setup_api()
+    companies = query_universe(args.ksic, args.markets)
+    save_universe(companies, args.out, description=f"KSIC {' '.join(args.ksic)} 상장사 ({', '.join(args.markets)})")
+    print(f"대상 기업 {len(companies)}개 저장: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+롤링 원점(rolling-origin) 백테스트
+피쳐 이력의 모든 예측 원점에서 horizon개월 앞을 예측해 (원점, horizon, 타겟) 배열로 모으고
+LSTM과 베이스라인(Naive, 계절성 Naive, 평균)의 RMSE/MAE/R²/방향성 정확도를 벡터 연산으로 계산
+
+- 모든 원점 윈도우를 하나의 배치로 쌓아 scenarios.rollout으로 lock-step 자기회귀 예측 (horizon번의 forward)
+- 예측 시점에 알 수 없는 외생 피쳐는 원점 값 유지 (실제 운영 예측과 같은 조건)
+- 지표는 차분값(월간 변화량) 기준, 방향성 정확도는 예측/실제 변화 방향(부호) 일치 비율
+
+사용법:
+    python backtest.py --history history.csv --horizon 3 --start 2022-01 --output backtest.json
+    (history.csv: 노트북의 피쳐 엔지니어링 후 df를 df.to_csv('history.csv')로 저장한 파일)
+"""
+
+import argparse
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from scenarios import FeatureRoller, rollout
+from sequence_data import window_view
+
+METRIC_COLUMNS = ['RMSE', 'MAE', 'R2', 'Directional_Accuracy']
+
+@dataclass
+class BacktestResult:
+    """
+    origins: 원점 날짜 (O,)
+    actual: 실제 차분값 (O, horizon, targets)
+    forecasts: 모델별 예측 차분값 {'LSTM': (O, horizon, targets), 'Naive': ..., ...}
+    base_levels: 원점 시점 타겟 수준값 (O, targets)
+    """
+    origins: np.ndarray
+    target_columns: List[str]
+    actual: np.ndarray
+    forecasts: Dict[str, np.ndarray]
+    base_levels: np.ndarray
+
+    @property
+    def horizon(self) -> int:
+        return self.actual.shape[1]
+
+    def levels(self, model: str) -> np.ndarray:
+        """예측 차분값을 원점 수준값에 누적한 수준 예측 (O, horizon, targets)"""
+        return self.base_levels[:, None, :] + np.cumsum(self.forecasts[model], axis=1)
+
+    def metrics(self) -> pd.DataFrame:
+        """모델 × horizon × 타겟별 지표 (long format)"""
+        frames = []
+        for name, forecast in self.forecasts.items():
+            scores = forecast_metrics(forecast, self.actual)
+            horizon_idx, target_idx = np.meshgrid(np.arange(self.horizon), np.arange(len(self.target_columns)),
+                                                  indexing='ij')
+            frame = pd.DataFrame({
+                'model': name,
+                'horizon': horizon_idx.ravel() + 1,
+                'target': np.asarray(self.target_columns)[target_idx.ravel()],
+            })
+            for metric in METRIC_COLUMNS:
+                frame[metric] = scores[metric].ravel()
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True)
+
+    def summary(self) -> pd.DataFrame:
+        """모델 × 타겟별 horizon 평균 지표 (노트북 metrics_df와 같은 형태의 비교표)"""
+        return self.metrics().groupby(['model', 'target'])[METRIC_COLUMNS].mean()
+
+def forecast_metrics(forecast: np.ndarray, actual: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    (O, horizon, targets) 예측/실제 → 원점 축으로 집계한 (horizon, targets) 지표
+    결측(NaN) 원점은 제외
+    """
+    valid = ~(np.isnan(forecast) | np.isnan(actual))
+    count = valid.sum(axis=0)
+    error = np.where(valid, forecast - actual, 0.0)
+    actual_valid = np.where(valid, actual, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mse = (error ** 2).sum(axis=0) / count
+        mae = np.abs(error).sum(axis=0) / count
+        actual_mean = actual_valid.sum(axis=0) / count
+        total = (np.where(valid, actual - actual_mean, 0.0) ** 2).sum(axis=0)
+        r2 = 1.0 - (error ** 2).sum(axis=0) / total
+        direction = (np.where(valid, np.sign(forecast) == np.sign(actual), False)).sum(axis=0) / count
+    return {'RMSE': np.sqrt(mse), 'MAE': mae, 'R2': r2, 'Directional_Accuracy': direction}
+
+def baseline_forecasts(diffs: np.ndarray, origins: np.ndarray, horizon: int,
+                       season: int = 12) -> Dict[str, np.ndarray]:
+    """
+    노트북 create_baseline_models의 베이스라인을 원점마다 그 시점까지의 데이터로 계산 (O, horizon, targets)
+    - Naive: 원점 월의 차분값 유지
+    - Seasonal_Naive: 12개월 전 같은 달의 차분값
+    - Mean: 원점까지의 차분 평균 (확장 윈도우)
+    """
+    steps = np.arange(1, horizon + 1)
+    naive = np.repeat(diffs[origins][:, None, :], horizon, axis=1)
+
+    # horizon이 season보다 길면 한 시즌 더 이전 값을 사용 (원점 이후 값은 사용하지 않음)
+    lag = season * ((steps - 1) // season + 1)
+    seasonal_idx = origins[:, None] + steps[None, :] - lag[None, :]
+    seasonal = np.where((seasonal_idx >= 0)[..., None], diffs[np.clip(seasonal_idx, 0, None)], np.nan)
+
+    filled = np.nan_to_num(diffs)
+    counts = np.cumsum(~np.isnan(diffs), axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expanding_mean = np.cumsum(filled, axis=0) / counts
+    mean = np.repeat(expanding_mean[origins][:, None, :], horizon, axis=1)
+
+    return {'Naive': naive, 'Seasonal_Naive': seasonal, 'Mean': mean}
+
+def run_backtest(forecaster, history: pd.DataFrame, horizon: int = 3, start=None,
+                 end=None, baselines: bool = True) -> BacktestResult:
+    """
+    history의 모든 원점에서 walk-forward 예측
+    - forecaster: LSTMForecaster (feature_columns, target_columns, seq_length, predict_diffs)
+    - history: 날짜 오름차순, feature_columns와 타겟 수준 컬럼을 포함 (date 컬럼 또는 날짜 인덱스)
+    - start/end: 원점 범위 (날짜 또는 문자열, 학습 구간을 제외할 때 start에 테스트 시작 월 지정)
+    """
+    feature_columns = list(forecaster.feature_columns)
+    target_columns = list(forecaster.target_columns)
+    missing = [col for col in feature_columns + target_columns if col not in history.columns]
+    if missing:
+        raise ValueError(f"history에 없는 컬럼: {missing}")
+
+    dates = pd.to_datetime(history['date'] if 'date' in history.columns else history.index).to_numpy()
+    features = history[feature_columns].to_numpy(dtype=np.float64)
+    levels = history[target_columns].to_numpy(dtype=np.float64)
+    diffs = np.full(levels.shape, np.nan)
+    diffs[1:] = np.diff(levels, axis=0)
+
+    roller = FeatureRoller(feature_columns, target_columns)
+    seq_length = forecaster.seq_length
+    history_length = roller.history_length
+
+    # 원점 o: 입력 윈도우 [o - seq_length + 1, o], 예측 대상 o + 1 .. o + horizon
+    first = max(seq_length, history_length) - 1
+    last = len(history) - 1 - horizon
+    origins = np.arange(first, last + 1)
+    if start is not None:
+        origins = origins[dates[origins] >= np.datetime64(pd.Timestamp(start))]
+    if end is not None:
+        origins = origins[dates[origins] <= np.datetime64(pd.Timestamp(end))]
+    if len(origins) == 0:
+        raise ValueError("백테스트할 원점이 없습니다. (데이터 길이, seq_length, horizon, start/end 확인)")
+
+    windows = window_view(features, seq_length)[origins - seq_length + 1]
+    level_history = sliding_window_view(levels, history_length, axis=0).transpose(0, 2, 1)[
+        origins - history_length + 1]
+    actual = sliding_window_view(diffs, horizon, axis=0).transpose(0, 2, 1)[origins + 1]
+
+    _, lstm_diffs = rollout(forecaster.predict_diffs, roller, windows, level_history, horizon)
+    forecasts = {'LSTM': lstm_diffs}
+    if baselines:
+        forecasts.update(baseline_forecasts(diffs, origins, horizon))
+
+    return BacktestResult(
+        origins=dates[origins],
+        target_columns=target_columns,
+        actual=np.ascontiguousarray(actual),
+        forecasts=forecasts,
+        base_levels=levels[origins],
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="LSTM 롤링 원점 백테스트")
+    parser.add_argument('--history', required=True, help="피쳐/타겟 수준 이력 CSV (date 컬럼 또는 첫 컬럼이 날짜)")
+    parser.add_argument('--checkpoint', default=None, help="체크포인트(.pth) 또는 아티팩트 디렉토리 (기본: lstm_model_checkpoint.pth)")
+    parser.add_argument('--horizon', type=int, default=3, help="예측 개월 수")
+    parser.add_argument('--start', default=None, help="첫 원점 (예: 2022-01)")
+    parser.add_argument('--end', default=None, help="마지막 원점")
+    parser.add_argument('--output', default=None, help="지표 JSON 저장 경로")
+    args = parser.parse_args()
+
+    from lstm_model import DEFAULT_CHECKPOINT_PATH, load_model
+
+    history = pd.read_csv(args.history)
+    if 'date' not in history.columns:
+        history = history.rename(columns={history.columns[0]: 'date'})
+    history = history.sort_values('date').reset_index(drop=True)
+    forecaster = load_model(args.checkpoint or DEFAULT_CHECKPOINT_PATH)
+    if forecaster.feature_columns is None:
+        raise SystemExit("체크포인트에 feature_columns가 없습니다. 노트북에서 체크포인트를 다시 저장하세요.")
+
+    result = run_backtest(forecaster, history, horizon=args.horizon, start=args.start, end=args.end)
+    print(f"원점 {len(result.origins)}개 ({str(result.origins[0])[:7]} ~ {str(result.origins[-1])[:7]}), "
+          f"horizon {result.horizon}")
+    summary = result.summary()
+    print(summary.round(4))
+
+    if args.output:
+        report = {
+            'model_version': forecaster.version,
+            'origins': [str(origin)[:10] for origin in result.origins],
+            'horizon': result.horizon,
+            'metrics': result.metrics().to_dict(orient='records'),
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+모델링 파이프라인 성능 벤치마크
+정확도 지표와 별개로 학습/추론 비용을 측정해 JSON으로 저장하고, 저장된 기준(baseline) 결과와 비교해 성능 저하를 표시
+
+측정 항목:
+- create_sequences, prepare_data_no_leakage (캐시 없음/메모리 캐시) 시간
+- 학습 에폭당 시간 (노트북/objective와 같은 학습 루프)
+- Optuna 시행 1회 시간 (tuning.objective를 고정 파라미터 FixedTrial로 실행, optuna 설치 시)
+- MultivariateLSTM 추론 지연시간 (배치 1, 배치 64)
+- 최대 메모리 사용량 (peak RSS)
+
+데이터는 기본적으로 노트북 피쳐 엔지니어링 후와 같은 크기(180행 × 26피쳐, 5타겟)의 고정 시드 합성 데이터이며,
+--data로 실제 X, y(.npz)를 지정할 수 있음
+
+사용법:
+    python benchmark.py --output benchmark.json                              # 측정만
+    python benchmark.py --save-baseline benchmark_baseline.json              # 기준 결과 저장
+    python benchmark.py --baseline benchmark_baseline.json --fail-on-regression   # 기준 대비 비교 (저하 시 종료 코드 1)
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from lstm_model import MultivariateLSTM
+from sequence_data import PreparedCache, create_sequences, prepare_data_no_leakage, prepare_sequences
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+# 노트북 셀 2 출력 기준 (Features shape: (180, 26), Targets shape: (180, 5))
+DEFAULT_ROWS = 180
+DEFAULT_FEATURES = 26
+DEFAULT_TARGETS = 5
+# 벤치마크 고정 하이퍼파라미터 (노트북 탐색 공간의 중간값)
+BENCH_PARAMS = {
+    'hidden_size': 64,
+    'num_layers': 2,
+    'dropout_rate': 0.2,
+    'learning_rate': 1e-3,
+    'batch_size': 32,
+    'seq_length': 18,
+    'optimizer_type': 'Adam',
+    'weight_decay': 1e-4,
+    'loss_function': 'MSE',
+}
+# 기준 대비 이 비율 이상 느려지면 성능 저하로 표시
+DEFAULT_TOLERANCE = 0.2
+
+def synthetic_data(n_rows: int = DEFAULT_ROWS, n_features: int = DEFAULT_FEATURES,
+                   n_targets: int = DEFAULT_TARGETS, seed: int = 0):
+    """월별 경제지표처럼 자기상관이 있는 합성 데이터 (피쳐: AR(1) 수준값, 타겟: 피쳐 선형결합 + 잡음의 차분)"""
+    rng = np.random.default_rng(seed)
+    X = np.empty((n_rows, n_features))
+    X[0] = rng.standard_normal(n_features)
+    for t in range(1, n_rows):
+        X[t] = 0.9 * X[t - 1] + rng.standard_normal(n_features) * 0.5
+    weights = rng.standard_normal((n_features, n_targets)) / np.sqrt(n_features)
+    y = X @ weights + rng.standard_normal((n_rows, n_targets)) * 0.3
+    return X, y
+
+def measure(func: Callable, repeats: int, warmup: int = 1) -> Dict[str, float]:
+    """반복 실행 시간 (ms, 중앙값/최소값)"""
+    for _ in range(warmup):
+        func()
+    times = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        func()
+        times[i] = time.perf_counter() - start
+    return {'median_ms': round(float(np.median(times)) * 1000, 4),
+            'min_ms': round(float(times.min()) * 1000, 4),
+            'repeats': repeats}
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def _build_model(n_features: int, n_targets: int) -> MultivariateLSTM:
+    return MultivariateLSTM(
+        input_size=n_features,
+        hidden_size=BENCH_PARAMS['hidden_size'],
+        num_layers=BENCH_PARAMS['num_layers'],
+        output_size=n_targets,
+        dropout_rate=BENCH_PARAMS['dropout_rate']
+    )
+
+def bench_data_prep(X, y, repeats: int) -> Dict[str, Dict]:
+    seq_length, batch_size = BENCH_PARAMS['seq_length'], BENCH_PARAMS['batch_size']
+    cache = PreparedCache()
+    cache.get(X, y, seq_length)
+
+    def prepare_uncached():
+        prepare_sequences(X, y, seq_length).loaders(batch_size)
+
+    def prepare_cached():
+        # prepare_data_no_leakage의 분할 요약 print는 측정에서 제외
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                prepare_data_no_leakage(X, y, seq_length, batch_size, cache=cache)
+            finally:
+                sys.stdout = stdout
+
+    return {
+        'create_sequences': measure(lambda: create_sequences(X, y, seq_length), repeats),
+        'prepare_data_no_leakage': measure(prepare_uncached, repeats),
+        'prepare_data_no_leakage_cached': measure(prepare_cached, repeats),
+    }
+
+def bench_training(X, y, epochs: int) -> Dict[str, Dict]:
+    """노트북 학습 루프(Adam, MSE, gradient clipping 1.0)의 에폭당 시간"""
+    torch.manual_seed(0)
+    prepared = prepare_sequences(X, y, BENCH_PARAMS['seq_length'])
+    train_loader, val_loader, _ = prepared.loaders(BENCH_PARAMS['batch_size'])
+    model = _build_model(X.shape[1], y.shape[1])
+    optimizer = torch.optim.Adam(model.parameters(), lr=BENCH_PARAMS['learning_rate'],
+                                 weight_decay=BENCH_PARAMS['weight_decay'])
+    criterion = nn.MSELoss()
+
+    def epoch():
+        model.train()
+        for batch_X, batch_y in train_loader:
+            optimizer.zero_grad()
+            loss = criterion(model(batch_X), batch_y)
+            loss.backward()
+            torch.nn.utils.clip_grad_norm_(model.parameters(), 1.0)
+            optimizer.step()
+        model.eval()
+        with torch.no_grad():
+            for batch_X, batch_y in val_loader:
+                criterion(model(batch_X), batch_y)
+
+    return {'epoch': measure(epoch, epochs)}
+
+def bench_trial(X, y, repeats: int, epochs: int) -> Optional[Dict[str, Dict]]:
+    """tuning.objective 1회 (고정 파라미터, 조기 종료 없이 epochs 에폭), optuna 미설치 시 None"""
+    try:
+        import optuna
+        from tuning import objective
+    except ImportError:
+        return None
+    cache = PreparedCache()
+
+    def trial():
+        torch.manual_seed(0)
+        # patience를 epochs로 두어 매번 같은 에폭 수를 학습
+        objective(optuna.trial.FixedTrial(BENCH_PARAMS), X, y, epochs=epochs, max_patience=epochs, cache=cache)
+
+    return {f'optuna_trial_{epochs}_epochs': measure(trial, repeats)}
+
+def bench_inference(n_features: int, n_targets: int, repeats: int) -> Dict[str, Dict]:
+    torch.manual_seed(0)
+    model = _build_model(n_features, n_targets).eval()
+    results = {}
+    for batch_size in (1, 64):
+        x = torch.randn(batch_size, BENCH_PARAMS['seq_length'], n_features)
+
+        def infer():
+            with torch.no_grad():
+                model(x)
+
+        result = measure(infer, repeats, warmup=5)
+        result['throughput_per_s'] = round(batch_size / (result['median_ms'] / 1000), 1)
+        results[f'inference_batch_{batch_size}'] = result
+    return results
+
+def run_benchmarks(X, y, repeats: int = 20, epochs: int = 10, trial_repeats: int = 3,
+                   trial_epochs: int = 10) -> Dict:
+    """전체 벤치마크 실행, 결과 JSON 객체 반환 (benchmarks: {이름: {median_ms, min_ms, ...}})"""
+    benchmarks = {}
+    benchmarks.update(bench_data_prep(X, y, repeats))
+    benchmarks.update(bench_inference(X.shape[1], y.shape[1], repeats * 10))
+    benchmarks.update(bench_training(X, y, epochs))
+    trial = bench_trial(X, y, trial_repeats, trial_epochs)
+    if trial is not None:
+        benchmarks.update(trial)
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'torch': torch.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'threads': torch.get_num_threads(),
+        },
+        'data_shape': {'rows': int(X.shape[0]), 'features': int(X.shape[1]), 'targets': int(y.shape[1])},
+        'params': BENCH_PARAMS,
+        'benchmarks': benchmarks,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def compare(current: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> Dict[str, Dict]:
+    """
+    기준 대비 변화율 (median_ms 기준, 양수면 느려짐)
+    변화율이 tolerance를 넘으면 regression=True, peak RSS도 같은 기준으로 비교
+    """
+    report = {}
+    for name, result in current['benchmarks'].items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if base is None:
+            continue
+        change = result['median_ms'] / base['median_ms'] - 1.0
+        report[name] = {'baseline_ms': base['median_ms'], 'current_ms': result['median_ms'],
+                        'change': round(change, 4), 'regression': change > tolerance}
+    if current.get('peak_rss_mb') and baseline.get('peak_rss_mb'):
+        change = current['peak_rss_mb'] / baseline['peak_rss_mb'] - 1.0
+        report['peak_rss_mb'] = {'baseline': baseline['peak_rss_mb'], 'current': current['peak_rss_mb'],
+                                 'change': round(change, 4), 'regression': change > tolerance}
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="LSTM 모델링 파이프라인 성능 벤치마크")
+    parser.add_argument('--data', default=None, help="X, y 배열 .npz (기본: 노트북 크기의 합성 데이터)")
+    parser.add_argument('--repeats', type=int, default=20, help="데이터 준비 반복 횟수 (추론은 10배)")
+    parser.add_argument('--epochs', type=int, default=10, help="에폭 시간 측정 반복 횟수")
+    parser.add_argument('--trial-repeats', type=int, default=3, help="Optuna 시행 측정 반복 횟수")
+    parser.add_argument('--trial-epochs', type=int, default=10, help="Optuna 시행당 에폭 수")
+    parser.add_argument('--threads', type=int, default=1, help="torch 연산 스레드 수 (기준 결과와 같게 고정)")
+    parser.add_argument('--output', default='benchmark.json', help="결과 JSON 경로")
+    parser.add_argument('--baseline', default=None, help="비교할 기준 결과 JSON")
+    parser.add_argument('--save-baseline', default=None, help="이번 결과를 기준 결과로 저장할 경로")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="성능 저하 판단 비율 (0.2 = 20%% 느려짐)")
+    parser.add_argument('--fail-on-regression', action='store_true', help="성능 저하가 있으면 종료 코드 1")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    if args.data:
+        data = np.load(args.data)
+        X, y = np.asarray(data['X'], dtype=np.float64), np.asarray(data['y'], dtype=np.float64)
+    else:
+        X, y = synthetic_data()
+
+    result = run_benchmarks(X, y, repeats=args.repeats, epochs=args.epochs,
+                            trial_repeats=args.trial_repeats, trial_epochs=args.trial_epochs)
+    for name, value in result['benchmarks'].items():
+        print(f"{name:36s} {value['median_ms']:10.3f} ms (min {value['min_ms']:.3f})")
+    print(f"{'peak_rss_mb':36s} {result['peak_rss_mb']}")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('environment', {}).get('threads') != result['environment']['threads']:
+            print("주의: 기준 결과와 스레드 수가 다릅니다.")
+        result['comparison'] = compare(result, baseline, args.tolerance)
+        print(f"\n기준 대비 ({args.baseline}, 허용 {args.tolerance:.0%}):")
+        for name, item in result['comparison'].items():
+            mark = ' ← 성능 저하' if item['regression'] else ''
+            print(f"  {name:34s} {item['change']:+8.1%}{mark}")
+            if item['regression']:
+                regressions.append(name)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}")
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"기준 결과 저장: {args.save_baseline}")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+같은 구조의 MultivariateLSTM K개를 한 번에 학습하는 배치 앙상블
+데이터가 작아(월별 약 189행) 모델 하나씩 DataLoader로 학습하면 CPU 시간 대부분이 파이썬 오버헤드이므로,
+K개 모델의 가중치를 (K, ...) 텐서로 쌓아 매 스텝 배치 행렬곱(bmm)으로 동시에 forward/backward
+
+- GroupedLSTM: MultivariateLSTM과 같은 연산(게이트 순서 i, f, g, o)을 멤버 축으로 벡터화, 멤버별로 MultivariateLSTM state_dict 변환 가능
+- 옵티마이저: 멤버별 학습률/weight decay를 갖는 벡터화 Adam/AdamW, 멤버별 gradient clipping
+- 데이터: 학습/검증 윈도우를 device 텐서로 한 번 만들고 멤버마다 다른 순서로 섞은 배치를 인덱싱으로 생성
+- 멤버별 검증 곡선으로 조기 종료 (멈춘 멤버는 업데이트 중단, 최고 검증 시점 가중치로 복원)
+- 멤버 예측의 평균/표준편차로 앙상블 예측과 불확실성 제공
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+from lstm_model import MultivariateLSTM
+from sequence_data import PreparedSequences
+
+LOSS_FUNCTIONS = {
+    'MSE': lambda pred, target: (pred - target) ** 2,
+    'MAE': lambda pred, target: (pred - target).abs(),
+    'Huber': lambda pred, target: F.huber_loss(pred, target, reduction='none', delta=1.0),
+}
+
+def _broadcast(value, k: int, name: str) -> List:
+    values = list(value) if isinstance(value, (list, tuple, np.ndarray)) else [value] * k
+    if len(values) != k:
+        raise ValueError(f"{name} 길이({len(values)})가 멤버 수({k})와 다릅니다.")
+    return values
+
+class GroupedLSTM(nn.Module):
+    """
+    멤버 K개의 MultivariateLSTM을 쌓은 모듈
+    입력 (K, B, S, F) 또는 멤버 공통 (B, S, F) → 출력 (K, B, targets)
+    """
+
+    def __init__(self, members: Sequence[MultivariateLSTM]):
+        super().__init__()
+        first = members[0]
+        self.k = len(members)
+        self.num_layers = first.num_layers
+        self.hidden_size = first.hidden_size
+        self.dropout_rate = first.dropout.p
+        self.layer_dropout = first.lstm.dropout
+        states = [member.state_dict() for member in members]
+        # 파라미터 이름: MultivariateLSTM state_dict 키의 '.'을 '__'로 바꾼 것, 값은 (K, ...) 스택
+        self.names = list(states[0].keys())
+        self.params = nn.ParameterDict({
+            name.replace('.', '__'): nn.Parameter(torch.stack([state[name] for state in states]).clone())
+            for name in self.names
+        })
+
+    @classmethod
+    def create(cls, k: int, input_size: int, hidden_size: int, num_layers: int, output_size: int,
+               dropout_rate: float, seeds: Optional[Sequence[int]] = None) -> 'GroupedLSTM':
+        """멤버마다 시드를 달리해 MultivariateLSTM 기본 초기화로 생성"""
+        seeds = list(seeds) if seeds is not None else list(range(k))
+        members = []
+        for seed in seeds:
+            torch.manual_seed(seed)
+            members.append(MultivariateLSTM(input_size, hidden_size, num_layers, output_size, dropout_rate))
+        return cls(members)
+
+    def weight(self, name: str) -> torch.Tensor:
+        return self.params[name.replace('.', '__')]
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        if x.dim() == 3:
+            x = x.unsqueeze(0).expand(self.k, *x.shape)
+        k, batch, seq_length, _ = x.shape
+        layer_input = x
+        for layer in range(self.num_layers):
+            w_ih = self.weight(f'lstm.weight_ih_l{layer}')
+            w_hh = self.weight(f'lstm.weight_hh_l{layer}')
+            bias = self.weight(f'lstm.bias_ih_l{layer}') + self.weight(f'lstm.bias_hh_l{layer}')
+            # 모든 시점의 입력 투영을 한 번의 bmm으로 계산: (K, B*S, I) @ (K, I, 4H)
+            projected = torch.baddbmm(
+                bias.unsqueeze(1), layer_input.reshape(k, batch * seq_length, -1), w_ih.transpose(1, 2)
+            ).view(k, batch, seq_length, -1).unbind(dim=2)
+
+            h = x.new_zeros(k, batch, self.hidden_size)
+            c = x.new_zeros(k, batch, self.hidden_size)
+            w_hh_t = w_hh.transpose(1, 2)
+            outputs = []
+            # unbind: 시점별 인덱싱(projected[:, :, t])은 backward에서 매 시점 전체 크기 기울기를 만들기 때문
+            for step_input in projected:
+                gates = torch.baddbmm(step_input, h, w_hh_t)
+                i, f, g, o = gates.chunk(4, dim=-1)
+                c = torch.sigmoid(f) * c + torch.sigmoid(i) * torch.tanh(g)
+                h = torch.sigmoid(o) * torch.tanh(c)
+                outputs.append(h)
+            if layer < self.num_layers - 1:
+                layer_input = F.dropout(torch.stack(outputs, dim=2), self.layer_dropout, self.training)
+
+        # 마지막 시점 출력 → dropout → fc
+        last = F.dropout(h, self.dropout_rate, self.training)
+        return torch.baddbmm(self.weight('fc.bias').unsqueeze(1), last, self.weight('fc.weight').transpose(1, 2))
+
+    def member_state_dict(self, index: int) -> Dict[str, torch.Tensor]:
+        """멤버 하나의 MultivariateLSTM state_dict"""
+        return {name: self.weight(name)[index].detach().clone() for name in self.names}
+
+    def to_models(self) -> List[MultivariateLSTM]:
+        input_size = self.weight('lstm.weight_ih_l0').shape[-1]
+        output_size = self.weight('fc.weight').shape[1]
+        models = []
+        for index in range(self.k):
+            model = MultivariateLSTM(input_size, self.hidden_size, self.num_layers, output_size, self.dropout_rate)
+            model.load_state_dict(self.member_state_dict(index))
+            models.append(model.eval())
+        return models
+
+class GroupedAdam:
+    """
+    (K, ...) 파라미터용 벡터화 Adam/AdamW (멤버별 학습률, weight decay, 업데이트 마스크)
+    - decoupled=False: torch.optim.Adam (L2를 gradient에 더함), True: torch.optim.AdamW
+    """
+
+    def __init__(self, params: Sequence[torch.Tensor], lr: torch.Tensor, weight_decay: torch.Tensor,
+                 decoupled: bool = False, betas=(0.9, 0.999), eps: float = 1e-8):
+        self.params = list(params)
+        self.lr = lr
+        self.weight_decay = weight_decay
+        self.decoupled = decoupled
+        self.beta1, self.beta2 = betas
+        self.eps = eps
+        self.step_count = 0
+        self.exp_avg = [torch.zeros_like(p) for p in self.params]
+        self.exp_avg_sq = [torch.zeros_like(p) for p in self.params]
+
+    def zero_grad(self):
+        for p in self.params:
+            p.grad = None
+
+    @torch.no_grad()
+    def step(self, active: torch.Tensor):
+        """active: (K,) bool, False인 멤버(조기 종료)는 가중치/모멘트를 갱신하지 않음"""
+        self.step_count += 1
+        bias1 = 1 - self.beta1 ** self.step_count
+        bias2 = 1 - self.beta2 ** self.step_count
+        for p, m, v in zip(self.params, self.exp_avg, self.exp_avg_sq):
+            if p.grad is None:
+                continue
+            shape = (-1,) + (1,) * (p.dim() - 1)
+            lr = self.lr.view(shape)
+            wd = self.weight_decay.view(shape)
+            mask = active.view(shape).to(p.dtype)
+            grad = p.grad
+            if self.decoupled:
+                p.mul_(1 - lr * wd * mask)
+            else:
+                grad = grad + wd * p
+            m.mul_(1 - (1 - self.beta1) * mask).add_(grad * mask * (1 - self.beta1))
+            v.mul_(1 - (1 - self.beta2) * mask).add_(grad * grad * mask * (1 - self.beta2))
+            denom = (v / bias2).sqrt_().add_(self.eps)
+            p.sub_(lr * mask * (m / bias1) / denom)
+
+def clip_grad_norm_per_member(params: Sequence[torch.Tensor], max_norm: float):
+    """멤버별 전체 gradient L2 norm을 max_norm 이하로 (clip_grad_norm_과 같은 규칙을 멤버마다 적용)"""
+    grads = [p.grad for p in params if p.grad is not None]
+    norms = torch.stack([g.reshape(g.shape[0], -1).pow(2).sum(dim=1) for g in grads]).sum(dim=0).sqrt()
+    scale = (max_norm / (norms + 1e-6)).clamp(max=1.0)
+    for g in grads:
+        g.mul_(scale.view((-1,) + (1,) * (g.dim() - 1)))
+
+@dataclass
+class EnsembleResult:
+    """
+    model: 멤버별 최고 검증 시점 가중치로 복원된 GroupedLSTM (eval 모드)
+    train_curves, val_curves: (epochs, K) 멤버별 에폭 손실 (멈춘 멤버 이후 에폭은 NaN)
+    best_val: (K,) 멤버별 최저 검증 손실, best_epoch: (K,) 해당 에폭 (0부터)
+    """
+    model: GroupedLSTM
+    train_curves: np.ndarray
+    val_curves: np.ndarray
+    best_val: np.ndarray
+    best_epoch: np.ndarray
+    learning_rates: List[float]
+    weight_decays: List[float]
+    seeds: List[int]
+
+    @torch.no_grad()
+    def predict(self, windows: Union[np.ndarray, torch.Tensor]) -> np.ndarray:
+        """스케일된 윈도우 (N, S, F) → 멤버별 스케일된 예측 (K, N, targets)"""
+        device = self.model.weight('fc.weight').device
+        x = torch.as_tensor(np.asarray(windows, dtype=np.float32), device=device)
+        return self.model(x).cpu().numpy()
+
+    def predict_mean_std(self, windows) -> Tuple[np.ndarray, np.ndarray]:
+        """앙상블 평균 예측과 멤버 간 표준편차 (불확실성)"""
+        predictions = self.predict(windows)
+        return predictions.mean(axis=0), predictions.std(axis=0)
+
+def train_ensemble(prepared: PreparedSequences, hidden_size: int, num_layers: int, dropout_rate: float,
+                   learning_rates: Union[float, Sequence[float]] = 1e-3,
+                   weight_decays: Union[float, Sequence[float]] = 0.0,
+                   seeds: Optional[Sequence[int]] = None, k: Optional[int] = None,
+                   batch_size: int = 32, epochs: int = 30, patience: int = 10,
+                   loss_function: str = 'MSE', optimizer_type: str = 'Adam', grad_clip: float = 1.0,
+                   device=None, trial=None) -> EnsembleResult:
+    """
+    구조 하이퍼파라미터(hidden_size, num_layers, dropout_rate)와 seq_length/batch_size를 공유하는 K개 모델을 동시에 학습
+    - learning_rates, weight_decays, seeds: 멤버별 값 (스칼라면 모든 멤버 동일), K는 이 중 가장 긴 목록 길이 또는 k
+    - 한 에폭의 배치 수는 objective_improved와 같고, 멤버마다 학습 윈도우 순서를 독립적으로 섞음
+    - trial: Optuna 시행이면 에폭마다 멤버 평균 검증 손실을 report하고 pruning
+    """
+    lengths = [len(v) for v in (learning_rates, weight_decays, seeds)
+               if isinstance(v, (list, tuple, np.ndarray))]
+    k = k or (max(lengths) if lengths else 1)
+    learning_rates = [float(v) for v in _broadcast(learning_rates, k, 'learning_rates')]
+    weight_decays = [float(v) for v in _broadcast(weight_decays, k, 'weight_decays')]
+    seeds = list(seeds) if seeds is not None else list(range(k))
+    if len(seeds) != k:
+        raise ValueError(f"seeds 길이({len(seeds)})가 멤버 수({k})와 다릅니다.")
+    if loss_function not in LOSS_FUNCTIONS:
+        raise ValueError(f"알 수 없는 손실 함수: {loss_function}")
+    loss_fn = LOSS_FUNCTIONS[loss_function]
+
+    # 학습/검증 윈도우를 device 텐서로 한 번만 생성
+    train_set, val_set = prepared.dataset('train'), prepared.dataset('val')
+    X_train, y_train = train_set.batch(np.arange(len(train_set)))
+    X_val, y_val = val_set.batch(np.arange(len(val_set)))
+    if device is not None:
+        X_train, y_train, X_val, y_val = (t.to(device) for t in (X_train, y_train, X_val, y_val))
+
+    model = GroupedLSTM.create(k, X_train.shape[-1], hidden_size, num_layers, y_train.shape[-1],
+                               dropout_rate, seeds)
+    if device is not None:
+        model = model.to(device)
+    params = list(model.params.values())
+    optimizer = GroupedAdam(
+        params,
+        lr=torch.tensor(learning_rates, device=X_train.device),
+        weight_decay=torch.tensor(weight_decays, device=X_train.device),
+        decoupled=(optimizer_type == 'AdamW')
+    )
+
+    n_train = len(X_train)
+    n_batches = math.ceil(n_train / batch_size)
+    generator = torch.Generator(device='cpu').manual_seed(int(seeds[0]))
+    member_index = torch.arange(k, device=X_train.device)[:, None]
+
+    active = torch.ones(k, dtype=torch.bool, device=X_train.device)
+    best_val = torch.full((k,), float('inf'), device=X_train.device)
+    best_epoch = torch.zeros(k, dtype=torch.long)
+    waited = torch.zeros(k, dtype=torch.long, device=X_train.device)
+    best_state = [p.detach().clone() for p in params]
+    train_curves = np.full((epochs, k), np.nan)
+    val_curves = np.full((epochs, k), np.nan)
+
+    for epoch in range(epochs):
+        model.train()
+        order = torch.argsort(torch.rand(k, n_train, generator=generator), dim=1).to(X_train.device)
+        train_loss = torch.zeros(k, device=X_train.device)
+        for b in range(n_batches):
+            index = order[:, b * batch_size:(b + 1) * batch_size]
+            outputs = model(X_train[index])
+            # 멤버별 배치 평균 손실의 합 → 멤버 간 gradient는 서로 독립
+            member_loss = loss_fn(outputs, y_train[index]).mean(dim=(1, 2))
+            optimizer.zero_grad()
+            member_loss.sum().backward()
+            if grad_clip:
+                clip_grad_norm_per_member(params, grad_clip)
+            optimizer.step(active)
+            train_loss += member_loss.detach()
+
+        model.eval()
+        with torch.no_grad():
+            val_loss = loss_fn(model(X_val), y_val.expand(k, *y_val.shape)).mean(dim=(1, 2))
+
+        was_active = active.clone()
+        train_curves[epoch, was_active.cpu().numpy()] = (train_loss / n_batches)[was_active].cpu().numpy()
+        val_curves[epoch, was_active.cpu().numpy()] = val_loss[was_active].cpu().numpy()
+
+        # 멤버별 조기 종료: 개선된 멤버는 가중치 저장, 개선 없는 멤버는 patience 누적
+        improved = was_active & (val_loss < best_val)
+        best_val = torch.where(improved, val_loss, best_val)
+        best_epoch[improved.cpu()] = epoch
+        waited = torch.where(improved, torch.zeros_like(waited), waited + was_active.long())
+        for saved, p in zip(best_state, params):
+            saved[improved] = p.detach()[improved]
+        active = was_active & (waited < patience)
+
+        if trial is not None:
+            import optuna
+            trial.report(float(val_loss[was_active].mean()), epoch)
+            if trial.should_prune():
+                raise optuna.exceptions.TrialPruned()
+        if not bool(active.any()):
+            break
+
+    with torch.no_grad():
+        for saved, p in zip(best_state, params):
+            p.copy_(saved)
+    model.eval()
+    return EnsembleResult(
+        model=model,
+        train_curves=train_curves[:epoch + 1],
+        val_curves=val_curves[:epoch + 1],
+        best_val=best_val.cpu().numpy(),
+        best_epoch=best_epoch.numpy(),
+        learning_rates=learning_rates,
+        weight_decays=weight_decays,
+        seeds=seeds,
+    )
@@ -0,0 +1,131 @@
+"""
+LSTM 예측 모델 정의 및 체크포인트 로드
+LSTM_predict_final.ipynb의 MultivariateLSTM과 동일한 구조로, 노트북 밖(FastAPI 서비스, 배치 스크립트)에서 lstm_model_checkpoint.pth를 재사용하기 위한 모듈
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lstm_model_checkpoint.pth')
+DEFAULT_ARTIFACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lstm_model_artifact')
+
+class MultivariateLSTM(nn.Module):
+    def __init__(self, input_size, hidden_size, num_layers, output_size, dropout_rate=0.2):
+        super(MultivariateLSTM, self).__init__()
+        self.hidden_size = hidden_size
+        self.num_layers = num_layers
+
+        self.lstm = nn.LSTM(
+            input_size=input_size,
+            hidden_size=hidden_size,
+            num_layers=num_layers,
+            dropout=dropout_rate if num_layers > 1 else 0,
+            batch_first=True
+        )
+
+        self.dropout = nn.Dropout(dropout_rate)
+        self.fc = nn.Linear(hidden_size, output_size)
+
+    def forward(self, x):
+        lstm_out, _ = self.lstm(x)
+        # 마지막 시점의 출력만 사용
+        last_output = lstm_out[:, -1, :]
+        output = self.dropout(last_output)
+        output = self.fc(output)
+        return output
+
+def file_version(path: str) -> str:
+    """체크포인트 파일 내용 해시 (모델 버전, 예측 캐시 키로 사용)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+@dataclass
+class LSTMForecaster:
+    """
+    학습된 모델 + 스케일러 묶음
+    원 단위 입력 윈도우 배치 (N, seq_length, features) → 원 단위 타겟 차분값 (N, targets)
+    """
+    model: MultivariateLSTM
+    scaler_X: Any
+    scaler_y: Any
+    target_columns: List[str]
+    feature_columns: Optional[List[str]]
+    seq_length: int
+    version: str
+    hyperparameters: Dict[str, Any] = field(default_factory=dict)
+    # 내보낸 추론 런타임 (model_export.load_fastest에서 설정, None이면 eager PyTorch)
+    runtime: Any = None
+
+    @property
+    def runtime_name(self) -> str:
+        return self.runtime.name if self.runtime is not None else 'eager'
+
+    @property
+    def diff_columns(self) -> List[str]:
+        return [f'{col}_diff' for col in self.target_columns]
+
+    def predict_diffs(self, windows: np.ndarray) -> np.ndarray:
+        """배치 전체를 한 번의 forward로 예측"""
+        windows = np.asarray(windows, dtype=np.float64)
+        n, seq_length, n_features = windows.shape
+        scaled = self.scaler_X.transform(windows.reshape(-1, n_features)).reshape(n, seq_length, n_features)
+        if self.runtime is not None:
+            return self.scaler_y.inverse_transform(self.runtime.run(scaled.astype(np.float32)))
+        # 노트북에서 GPU로 학습한 모델을 그대로 감싼 경우에도 동작하도록 모델 device로 입력 이동
+        device = next(self.model.parameters()).device
+        with torch.no_grad():
+            pred_scaled = self.model(torch.from_numpy(scaled.astype(np.float32)).to(device)).cpu().numpy()
+        return self.scaler_y.inverse_transform(pred_scaled)
+
+def load_checkpoint(path: str = DEFAULT_CHECKPOINT_PATH, feature_columns: Optional[List[str]] = None) -> LSTMForecaster:
+    """
+    노트북이 저장한 체크포인트 로드 (CPU, eval 모드)
+    - 체크포인트에 feature_columns가 없으면 (이전 버전 노트북) 인자로 받은 feature_columns 사용
+    """
+    # 스케일러(sklearn 객체)가 함께 저장되어 있으므로 weights_only=False
+    checkpoint = torch.load(path, map_location='cpu', weights_only=False)
+    params = checkpoint['hyperparameters']
+    state_dict = checkpoint['model_state_dict']
+
+    input_size = state_dict['lstm.weight_ih_l0'].shape[1]
+    output_size = state_dict['fc.weight'].shape[0]
+    model = MultivariateLSTM(
+        input_size=input_size,
+        hidden_size=params['hidden_size'],
+        num_layers=params['num_layers'],
+        output_size=output_size,
+        dropout_rate=params['dropout_rate']
+    )
+    model.load_state_dict(state_dict)
+    model.eval()
+
+    columns = checkpoint.get('feature_columns') or feature_columns
+    if columns is not None and len(columns) != input_size:
+        raise ValueError(f"피쳐 수 불일치: 모델 입력 {input_size}개, 피쳐 목록 {len(columns)}개")
+
+    return LSTMForecaster(
+        model=model,
+        scaler_X=checkpoint['scaler_X'],
+        scaler_y=checkpoint['scaler_y'],
+        target_columns=list(checkpoint['target_columns']),
+        feature_columns=list(columns) if columns is not None else None,
+        seq_length=int(params['seq_length']),
+        version=file_version(path),
+        hyperparameters=dict(params),
+    )
+
+def load_model(path: str, feature_columns: Optional[List[str]] = None) -> LSTMForecaster:
+    """아티팩트 디렉토리(model_artifact.py 형식)이면 mmap 로드, 그 외(.pth)는 기존 체크포인트 로드"""
+    from model_artifact import is_artifact, load_artifact
+    if is_artifact(path):
+        return load_artifact(path, feature_columns=feature_columns)
+    return load_checkpoint(path, feature_columns=feature_columns)
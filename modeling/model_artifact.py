@@ -0,0 +1,205 @@
+"""
+LSTM 모델 아티팩트 (pickle 없는 저장 형식)
+torch.save 체크포인트는 sklearn 스케일러를 unpickle해야 해서 느리고, 버전에 민감하며, 안전하지 않음
+아티팩트 디렉토리 구성:
+    model.safetensors  가중치 + 스케일러 평균/스케일 배열 (safetensors 형식: 8바이트 헤더 길이 + JSON 헤더 + 원시 바이트)
+    manifest.json      형식 버전, 모델 버전, 하이퍼파라미터, 타겟/피쳐 목록, 텐서 목록, 성능 지표
+
+로드 시 safetensors 파일을 mmap(copy-on-write)으로 열어 텐서를 복사 없이 모델 파라미터로 연결하므로
+파일 전체를 읽거나 객체를 역직렬화하지 않음
+
+사용법:
+    python model_artifact.py lstm_model_checkpoint.pth lstm_model_artifact   # 기존 체크포인트 변환
+"""
+
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import torch
+
+from lstm_model import LSTMForecaster, MultivariateLSTM
+
+ARTIFACT_FORMAT = 'ie-lstm'
+ARTIFACT_FORMAT_VERSION = 1
+WEIGHTS_FILE = 'model.safetensors'
+MANIFEST_FILE = 'manifest.json'
+
+# safetensors dtype 이름 ↔ numpy dtype
+DTYPES = {'F64': np.float64, 'F32': np.float32, 'F16': np.float16, 'I64': np.int64, 'I32': np.int32}
+DTYPE_NAMES = {np.dtype(dtype): name for name, dtype in DTYPES.items()}
+
+class ArrayScaler:
+    """StandardScaler의 transform/inverse_transform만 numpy 배열로 구현 (sklearn 불필요)"""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+        self.n_features_in_ = len(self.mean_)
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+    def inverse_transform(self, X):
+        return np.asarray(X, dtype=np.float64) * self.scale_ + self.mean_
+
+def write_safetensors(path: str, tensors: Dict[str, np.ndarray], metadata: Optional[Dict[str, str]] = None):
+    """
+    safetensors 형식으로 저장 (safetensors 라이브러리와 호환)
+    원소 크기가 큰 dtype부터 배치하고 헤더를 8바이트 단위로 맞춰 모든 텐서가 정렬된 오프셋에서 시작하도록 함
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in tensors.items()}
+    order = sorted(arrays, key=lambda name: (-arrays[name].dtype.itemsize, name))
+    header: Dict[str, Any] = {}
+    if metadata:
+        header['__metadata__'] = metadata
+    offset = 0
+    for name in order:
+        array = arrays[name]
+        if array.dtype not in DTYPE_NAMES:
+            raise ValueError(f"지원하지 않는 dtype: {name} {array.dtype}")
+        header[name] = {'dtype': DTYPE_NAMES[array.dtype], 'shape': list(array.shape),
+                        'data_offsets': [offset, offset + array.nbytes]}
+        offset += array.nbytes
+
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    header_bytes += b' ' * (-len(header_bytes) % 8)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(len(header_bytes).to_bytes(8, 'little'))
+        f.write(header_bytes)
+        for name in order:
+            f.write(arrays[name].astype(arrays[name].dtype.newbyteorder('<'), copy=False).tobytes())
+    os.replace(tmp_path, path)
+
+def read_safetensors(path: str) -> Dict[str, np.ndarray]:
+    """헤더만 읽고 텐서는 copy-on-write mmap 뷰로 반환 (실제 페이지는 접근할 때 읽힘)"""
+    with open(path, 'rb') as f:
+        header_size = int.from_bytes(f.read(8), 'little')
+        header = json.loads(f.read(header_size))
+    header.pop('__metadata__', None)
+    if not header:
+        return {}
+    buffer = np.memmap(path, dtype=np.uint8, mode='c', offset=8 + header_size)
+    tensors = {}
+    for name, info in header.items():
+        start, end = info['data_offsets']
+        dtype = np.dtype(DTYPES[info['dtype']]).newbyteorder('<')
+        tensors[name] = buffer[start:end].view(dtype).reshape(info['shape'])
+    return tensors
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+def save_artifact(path: str, model: MultivariateLSTM, scaler_X, scaler_y, hyperparameters: Dict[str, Any],
+                  target_columns: List[str], feature_columns: Optional[List[str]] = None,
+                  metrics: Optional[Dict[str, Any]] = None) -> str:
+    """학습 결과를 아티팩트 디렉토리로 저장, 모델 버전(가중치 파일 해시) 반환"""
+    os.makedirs(path, exist_ok=True)
+    tensors = {f'model.{name}': value.detach().cpu().numpy()
+               for name, value in model.state_dict().items()}
+    for prefix, scaler in (('scaler_X', scaler_X), ('scaler_y', scaler_y)):
+        tensors[f'{prefix}.mean'] = np.asarray(scaler.mean_, dtype=np.float64)
+        tensors[f'{prefix}.scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+
+    weights_path = os.path.join(path, WEIGHTS_FILE)
+    write_safetensors(weights_path, tensors, metadata={'format': ARTIFACT_FORMAT})
+    state_dict = model.state_dict()
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'model_version': _file_hash(weights_path),
+        'created_at': datetime.now().isoformat(),
+        'torch_version': torch.__version__,
+        'architecture': 'MultivariateLSTM',
+        'input_size': int(state_dict['lstm.weight_ih_l0'].shape[1]),
+        'output_size': int(state_dict['fc.weight'].shape[0]),
+        'hyperparameters': dict(hyperparameters),
+        'target_columns': list(target_columns),
+        'feature_columns': list(feature_columns) if feature_columns is not None else None,
+        'tensors': sorted(tensors),
+        'metrics': metrics,
+    }
+    tmp_path = os.path.join(path, f'{MANIFEST_FILE}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp_path, os.path.join(path, MANIFEST_FILE))
+    return manifest['model_version']
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, MANIFEST_FILE), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != ARTIFACT_FORMAT:
+        raise ValueError(f"모델 아티팩트가 아닙니다: {path}")
+    if manifest.get('format_version', 0) > ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 아티팩트 형식 버전: {manifest.get('format_version')} "
+                         f"(지원: {ARTIFACT_FORMAT_VERSION} 이하)")
+    return manifest
+
+def load_artifact(path: str, feature_columns: Optional[List[str]] = None) -> LSTMForecaster:
+    """
+    아티팩트 로드 (CPU, eval 모드)
+    모델은 meta device에서 초기화 없이 만든 뒤 mmap 텐서를 파라미터로 그대로 연결 (assign=True)
+    """
+    manifest = read_manifest(path)
+    tensors = read_safetensors(os.path.join(path, WEIGHTS_FILE))
+    params = manifest['hyperparameters']
+
+    with torch.device('meta'):
+        model = MultivariateLSTM(
+            input_size=manifest['input_size'],
+            hidden_size=params['hidden_size'],
+            num_layers=params['num_layers'],
+            output_size=manifest['output_size'],
+            dropout_rate=params['dropout_rate']
+        )
+    state_dict = {name[len('model.'):]: torch.from_numpy(array)
+                  for name, array in tensors.items() if name.startswith('model.')}
+    model.load_state_dict(state_dict, assign=True)
+    model.eval()
+
+    columns = manifest.get('feature_columns') or feature_columns
+    if columns is not None and len(columns) != manifest['input_size']:
+        raise ValueError(f"피쳐 수 불일치: 모델 입력 {manifest['input_size']}개, 피쳐 목록 {len(columns)}개")
+
+    return LSTMForecaster(
+        model=model,
+        scaler_X=ArrayScaler(tensors['scaler_X.mean'], tensors['scaler_X.scale']),
+        scaler_y=ArrayScaler(tensors['scaler_y.mean'], tensors['scaler_y.scale']),
+        target_columns=list(manifest['target_columns']),
+        feature_columns=list(columns) if columns is not None else None,
+        seq_length=int(params['seq_length']),
+        version=manifest['model_version'],
+        hyperparameters=dict(params),
+    )
+
+def is_artifact(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, MANIFEST_FILE))
+
+def convert_checkpoint(checkpoint_path: str, artifact_path: str) -> str:
+    """기존 torch.save 체크포인트(.pth)를 아티팩트로 변환 (변환 시 한 번만 unpickle)"""
+    from lstm_model import load_checkpoint
+    checkpoint = torch.load(checkpoint_path, map_location='cpu', weights_only=False)
+    forecaster = load_checkpoint(checkpoint_path)
+    return save_artifact(
+        artifact_path, forecaster.model, forecaster.scaler_X, forecaster.scaler_y,
+        hyperparameters=forecaster.hyperparameters,
+        target_columns=forecaster.target_columns,
+        feature_columns=forecaster.feature_columns,
+        metrics=checkpoint.get('model_performance'),
+    )
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("사용법: python model_artifact.py <체크포인트.pth> <아티팩트 디렉토리>")
+        sys.exit(1)
+    version = convert_checkpoint(sys.argv[1], sys.argv[2])
+    print(f"아티팩트 저장: {sys.argv[2]} (모델 버전 {version})")
@@ -0,0 +1,249 @@
+"""
+MultivariateLSTM CPU 추론용 내보내기 및 런타임 선택
+- TorchScript (fp32), TorchScript + 동적 int8 양자화 (LSTM, Linear), ONNX (onnx/onnxruntime 설치 시)
+- load_fastest(): 내보낸 파일 중 수치 오차가 허용 범위인 런타임을 짧게 측정해 가장 빠른 것을 LSTMForecaster에 연결
+- benchmark(): eager 대비 지연시간/처리량/수치 오차 비교
+
+사용법:
+    python model_export.py --checkpoint lstm_model_checkpoint.pth --export-dir exported --benchmark --output export_benchmark.json
+"""
+
+import argparse
+import copy
+import importlib.util
+import json
+import logging
+import os
+import time
+import warnings
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from lstm_model import DEFAULT_CHECKPOINT_PATH, LSTMForecaster, load_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'exported')
+RUNTIMES = ['eager', 'torchscript', 'torchscript_int8', 'onnx']
+ONNX_AVAILABLE = importlib.util.find_spec('onnx') is not None
+ONNXRUNTIME_AVAILABLE = importlib.util.find_spec('onnxruntime') is not None
+# auto 선택 시 허용하는 eager 대비 최대 오차 (스케일된 출력 단위, 표준편차 대비)
+MAX_DRIFT = 0.05
+
+class EagerRuntime:
+    name = 'eager'
+
+    def __init__(self, model: nn.Module):
+        self.model = model.eval()
+
+    def run(self, x: np.ndarray) -> np.ndarray:
+        with torch.no_grad():
+            return self.model(torch.from_numpy(x)).numpy()
+
+class TorchScriptRuntime(EagerRuntime):
+    def __init__(self, path: str, name: str = 'torchscript'):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            module = torch.jit.load(path, map_location='cpu')
+        super().__init__(module)
+        self.name = name
+
+class OnnxRuntime:
+    name = 'onnx'
+
+    def __init__(self, path: str):
+        import onnxruntime
+        self.session = onnxruntime.InferenceSession(path, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def run(self, x: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: x})[0]
+
+def export_paths(export_dir: str, version: str) -> Dict[str, str]:
+    """체크포인트 버전(파일 해시)별 내보내기 파일 경로"""
+    return {
+        'torchscript': os.path.join(export_dir, f'lstm_{version}.ts'),
+        'torchscript_int8': os.path.join(export_dir, f'lstm_{version}.int8.ts'),
+        'onnx': os.path.join(export_dir, f'lstm_{version}.onnx'),
+    }
+
+def quantize_dynamic(model: nn.Module) -> nn.Module:
+    """LSTM, Linear 가중치를 int8로 동적 양자화 (활성값은 실행 시 양자화)"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return torch.ao.quantization.quantize_dynamic(copy.deepcopy(model).eval(), {nn.LSTM, nn.Linear},
+                                                      dtype=torch.qint8)
+
+def _script(model: nn.Module, path: str):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        torch.jit.script(model).save(path)
+
+def _export_onnx(model: nn.Module, example: torch.Tensor, path: str):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        torch.onnx.export(
+            model, (example,), path,
+            input_names=['input'], output_names=['output'],
+            dynamic_axes={'input': {0: 'batch'}, 'output': {0: 'batch'}},
+            opset_version=17
+        )
+
+def export_model(forecaster: LSTMForecaster, export_dir: str = DEFAULT_EXPORT_DIR,
+                 formats: Sequence[str] = ('torchscript', 'torchscript_int8', 'onnx')) -> Dict[str, str]:
+    """학습된 모델을 CPU 런타임용 파일로 내보내기, 생성된 {런타임: 경로} 반환 (onnx 미설치 시 onnx는 건너뜀)"""
+    os.makedirs(export_dir, exist_ok=True)
+    model = copy.deepcopy(forecaster.model).cpu().eval()
+    paths = export_paths(export_dir, forecaster.version)
+    exported = {}
+
+    for name in formats:
+        if name not in paths:
+            raise ValueError(f"알 수 없는 내보내기 형식: {name}")
+        try:
+            if name == 'torchscript':
+                _script(model, paths[name])
+            elif name == 'torchscript_int8':
+                _script(quantize_dynamic(model), paths[name])
+            elif name == 'onnx':
+                if not ONNX_AVAILABLE:
+                    logger.warning("onnx가 설치되어 있지 않아 ONNX 내보내기를 건너뜁니다.")
+                    continue
+                n_features = model.lstm.input_size
+                _export_onnx(model, torch.zeros(1, forecaster.seq_length, n_features), paths[name])
+            exported[name] = paths[name]
+        except Exception as e:
+            logger.warning(f"{name} 내보내기 실패: {e}")
+    return exported
+
+def available_runtimes(forecaster: LSTMForecaster, export_dir: str = DEFAULT_EXPORT_DIR) -> Dict[str, object]:
+    """eager + 내보낸 파일이 있고 실행 라이브러리가 설치된 런타임"""
+    runtimes = {'eager': EagerRuntime(forecaster.model.cpu())}
+    paths = export_paths(export_dir, forecaster.version)
+    for name in ('torchscript', 'torchscript_int8'):
+        if os.path.exists(paths[name]):
+            runtimes[name] = TorchScriptRuntime(paths[name], name)
+    if ONNXRUNTIME_AVAILABLE and os.path.exists(paths['onnx']):
+        runtimes['onnx'] = OnnxRuntime(paths['onnx'])
+    return runtimes
+
+def _sample_inputs(forecaster: LSTMForecaster, batch_size: int, seed: int = 0) -> np.ndarray:
+    """스케일된 입력 공간의 표준정규 윈도우 (스케일러 출력과 같은 분포)"""
+    n_features = forecaster.model.lstm.input_size
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((batch_size, forecaster.seq_length, n_features)).astype(np.float32)
+
+def _latencies(runtime, x: np.ndarray, repeats: int, warmup: int = 5) -> np.ndarray:
+    for _ in range(warmup):
+        runtime.run(x)
+    times = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        runtime.run(x)
+        times[i] = time.perf_counter() - start
+    return times
+
+def drift(runtime, reference, x: np.ndarray) -> float:
+    """eager 대비 최대 절대 오차 (스케일된 출력 단위)"""
+    return float(np.abs(runtime.run(x) - reference.run(x)).max())
+
+def benchmark(forecaster: LSTMForecaster, runtimes: Dict[str, object], batch_sizes: Sequence[int] = (1, 64),
+              repeats: int = 200) -> Dict[str, Dict]:
+    """
+    런타임별 지연시간(ms, p50/p95), 처리량(윈도우/초), eager 대비 오차
+    오차는 스케일된 출력 단위와 원 단위(차분값, scaler_y 역변환 기준) 모두 기록
+    """
+    reference = runtimes['eager']
+    drift_inputs = _sample_inputs(forecaster, 256, seed=1)
+    scale = np.asarray(forecaster.scaler_y.scale_)
+    report = {}
+    for name, runtime in runtimes.items():
+        result = {}
+        for batch_size in batch_sizes:
+            times = _latencies(runtime, _sample_inputs(forecaster, batch_size), repeats)
+            result[f'batch_{batch_size}'] = {
+                'latency_ms_p50': round(float(np.median(times)) * 1000, 4),
+                'latency_ms_p95': round(float(np.percentile(times, 95)) * 1000, 4),
+                'throughput_per_s': round(batch_size / float(np.mean(times)), 1),
+            }
+        diff = np.abs(runtime.run(drift_inputs) - reference.run(drift_inputs))
+        result['max_drift_scaled'] = float(diff.max())
+        result['max_drift_original'] = (diff * scale).max(axis=0).round(8).tolist()
+        report[name] = result
+    return report
+
+def select_runtime(forecaster: LSTMForecaster, runtimes: Dict[str, object], max_drift: float = MAX_DRIFT,
+                   repeats: int = 30):
+    """오차가 max_drift 이하인 런타임 중 배치 1 지연시간 중앙값이 가장 짧은 것"""
+    x = _sample_inputs(forecaster, 1)
+    drift_inputs = _sample_inputs(forecaster, 64, seed=1)
+    best, best_time = runtimes['eager'], None
+    for name, runtime in runtimes.items():
+        if name != 'eager' and drift(runtime, runtimes['eager'], drift_inputs) > max_drift:
+            logger.warning(f"{name} 런타임 오차가 허용 범위를 넘어 제외합니다.")
+            continue
+        latency = float(np.median(_latencies(runtime, x, repeats)))
+        if best_time is None or latency < best_time:
+            best, best_time = runtime, latency
+    return best
+
+def load_fastest(checkpoint_path: str = DEFAULT_CHECKPOINT_PATH, export_dir: str = DEFAULT_EXPORT_DIR,
+                 feature_columns: Optional[List[str]] = None, runtime: str = 'auto',
+                 max_drift: float = MAX_DRIFT) -> LSTMForecaster:
+    """
+    체크포인트(.pth) 또는 아티팩트 디렉토리 로드 후 추론 런타임 연결
+    - runtime='auto': 사용 가능한 런타임을 짧게 측정해 가장 빠른 것 선택
+    - 그 외: 지정한 런타임 (파일이 없으면 eager로 대체)
+    """
+    if runtime != 'auto' and runtime not in RUNTIMES:
+        raise ValueError(f"알 수 없는 런타임: {runtime} (가능: auto, {', '.join(RUNTIMES)})")
+    forecaster = load_model(checkpoint_path, feature_columns=feature_columns)
+    runtimes = available_runtimes(forecaster, export_dir)
+    if runtime == 'auto':
+        forecaster.runtime = select_runtime(forecaster, runtimes, max_drift)
+    elif runtime in runtimes:
+        forecaster.runtime = runtimes[runtime]
+    else:
+        logger.warning(f"{runtime} 런타임을 사용할 수 없어 eager로 실행합니다.")
+        forecaster.runtime = runtimes['eager']
+    return forecaster
+
+def main():
+    parser = argparse.ArgumentParser(description="LSTM CPU 추론 내보내기 및 벤치마크")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH, help="체크포인트(.pth) 또는 아티팩트 디렉토리 경로")
+    parser.add_argument('--export-dir', default=DEFAULT_EXPORT_DIR, help="내보내기 디렉토리")
+    parser.add_argument('--formats', default='torchscript,torchscript_int8,onnx', help="쉼표로 구분된 내보내기 형식")
+    parser.add_argument('--benchmark', action='store_true', help="eager 대비 지연시간/처리량/오차 측정")
+    parser.add_argument('--threads', type=int, default=None, help="torch 연산 스레드 수 (서빙 환경과 맞출 때)")
+    parser.add_argument('--repeats', type=int, default=200, help="벤치마크 반복 횟수")
+    parser.add_argument('--output', default='export_benchmark.json', help="벤치마크 결과 JSON 경로")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    forecaster = load_model(args.checkpoint)
+    exported = export_model(forecaster, args.export_dir, args.formats.split(','))
+    for name, path in exported.items():
+        print(f"{name}: {path} ({os.path.getsize(path) / 1024:.1f} KB)")
+
+    if args.benchmark:
+        runtimes = available_runtimes(forecaster, args.export_dir)
+        report = {
+            'timestamp': datetime.now().isoformat(),
+            'torch': torch.__version__,
+            'threads': torch.get_num_threads(),
+            'model_version': forecaster.version,
+            'runtimes': benchmark(forecaster, runtimes, repeats=args.repeats),
+        }
+        for name, result in report['runtimes'].items():
+            print(f"[{name}] {json.dumps(result, ensure_ascii=False)}")
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+if __name__ == "__main__":
+    main()
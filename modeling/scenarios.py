@@ -0,0 +1,212 @@
+"""
+LSTM 다중 시나리오 예측 엔진
+N개의 충격(기준금리 인상, 신용스프레드 확대 등) 시나리오 입력 윈도우를 하나의 배치로 쌓아
+모든 시나리오를 동시에(lock-step) 자기회귀 방식으로 horizon개월 굴려 (N, horizon, targets) 수준값 예측을 반환
+
+매 스텝마다 예측한 타겟 차분값으로 타겟 수준/차분 이력을 갱신하고, 피쳐 이름 규칙에 따라 다음 달 입력 피쳐 행을 다시 계산함
+(노트북의 predict_future_improved처럼 같은 차분값을 반복해서 더하지 않음)
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 피쳐 이름 규칙으로 알 수 없는 파생 변수 (preprocessing.py feature_engineering과 동일한 정의)
+# 이름 -> (종류, 타겟, 인자)
+DERIVED_ALIASES = {
+    'construction_bsi_mom': ('level_pct', 'construction_bsi_actual', 1),
+    'construction_bsi_ma3': ('level_ma', 'construction_bsi_actual', 3),
+    'base_rate_mdiff_bp': ('diff_scale', 'base_rate', 100),
+}
+
+@dataclass
+class FeatureSpec:
+    """입력 피쳐 하나를 타겟 이력으로부터 계산하는 방법 (kind='exog'이면 직전 값 유지)"""
+    name: str
+    kind: str
+    target: Optional[int] = None
+    arg: float = 0
+
+def parse_feature(name: str, target_columns: Sequence[str]) -> FeatureSpec:
+    """피쳐 이름을 FeatureSpec으로 변환 (타겟 이름이 긴 것부터 매칭)"""
+    if name in DERIVED_ALIASES:
+        kind, target, arg = DERIVED_ALIASES[name]
+        if target in target_columns:
+            return FeatureSpec(name, kind, list(target_columns).index(target), arg)
+        return FeatureSpec(name, 'exog')
+
+    for idx, target in sorted(enumerate(target_columns), key=lambda item: -len(item[1])):
+        if name == target:
+            return FeatureSpec(name, 'level', idx)
+        if not name.startswith(f'{target}_'):
+            continue
+        suffix = name[len(target) + 1:]
+        if suffix == 'diff':
+            return FeatureSpec(name, 'diff', idx)
+        if suffix == 'diff_pct_change':
+            return FeatureSpec(name, 'diff_pct', idx)
+        match = re.fullmatch(r'diff_ma(\d+)', suffix)
+        if match:
+            return FeatureSpec(name, 'diff_ma', idx, int(match.group(1)))
+        match = re.fullmatch(r'diff_lag(\d+)', suffix)
+        if match:
+            return FeatureSpec(name, 'diff_lag', idx, int(match.group(1)))
+        match = re.fullmatch(r'lag(\d+)', suffix)
+        if match:
+            return FeatureSpec(name, 'level_lag', idx, int(match.group(1)))
+    return FeatureSpec(name, 'exog')
+
+class FeatureRoller:
+    """
+    타겟 수준/차분 이력 (N, H, targets)에서 다음 입력 피쳐 행 (N, features)을 벡터화 계산
+    외생 피쳐(exog)는 직전 행 값을 그대로 유지 (persistence)
+    """
+
+    def __init__(self, feature_columns: Sequence[str], target_columns: Sequence[str]):
+        self.feature_columns = list(feature_columns)
+        self.target_columns = list(target_columns)
+        self.specs = [parse_feature(name, self.target_columns) for name in self.feature_columns]
+        lookbacks = [1]
+        for spec in self.specs:
+            if spec.kind in ('diff_ma', 'level_ma'):
+                lookbacks.append(int(spec.arg))
+            elif spec.kind in ('diff_lag', 'level_lag'):
+                lookbacks.append(int(spec.arg) + 1)
+            elif spec.kind in ('diff_pct', 'level_pct'):
+                lookbacks.append(2)
+        # 차분을 계산하려면 수준값 한 달이 더 필요
+        self.history_length = max(lookbacks) + 1
+
+    @property
+    def exog_mask(self) -> np.ndarray:
+        return np.array([spec.kind == 'exog' for spec in self.specs])
+
+    def row(self, levels: np.ndarray, diffs: np.ndarray, prev_row: np.ndarray) -> np.ndarray:
+        """levels, diffs: (N, H, targets) 마지막 축 H-1이 현재 월 / prev_row: (N, features)"""
+        out = np.array(prev_row, dtype=np.float64, copy=True)
+        for j, spec in enumerate(self.specs):
+            t = spec.target
+            if spec.kind == 'exog':
+                continue
+            if spec.kind == 'level':
+                out[:, j] = levels[:, -1, t]
+            elif spec.kind == 'diff':
+                out[:, j] = diffs[:, -1, t]
+            elif spec.kind == 'diff_scale':
+                out[:, j] = diffs[:, -1, t] * spec.arg
+            elif spec.kind == 'diff_ma':
+                out[:, j] = diffs[:, -int(spec.arg):, t].mean(axis=1)
+            elif spec.kind == 'diff_lag':
+                out[:, j] = diffs[:, -1 - int(spec.arg), t]
+            elif spec.kind == 'level_lag':
+                out[:, j] = levels[:, -1 - int(spec.arg), t]
+            elif spec.kind == 'level_ma':
+                out[:, j] = levels[:, -int(spec.arg):, t].mean(axis=1)
+            elif spec.kind == 'level_pct':
+                out[:, j] = _pct_change(levels[:, -1, t], levels[:, -2, t])
+            elif spec.kind == 'diff_pct':
+                out[:, j] = _pct_change(diffs[:, -1, t], diffs[:, -2, t])
+        return out
+
+def _pct_change(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """pandas pct_change와 같이 직전 값이 0이면 inf, 결측은 0 (학습 시 fillna(0)와 동일)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = current / previous - 1.0
+    return np.nan_to_num(change, nan=0.0)
+
+def level_diffs(levels: np.ndarray) -> np.ndarray:
+    """수준 이력 (..., H, targets)의 1차 차분 (첫 달은 NaN)"""
+    diffs = np.full(levels.shape, np.nan)
+    diffs[..., 1:, :] = np.diff(levels, axis=-2)
+    return diffs
+
+@dataclass
+class Scenario:
+    """
+    충격 시나리오
+    - level_shocks: 기준월 타겟 수준에 더할 값 (예: {'base_rate': 0.5}), 해당 타겟의 파생 피쳐도 함께 재계산
+    - feature_shocks: 외생 피쳐에 더할 값 (예: {'esi': -5.0}), 예측 기간 동안 유지
+    """
+    name: str
+    level_shocks: Dict[str, float] = field(default_factory=dict)
+    feature_shocks: Dict[str, float] = field(default_factory=dict)
+
+def build_scenarios(roller: FeatureRoller, base_window: np.ndarray, base_levels: np.ndarray,
+                    scenarios: Sequence[Scenario]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    기준 윈도우 (seq_length, features)와 타겟 수준 이력 (H, targets)을 시나리오 수만큼 복제한 뒤 충격 적용
+    반환: windows (N, seq_length, features), levels (N, H, targets)
+    """
+    n = len(scenarios)
+    windows = np.repeat(np.asarray(base_window, dtype=np.float64)[None], n, axis=0)
+    levels = np.repeat(np.asarray(base_levels, dtype=np.float64)[None], n, axis=0)
+    exog = roller.exog_mask
+
+    for i, scenario in enumerate(scenarios):
+        for target, shock in scenario.level_shocks.items():
+            if target not in roller.target_columns:
+                raise ValueError(f"알 수 없는 타겟: {target}")
+            levels[i, -1, roller.target_columns.index(target)] += shock
+        for feature, shock in scenario.feature_shocks.items():
+            if feature not in roller.feature_columns:
+                raise ValueError(f"알 수 없는 피쳐: {feature}")
+            j = roller.feature_columns.index(feature)
+            if not exog[j]:
+                raise ValueError(f"{feature}는 타겟 파생 피쳐입니다. level_shocks로 지정하세요.")
+            windows[i, -1, j] += shock
+
+    # 수준 충격을 기준월 파생 피쳐(차분, 변화율 등)에 반영 (충격이 없는 시나리오는 저장된 피쳐 그대로)
+    shocked = [i for i, scenario in enumerate(scenarios) if scenario.level_shocks]
+    if shocked:
+        windows[shocked, -1] = roller.row(levels[shocked], level_diffs(levels[shocked]), windows[shocked, -1])
+    return windows, levels
+
+def rollout(predict_diffs, roller: FeatureRoller, windows: np.ndarray, levels: np.ndarray,
+            horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    모든 시나리오를 lock-step으로 horizon개월 자기회귀 예측
+    - predict_diffs: (N, seq_length, features) → (N, targets) 원 단위 차분 예측 함수 (LSTMForecaster.predict_diffs)
+    - windows: (N, seq_length, features), levels: (N, H, targets)
+    반환: 수준 예측 (N, horizon, targets), 차분 예측 (N, horizon, targets)
+    """
+    n, seq_length, n_features = windows.shape
+    history = levels.shape[1]
+    n_targets = levels.shape[2]
+
+    # 윈도우/이력을 미리 할당한 버퍼의 슬라이딩 뷰로 관리 (스텝마다 concatenate 하지 않음)
+    feature_buf = np.empty((n, seq_length + horizon, n_features))
+    feature_buf[:, :seq_length] = windows
+    level_buf = np.full((n, history + horizon, n_targets), np.nan)
+    level_buf[:, :history] = levels
+    diff_buf = level_diffs(level_buf)
+
+    for h in range(horizon):
+        window = feature_buf[:, h:h + seq_length]
+        diff = predict_diffs(window)
+        level_buf[:, history + h] = level_buf[:, history + h - 1] + diff
+        diff_buf[:, history + h] = diff
+        if h + 1 < horizon:
+            feature_buf[:, seq_length + h] = roller.row(
+                level_buf[:, h + 1:history + h + 1],
+                diff_buf[:, h + 1:history + h + 1],
+                feature_buf[:, seq_length + h - 1],
+            )
+
+    return level_buf[:, history:], diff_buf[:, history:]
+
+def run_scenarios(forecaster, base_window: np.ndarray, base_levels: np.ndarray,
+                  scenarios: Sequence[Scenario], horizon: int) -> np.ndarray:
+    """시나리오 목록 → (N, horizon, targets) 수준 예측 (LSTMForecaster 사용)"""
+    roller = FeatureRoller(forecaster.feature_columns, forecaster.target_columns)
+    windows, levels = build_scenarios(roller, base_window, base_levels, scenarios)
+    level_paths, _ = rollout(forecaster.predict_diffs, roller, windows, levels, horizon)
+    return level_paths
+
+def shock_grid(target: str, shocks: Sequence[float], prefix: Optional[str] = None) -> List[Scenario]:
+    """단일 타겟 충격 크기별 시나리오 목록 (스트레스 테스트용)"""
+    prefix = prefix or target
+    return [Scenario(name=f'{prefix}{shock:+g}', level_shocks={target: float(shock)}) for shock in shocks]
@@ -0,0 +1,293 @@
+"""
+LSTM 학습용 시퀀스 데이터 준비
+기존 create_sequences는 윈도우마다 슬라이스를 복사해 메모리가 seq_length배로 늘어나므로,
+기준 행렬을 split별 스케일러로 한 번만 변환한 뒤 sliding_window_view(복사 없는 뷰)로 윈도우를 노출하고
+배치는 학습 시점에 필요한 윈도우만 연속 텐서로 만들어 반환
+
+준비 결과는 (데이터 해시, seq_length, 분할 비율) 단위로 PreparedCache에 저장되어
+Optuna 시행 간(프로세스 간 포함, 디스크 memmap) 재사용됨
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import torch
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.preprocessing import StandardScaler
+
+def window_count(n_rows: int, seq_length: int, pred_length: int = 1) -> int:
+    """윈도우 수 (create_sequences와 동일: len(X) - seq_length - pred_length + 1)"""
+    return max(0, n_rows - seq_length - pred_length + 1)
+
+def window_view(X: np.ndarray, seq_length: int, n_windows: Optional[int] = None) -> np.ndarray:
+    """(n_rows, features) → (n_windows, seq_length, features) 읽기 전용 뷰 (복사 없음)"""
+    windows = sliding_window_view(X, seq_length, axis=0).transpose(0, 2, 1)
+    return windows if n_windows is None else windows[:n_windows]
+
+def create_sequences(X, y, seq_length, pred_length=1):
+    """
+    시계열 데이터를 LSTM 입력용 시퀀스로 변환 (노트북 create_sequences와 같은 값, 복사 없는 뷰로 반환)
+    - X_seq[i] = X[i:i + seq_length], y_seq[i] = y[i + seq_length]
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    n = window_count(len(X), seq_length, pred_length)
+    return window_view(X, seq_length, n), y[seq_length:seq_length + n]
+
+def split_bounds(total_samples: int, test_size: float = 0.2, val_size: float = 0.1) -> Tuple[int, int]:
+    """시간 순서 유지 분할 경계 (val_start, test_start) - prepare_data_no_leakage와 동일"""
+    test_start = int(total_samples * (1 - test_size))
+    val_start = int(test_start * (1 - val_size))
+    return val_start, test_start
+
+def window_row_counts(n_rows: int, seq_length: int, n_windows: int) -> np.ndarray:
+    """
+    윈도우 0..n_windows-1 에 각 행이 몇 번 포함되는지
+    (학습 윈도우를 펼쳐 fit한 스케일러와 같은 값을 행 단위 가중치로 얻기 위해 사용)
+    """
+    # 윈도우 i는 [i, i + seq_length) 행을 포함: 시작(+1)/끝(-1) 표시의 누적합
+    marks = np.zeros(n_rows + 1, dtype=np.int64)
+    marks[:n_windows] += 1
+    marks[seq_length:seq_length + n_windows] -= 1
+    return np.cumsum(marks)[:n_rows]
+
+class WindowDataset(torch.utils.data.Dataset):
+    """스케일된 기준 행렬 위의 윈도우 뷰 (index i → (seq_length, features) 입력, (targets,) 타겟)"""
+
+    def __init__(self, X_scaled: np.ndarray, y_scaled: np.ndarray, seq_length: int, start: int, stop: int):
+        self.windows = window_view(X_scaled, seq_length)
+        self.targets = y_scaled
+        self.seq_length = seq_length
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, i):
+        X_batch, y_batch = self.batch(np.array([i]))
+        return X_batch[0], y_batch[0]
+
+    def batch(self, indices: np.ndarray) -> Tuple[torch.Tensor, torch.Tensor]:
+        """split 내부 인덱스 배열 → 연속 메모리 텐서 (B, seq_length, features), (B, targets)"""
+        rows = indices + self.start
+        X_batch = np.ascontiguousarray(self.windows[rows], dtype=np.float32)
+        y_batch = np.ascontiguousarray(self.targets[rows + self.seq_length], dtype=np.float32)
+        return torch.from_numpy(X_batch), torch.from_numpy(y_batch)
+
+class WindowLoader:
+    """
+    DataLoader 대체 (for batch_X, batch_y in loader / len(loader) / loader.dataset 지원)
+    배치마다 필요한 윈도우만 복사해 device로 옮김
+    """
+
+    def __init__(self, dataset: WindowDataset, batch_size: int, shuffle: bool = False, device=None):
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.device = device
+
+    def __len__(self):
+        return (len(self.dataset) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        n = len(self.dataset)
+        # torch 난수 사용 (torch.manual_seed 재현성은 DataLoader와 동일하게 유지)
+        order = torch.randperm(n).numpy() if self.shuffle else np.arange(n)
+        for start in range(0, n, self.batch_size):
+            X_batch, y_batch = self.dataset.batch(order[start:start + self.batch_size])
+            if self.device is not None:
+                X_batch = X_batch.to(self.device, non_blocking=True)
+                y_batch = y_batch.to(self.device, non_blocking=True)
+            yield X_batch, y_batch
+
+@dataclass
+class PreparedSequences:
+    """split별 스케일러로 변환한 기준 행렬과 분할 경계 (윈도우는 필요할 때 뷰로 생성)"""
+    X_scaled: np.ndarray
+    y_scaled: np.ndarray
+    seq_length: int
+    val_start: int
+    test_start: int
+    n_windows: int
+    scaler_X: StandardScaler
+    scaler_y: StandardScaler
+
+    def dataset(self, split: str) -> WindowDataset:
+        bounds = {
+            'train': (0, self.val_start),
+            'val': (self.val_start, self.test_start),
+            'test': (self.test_start, self.n_windows),
+        }
+        start, stop = bounds[split]
+        return WindowDataset(self.X_scaled, self.y_scaled, self.seq_length, start, stop)
+
+    def loaders(self, batch_size: int, device=None) -> Tuple[WindowLoader, WindowLoader, WindowLoader]:
+        return (
+            WindowLoader(self.dataset('train'), batch_size, shuffle=True, device=device),
+            WindowLoader(self.dataset('val'), batch_size, shuffle=False, device=device),
+            WindowLoader(self.dataset('test'), batch_size, shuffle=False, device=device),
+        )
+
+def prepare_sequences(X, y, seq_length, test_size=0.2, val_size=0.1) -> PreparedSequences:
+    """
+    윈도우를 만들지 않고 스케일링/분할 수행
+    - scaler_X: 학습 윈도우를 펼친 행들(중복 포함)로 fit한 것과 같도록 행별 포함 횟수를 sample_weight로 사용
+    - scaler_y: 학습 타겟으로 fit
+    - 기준 행렬 전체를 한 번만 transform (행 단위 변환이므로 split별 변환과 같은 값)
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n_windows = window_count(len(X), seq_length)
+    val_start, test_start = split_bounds(n_windows, test_size, val_size)
+
+    weights = window_row_counts(len(X), seq_length, val_start)
+    used = weights > 0
+    scaler_X = StandardScaler().fit(X[used], sample_weight=weights[used])
+    scaler_y = StandardScaler().fit(y[seq_length:seq_length + val_start])
+
+    return PreparedSequences(
+        X_scaled=scaler_X.transform(X).astype(np.float32),
+        y_scaled=scaler_y.transform(y).astype(np.float32),
+        seq_length=seq_length,
+        val_start=val_start,
+        test_start=test_start,
+        n_windows=n_windows,
+        scaler_X=scaler_X,
+        scaler_y=scaler_y,
+    )
+
+def data_fingerprint(X, y) -> str:
+    """X, y 내용 해시 (준비 데이터 캐시 키, Optuna 스터디 데이터 검증에 사용)"""
+    digest = hashlib.sha256()
+    for array in (X, y):
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:16]
+
+def _scaler_state(scaler: StandardScaler) -> Dict:
+    return {
+        'mean': scaler.mean_.tolist(),
+        'scale': scaler.scale_.tolist(),
+        'var': scaler.var_.tolist(),
+        'n_samples_seen': float(np.asarray(scaler.n_samples_seen_).max()),
+    }
+
+def _scaler_from_state(state: Dict) -> StandardScaler:
+    scaler = StandardScaler()
+    scaler.mean_ = np.asarray(state['mean'], dtype=np.float64)
+    scaler.scale_ = np.asarray(state['scale'], dtype=np.float64)
+    scaler.var_ = np.asarray(state['var'], dtype=np.float64)
+    scaler.n_samples_seen_ = state['n_samples_seen']
+    scaler.n_features_in_ = len(scaler.mean_)
+    return scaler
+
+class PreparedCache:
+    """
+    prepare_sequences 결과 캐시
+    - 프로세스 내: dict 조회 (같은 키는 같은 PreparedSequences 객체 반환)
+    - 프로세스 간: cache_dir/<키>/ 에 X.npy, y.npy(스케일된 기준 행렬), meta.json(스케일러, 분할 경계) 저장 후 mmap으로 읽음
+    seq_length는 4가지, 분할 비율은 고정이므로 스터디 전체에서 준비 작업은 seq_length별 한 번만 수행됨
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or os.getenv(
+            'PREPARED_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'lstm_prepared'))
+        self._memory: Dict[Tuple, PreparedSequences] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, fingerprint: str, seq_length: int, test_size: float, val_size: float) -> str:
+        return f'{fingerprint}_s{int(seq_length)}_t{test_size:g}_v{val_size:g}'
+
+    def get(self, X, y, seq_length, test_size=0.2, val_size=0.1,
+            fingerprint: Optional[str] = None) -> PreparedSequences:
+        """캐시 조회, 없으면 prepare_sequences 실행 후 저장 (fingerprint를 넘기면 해시 계산 생략)"""
+        fingerprint = fingerprint or data_fingerprint(X, y)
+        key = self.key(fingerprint, seq_length, test_size, val_size)
+        prepared = self._memory.get(key)
+        if prepared is not None:
+            self.hits += 1
+            return prepared
+
+        prepared = self._load(key)
+        if prepared is None:
+            self.misses += 1
+            prepared = prepare_sequences(X, y, seq_length, test_size, val_size)
+            self._save(key, prepared)
+        else:
+            self.hits += 1
+        self._memory[key] = prepared
+        return prepared
+
+    def _load(self, key: str) -> Optional[PreparedSequences]:
+        path = os.path.join(self.cache_dir, key)
+        try:
+            with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+            X_scaled = np.load(os.path.join(path, 'X.npy'), mmap_mode='r')
+            y_scaled = np.load(os.path.join(path, 'y.npy'), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        return PreparedSequences(
+            X_scaled=X_scaled,
+            y_scaled=y_scaled,
+            seq_length=meta['seq_length'],
+            val_start=meta['val_start'],
+            test_start=meta['test_start'],
+            n_windows=meta['n_windows'],
+            scaler_X=_scaler_from_state(meta['scaler_X']),
+            scaler_y=_scaler_from_state(meta['scaler_y']),
+        )
+
+    def _save(self, key: str, prepared: PreparedSequences):
+        """임시 디렉토리에 쓴 뒤 rename으로 공개 (다른 프로세스가 먼저 저장했으면 그대로 사용)"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(prefix=f'.{key}.', dir=self.cache_dir)
+        try:
+            np.save(os.path.join(tmp_path, 'X.npy'), prepared.X_scaled)
+            np.save(os.path.join(tmp_path, 'y.npy'), prepared.y_scaled)
+            meta = {
+                'seq_length': prepared.seq_length,
+                'val_start': prepared.val_start,
+                'test_start': prepared.test_start,
+                'n_windows': prepared.n_windows,
+                'scaler_X': _scaler_state(prepared.scaler_X),
+                'scaler_y': _scaler_state(prepared.scaler_y),
+            }
+            with open(os.path.join(tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.rename(tmp_path, os.path.join(self.cache_dir, key))
+        except OSError:
+            # 같은 키를 다른 프로세스가 먼저 저장한 경우 (rename 대상 디렉토리가 이미 존재)
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def clear(self):
+        self._memory.clear()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+# 프로세스 전역 캐시
+prepared_cache = PreparedCache()
+
+def prepare_data_no_leakage(X, y, seq_length, batch_size, test_size=0.2, val_size=0.1, device=None,
+                            cache: Optional[PreparedCache] = None):
+    """
+    스케일링 누출을 방지한 데이터 준비 함수 (노트북 함수와 같은 반환값)
+    시간 순서를 유지하면서 train/val/test 분할
+    cache를 넘기면 같은 (데이터, seq_length, 분할 비율)의 준비 결과를 재사용
+    """
+    if cache is not None:
+        prepared = cache.get(X, y, seq_length, test_size, val_size)
+    else:
+        prepared = prepare_sequences(X, y, seq_length, test_size, val_size)
+    print(f"Train samples: {prepared.val_start}, Val samples: {prepared.test_start - prepared.val_start}, "
+          f"Test samples: {prepared.n_windows - prepared.test_start}")
+    train_loader, val_loader, test_loader = prepared.loaders(batch_size, device)
+    return train_loader, val_loader, test_loader, prepared.scaler_X, prepared.scaler_y
@@ -0,0 +1,360 @@
+"""
+LSTM 하이퍼파라미터 병렬 탐색 (Optuna)
+노트북의 objective_improved와 같은 탐색 공간/학습 루프를 CPU 코어별 프로세스 풀에서 실행
+- 스터디는 로컬 저장소(SQLite 또는 저널 파일)에 유지되어 커널/프로세스가 죽어도 결과가 남음
+- 같은 study_name/storage로 다시 실행하면 완료된 시행은 건너뜀
+- RDB(SQLite) 저장소는 Optuna 하트비트 사용: 하트비트가 grace_period 동안 끊긴 RUNNING 시행만 FAIL 처리 후
+  같은 파라미터로 재시도 (RetryFailedTrialCallback), 같은 저장소를 쓰는 다른 실행의 살아 있는 시행은 그대로
+- 각 워커는 torch/BLAS 스레드 수를 제한해 코어 과다 점유(oversubscription) 방지
+- --ensemble-seeds K: 시행마다 같은 설정을 시드 K개로 한 번에 학습(ensemble.train_ensemble)해 평균 검증 손실로 평가
+
+사용법:
+    python tuning.py --data xy.npz --n-trials 50 --timeout 600 --workers 4 --threads 1
+    python tuning.py --data xy.npz --n-trials 50 --ensemble-seeds 8
+    (xy.npz: 노트북의 X, y를 np.savez('xy.npz', X=X, y=y)로 저장한 파일)
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+import warnings
+from typing import Optional
+
+import numpy as np
+import optuna
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from optuna.trial import TrialState
+
+from ensemble import train_ensemble
+from lstm_model import MultivariateLSTM
+from sequence_data import PreparedCache, data_fingerprint, prepared_cache
+
+DEFAULT_STORAGE = 'sqlite:///' + os.path.join(os.path.dirname(os.path.abspath(__file__)), 'optuna_lstm.db')
+# 하트비트 (초): 시행 중 HEARTBEAT_INTERVAL마다 기록, GRACE_PERIOD 동안 없으면 죽은 시행으로 보고 FAIL → 재시도
+HEARTBEAT_INTERVAL = 60
+GRACE_PERIOD = 180
+# 하트비트가 끊긴 시행의 최대 재시도 횟수 (워커를 죽이는 설정이 무한히 재시도되지 않도록)
+MAX_RETRY = 3
+# SQLite 잠금 대기 시간 (초, 여러 워커 프로세스가 같은 파일에 기록)
+SQLITE_TIMEOUT = 60
+DEFAULT_STUDY_NAME = 'lstm_improved'
+SEQ_LENGTHS = [12, 18, 24, 30]
+# 스레드 수를 제한할 라이브러리 환경변수 (torch import 전에 설정되어야 적용됨)
+THREAD_ENV_VARS = ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'NUMEXPR_NUM_THREADS']
+
+# 워커 프로세스 전역 데이터 (initializer에서 한 번 설정)
+_worker_data = {}
+
+def make_pruner():
+    """노트북과 동일한 MedianPruner (프루너는 저장소에 저장되지 않으므로 프로세스마다 새로 생성)"""
+    return optuna.pruners.MedianPruner(n_startup_trials=3, n_warmup_steps=5)
+
+def make_storage(storage: str):
+    """
+    'sqlite:///...' 등 URL은 하트비트를 켠 RDB 저장소, 그 외 경로는 저널 파일 저장소
+    (저널 저장소는 하트비트를 지원하지 않아 중단된 RUNNING 시행이 그대로 남음, 완료 수에는 포함되지 않음)
+    """
+    if '://' in storage:
+        engine_kwargs = {'connect_args': {'timeout': SQLITE_TIMEOUT}} if storage.startswith('sqlite') else None
+        callback = optuna.storages.RetryFailedTrialCallback(max_retry=MAX_RETRY)
+        kwargs = dict(heartbeat_interval=HEARTBEAT_INTERVAL, grace_period=GRACE_PERIOD)
+        try:
+            return optuna.storages.RDBStorage(storage, engine_kwargs, heartbeat_stale_trial_callback=callback,
+                                              **kwargs)
+        except TypeError:
+            # optuna 4.x 이전 이름
+            return optuna.storages.RDBStorage(storage, engine_kwargs, failed_trial_callback=callback, **kwargs)
+    try:
+        from optuna.storages.journal import JournalFileBackend
+    except ImportError:
+        # optuna 4.0 이전 이름
+        from optuna.storages import JournalFileStorage as JournalFileBackend
+    return optuna.storages.JournalStorage(JournalFileBackend(storage))
+
+def suggest_params(trial):
+    """노트북 objective_improved와 동일한 탐색 공간"""
+    return {
+        'hidden_size': trial.suggest_categorical('hidden_size', [32, 64, 96, 128]),
+        'num_layers': trial.suggest_int('num_layers', 1, 2),
+        'dropout_rate': trial.suggest_float('dropout_rate', 0.1, 0.4, step=0.1),
+        'learning_rate': trial.suggest_float('learning_rate', 1e-4, 5e-3, log=True),
+        'batch_size': trial.suggest_categorical('batch_size', [16, 32, 64]),
+        'seq_length': trial.suggest_categorical('seq_length', SEQ_LENGTHS),
+        'optimizer_type': trial.suggest_categorical('optimizer_type', ['Adam', 'AdamW']),
+        'weight_decay': trial.suggest_float('weight_decay', 1e-5, 1e-3, log=True),
+        'loss_function': trial.suggest_categorical('loss_function', ['MSE', 'MAE', 'Huber'])
+    }
+
+def objective(trial, X, y, device=None, epochs=30, max_patience=10,
+              cache: PreparedCache = prepared_cache, fingerprint=None):
+    """
+    Optuna 목적 함수 (노트북 objective_improved와 같은 학습 루프)
+    - 데이터 준비는 캐시 조회 (seq_length별로 스터디 전체에서 한 번만 수행)
+    - 에폭별 검증 손실을 report하고 MedianPruner 판단에 따라 TrialPruned 발생
+    """
+    params = suggest_params(trial)
+    try:
+        # 데이터 준비 (스케일링 누출 방지)
+        prepared = cache.get(X, y, seq_length=params['seq_length'], fingerprint=fingerprint)
+        train_loader, val_loader, _ = prepared.loaders(params['batch_size'], device)
+
+        model = MultivariateLSTM(
+            input_size=X.shape[1],
+            hidden_size=params['hidden_size'],
+            num_layers=params['num_layers'],
+            output_size=y.shape[1],
+            dropout_rate=params['dropout_rate']
+        )
+        if device is not None:
+            model = model.to(device)
+
+        # 옵티마이저 설정
+        optimizer_class = optim.Adam if params['optimizer_type'] == 'Adam' else optim.AdamW
+        optimizer = optimizer_class(model.parameters(), lr=params['learning_rate'],
+                                    weight_decay=params['weight_decay'])
+
+        # 손실 함수 선택
+        if params['loss_function'] == 'MSE':
+            criterion = nn.MSELoss()
+        elif params['loss_function'] == 'MAE':
+            criterion = nn.L1Loss()
+        else:  # Huber
+            criterion = nn.HuberLoss(delta=1.0)
+
+        best_val_loss = float('inf')
+        patience = 0
+        for epoch in range(epochs):
+            model.train()
+            for batch_X, batch_y in train_loader:
+                optimizer.zero_grad()
+                loss = criterion(model(batch_X), batch_y)
+                loss.backward()
+                torch.nn.utils.clip_grad_norm_(model.parameters(), 1.0)
+                optimizer.step()
+
+            model.eval()
+            val_loss = 0
+            with torch.no_grad():
+                for batch_X, batch_y in val_loader:
+                    val_loss += criterion(model(batch_X), batch_y).item()
+            avg_val_loss = val_loss / len(val_loader)
+
+            # Early stopping for trial
+            if avg_val_loss < best_val_loss:
+                best_val_loss = avg_val_loss
+                patience = 0
+            else:
+                patience += 1
+                if patience >= max_patience:
+                    break
+
+            # Pruning
+            trial.report(avg_val_loss, epoch)
+            if trial.should_prune():
+                raise optuna.exceptions.TrialPruned()
+
+        return best_val_loss
+
+    except optuna.exceptions.TrialPruned:
+        # TrialPruned도 Exception이므로 아래에서 삼키지 않도록 먼저 다시 발생
+        raise
+    except Exception as e:
+        print(f"Trial failed: {e}")
+        return float('inf')
+
+def ensemble_objective(trial, X, y, n_seeds=4, device=None, epochs=30, max_patience=10,
+                       cache: PreparedCache = prepared_cache, fingerprint=None):
+    """
+    시드 n_seeds개를 배치 앙상블로 동시에 학습하는 목적 함수 (시드 운에 덜 민감한 평가)
+    - 반환값: 멤버별 최저 검증 손실의 평균, 멤버 간 표준편차는 user_attr 'seed_val_std'로 기록
+    - 에폭별 멤버 평균 검증 손실로 pruning
+    """
+    params = suggest_params(trial)
+    try:
+        prepared = cache.get(X, y, seq_length=params['seq_length'], fingerprint=fingerprint)
+        result = train_ensemble(
+            prepared,
+            hidden_size=params['hidden_size'],
+            num_layers=params['num_layers'],
+            dropout_rate=params['dropout_rate'],
+            learning_rates=params['learning_rate'],
+            weight_decays=params['weight_decay'],
+            seeds=[trial.number * n_seeds + i for i in range(n_seeds)],
+            batch_size=params['batch_size'],
+            epochs=epochs,
+            patience=max_patience,
+            loss_function=params['loss_function'],
+            optimizer_type=params['optimizer_type'],
+            device=device,
+            trial=trial
+        )
+        trial.set_user_attr('seed_val_std', float(result.best_val.std()))
+        return float(result.best_val.mean())
+
+    except optuna.exceptions.TrialPruned:
+        raise
+    except Exception as e:
+        print(f"Trial failed: {e}")
+        return float('inf')
+
+def pin_threads(n_threads: int):
+    """현재 프로세스와 이후 생성될 자식 프로세스의 연산 스레드 수 제한"""
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(n_threads)
+    torch.set_num_threads(n_threads)
+
+def _init_worker(X, y, n_threads):
+    pin_threads(n_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # 이미 병렬 작업이 시작된 프로세스에서는 변경 불가
+        pass
+    _worker_data['X'] = X
+    _worker_data['y'] = y
+    _worker_data['fingerprint'] = data_fingerprint(X, y)
+
+def _optimize_worker(study_name, storage, n_trials, deadline, seed, ensemble_seeds=0):
+    """워커 프로세스: 공유 저장소의 스터디를 불러와 전체 완료 시행 수가 n_trials에 도달하거나 deadline까지 실행"""
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.load_study(
+        study_name=study_name,
+        storage=make_storage(storage),
+        sampler=optuna.samplers.TPESampler(seed=seed),
+        pruner=make_pruner()
+    )
+    timeout = None if deadline is None else max(0.0, deadline - time.time())
+    if timeout == 0.0:
+        return
+    X, y, fingerprint = _worker_data['X'], _worker_data['y'], _worker_data['fingerprint']
+    if ensemble_seeds:
+        func = lambda trial: ensemble_objective(trial, X, y, n_seeds=ensemble_seeds, fingerprint=fingerprint)
+    else:
+        func = lambda trial: objective(trial, X, y, fingerprint=fingerprint)
+    study.optimize(
+        func,
+        timeout=timeout,
+        callbacks=[optuna.study.MaxTrialsCallback(n_trials, states=(TrialState.COMPLETE, TrialState.PRUNED))],
+        gc_after_trial=True
+    )
+
+def recover_stale_trials(study) -> int:
+    """
+    하트비트가 grace_period 동안 끊긴 RUNNING 시행을 FAIL 처리하고 재시도 큐에 넣음 (optuna.storages.fail_stale_trials)
+    다른 실행이 같은 저장소에서 진행 중인 시행은 하트비트가 살아 있으므로 건드리지 않음
+    워커의 study.optimize도 시행마다 같은 처리를 하므로, 여기서는 워커를 띄우기 전에 한 번 정리하고 개수만 보고
+    """
+    running = {trial.number for trial in study.get_trials(deepcopy=False, states=(TrialState.RUNNING,))}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', optuna.exceptions.ExperimentalWarning)
+        optuna.storages.fail_stale_trials(study)
+    still_running = {trial.number for trial in study.get_trials(deepcopy=False, states=(TrialState.RUNNING,))}
+    return len(running - still_running)
+
+def finished_trials(study) -> int:
+    return len(study.get_trials(deepcopy=False, states=(TrialState.COMPLETE, TrialState.PRUNED)))
+
+def run_parallel_search(X, y, study_name: str = DEFAULT_STUDY_NAME, storage: str = DEFAULT_STORAGE,
+                        n_trials: int = 50, timeout: Optional[float] = 600, n_workers: Optional[int] = None,
+                        threads_per_worker: int = 1, seed: int = 42, ensemble_seeds: int = 0):
+    """
+    프로세스 풀 병렬 탐색 (중단된 스터디는 이어서 실행)
+    - n_trials: 스터디 전체 기준 완료(COMPLETE/PRUNED) 시행 수 목표 (재실행 시 남은 수만 수행)
+    - timeout: 이번 실행의 전체 제한 시간 (초)
+    - n_workers: 기본값 CPU 코어 수 // threads_per_worker
+    - ensemble_seeds: 0이면 시행당 모델 1개, K이면 시드 K개 앙상블의 평균 검증 손실 (스터디마다 고정)
+    반환: 저장소에서 다시 불러온 optuna.Study
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if n_workers is None:
+        n_workers = max(1, (os.cpu_count() or 1) // threads_per_worker)
+
+    study = optuna.create_study(
+        study_name=study_name,
+        storage=make_storage(storage),
+        direction='minimize',
+        pruner=make_pruner(),
+        load_if_exists=True
+    )
+    fingerprint = data_fingerprint(X, y)
+    saved = study.user_attrs.get('data_fingerprint')
+    if saved is None:
+        study.set_user_attr('data_fingerprint', fingerprint)
+    elif saved != fingerprint:
+        raise ValueError(f"스터디 '{study_name}'는 다른 데이터로 생성되었습니다. study_name 또는 storage를 바꿔 실행하세요.")
+    # 목적 함수 값의 의미가 달라지므로 한 스터디 안에서 평가 방식을 섞지 않음
+    saved_seeds = study.user_attrs.get('ensemble_seeds')
+    if saved_seeds is None:
+        study.set_user_attr('ensemble_seeds', ensemble_seeds)
+    elif saved_seeds != ensemble_seeds:
+        raise ValueError(f"스터디 '{study_name}'는 ensemble_seeds={saved_seeds}로 생성되었습니다.")
+
+    recovered = recover_stale_trials(study)
+    done = finished_trials(study)
+    print(f"Study '{study_name}': 완료 {done}회, 중단 시행 재등록 {recovered}회, 목표 {n_trials}회")
+    if done >= n_trials:
+        return study
+
+    # 워커들이 디스크 캐시를 mmap으로 읽기만 하도록 seq_length별 준비 데이터를 미리 생성
+    for seq_length in SEQ_LENGTHS:
+        prepared_cache.get(X, y, seq_length, fingerprint=fingerprint)
+
+    n_workers = min(n_workers, n_trials - done)
+    deadline = None if timeout is None else time.time() + timeout
+    print(f"Workers: {n_workers} x {threads_per_worker} threads")
+
+    # torch는 fork 이후 스레드 풀이 안전하지 않으므로 spawn 사용, 환경변수는 자식의 torch import 전에 적용됨
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(threads_per_worker))
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(n_workers, initializer=_init_worker, initargs=(X, y, threads_per_worker)) as pool:
+        results = [
+            pool.apply_async(_optimize_worker, (study_name, storage, n_trials, deadline, seed + i, ensemble_seeds))
+            for i in range(n_workers)
+        ]
+        for result in results:
+            result.get()
+
+    study = optuna.load_study(study_name=study_name, storage=make_storage(storage), pruner=make_pruner())
+    print(f"누적 완료 {finished_trials(study)}회 (이번 실행 {finished_trials(study) - done}회)")
+    return study
+
+def main():
+    parser = argparse.ArgumentParser(description="LSTM 하이퍼파라미터 병렬 탐색")
+    parser.add_argument('--data', required=True, help="X, y 배열을 담은 .npz 파일")
+    parser.add_argument('--study', default=DEFAULT_STUDY_NAME, help="스터디 이름")
+    parser.add_argument('--storage', default=DEFAULT_STORAGE, help="저널 파일 경로 또는 sqlite:///경로 URL")
+    parser.add_argument('--n-trials', type=int, default=50, help="전체 완료 시행 수 목표")
+    parser.add_argument('--timeout', type=float, default=600, help="이번 실행 제한 시간 (초, 0이면 제한 없음)")
+    parser.add_argument('--workers', type=int, default=None, help="워커 프로세스 수 (기본: 코어 수 / threads)")
+    parser.add_argument('--threads', type=int, default=1, help="워커당 torch/BLAS 스레드 수")
+    parser.add_argument('--seed', type=int, default=42, help="워커별 TPE 시드 시작값")
+    parser.add_argument('--ensemble-seeds', type=int, default=0, help="시행마다 동시에 학습할 시드 수 (0: 모델 1개)")
+    args = parser.parse_args()
+
+    data = np.load(args.data)
+    study = run_parallel_search(
+        data['X'], data['y'],
+        study_name=args.study,
+        storage=args.storage,
+        n_trials=args.n_trials,
+        timeout=args.timeout or None,
+        n_workers=args.workers,
+        threads_per_worker=args.threads,
+        seed=args.seed,
+        ensemble_seeds=args.ensemble_seeds
+    )
+
+    best_trial = study.best_trial
+    print("\nBest trial:")
+    print(f"  Value: {best_trial.value:.6f}")
+    print("  Params:")
+    for key, value in best_trial.params.items():
+        print(f"    {key}: {value}")
+
+if __name__ == "__main__":
+    main()
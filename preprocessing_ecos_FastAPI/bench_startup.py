@@ -0,0 +1,119 @@
+"""
+전처리 API 기동 시간 벤치마크
+STARTUP_MODE(lazy/eager)별로 모듈 import 시간과 서버 프로세스 시작부터 첫 /data/preview 성공·/ready 200까지의 시간을 측정해 JSON으로 저장
+
+lazy 모드에서 import 직후 pandas/numpy/mysql.connector 내부 모듈이 이미 로드돼 있으면 종료 코드 1
+
+사용법:
+    python bench_startup.py --repeat 5 --output startup_benchmark.json
+    python bench_startup.py --skip-server --repeat 1     # DB 없이 import 시간과 지연 여부만 확인
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import requests
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 실제로 로드되면 sys.modules에 생기는 무거운 패키지 내부 모듈 (lazy 모드에서 import 직후 없어야 함)
+HEAVY_MARKERS = ['pandas.core.frame', 'numpy.linalg', 'mysql.connector.connection', 'numba']
+
+IMPORT_SNIPPET = (
+    "import json, sys, time; start = time.perf_counter(); import preprocessing; "
+    "seconds = time.perf_counter() - start; "
+    f"print(json.dumps({{'seconds': seconds, 'loaded': [m for m in {HEAVY_MARKERS!r} if m in sys.modules]}}))"
+)
+
+def measure_import(mode: str) -> dict:
+    """새 인터프리터에서 preprocessing 모듈 import 시간 (초)과 import 직후 이미 로드된 무거운 모듈"""
+    env = dict(os.environ, STARTUP_MODE=mode, STARTUP_WARMUP='0')
+    result = subprocess.run([sys.executable, '-c', IMPORT_SNIPPET], cwd=CURRENT_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def wait_for(url: str, deadline: float, interval: float = 0.05):
+    """url이 200을 반환할 때까지 대기, 걸린 시각(perf_counter) 반환 (시간 초과 시 None)"""
+    while time.perf_counter() < deadline:
+        try:
+            if requests.get(url, timeout=5).status_code == 200:
+                return time.perf_counter()
+        except requests.RequestException:
+            pass
+        time.sleep(interval)
+    return None
+
+def measure_first_request(mode: str, port: int, timeout: float) -> dict:
+    """uvicorn 프로세스 시작부터 첫 /data/preview 성공, /ready 200까지의 시간 (초)"""
+    env = dict(os.environ, STARTUP_MODE=mode)
+    base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'preprocessing:app', '--host', '127.0.0.1', '--port', str(port)],
+        cwd=CURRENT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = start + timeout
+        listening = wait_for(f"{base_url}/health", deadline)
+        first_preview = wait_for(f"{base_url}/data/preview?limit=1", deadline)
+        ready = wait_for(f"{base_url}/ready", deadline)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    def elapsed(t):
+        return round(t - start, 6) if t is not None else None
+
+    return {
+        'time_to_listen': elapsed(listening),
+        'time_to_first_preview': elapsed(first_preview),
+        'time_to_ready': elapsed(ready),
+    }
+
+def summarize(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {'median': round(statistics.median(values), 6), 'min': round(min(values), 6),
+            'max': round(max(values), 6), 'n': len(values)}
+
+def main():
+    parser = argparse.ArgumentParser(description="전처리 API 기동 시간 벤치마크")
+    parser.add_argument('--modes', default='lazy,eager', help="쉼표로 구분된 STARTUP_MODE 목록")
+    parser.add_argument('--repeat', type=int, default=5, help="모드별 반복 횟수")
+    parser.add_argument('--port', type=int, default=8765, help="벤치마크용 서버 포트")
+    parser.add_argument('--timeout', type=float, default=60.0, help="서버 1회 측정 제한 시간 (초)")
+    parser.add_argument('--skip-server', action='store_true', help="import 시간만 측정 (DB 없이 실행할 때)")
+    parser.add_argument('--output', default='startup_benchmark.json', help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    report = {'timestamp': datetime.now().isoformat(), 'python': sys.version.split()[0], 'modes': {}}
+    deferred = True
+    for mode in args.modes.split(','):
+        imports = [measure_import(mode) for _ in range(args.repeat)]
+        loaded = sorted({name for run in imports for name in run['loaded']})
+        result = {'import_seconds': summarize([run['seconds'] for run in imports]), 'loaded_at_import': loaded}
+        if mode == 'lazy' and loaded:
+            deferred = False
+            print(f"[lazy] import 직후 이미 로드됨 (지연 실패): {', '.join(loaded)}")
+        if not args.skip_server:
+            runs = [measure_first_request(mode, args.port, args.timeout) for _ in range(args.repeat)]
+            for key in ('time_to_listen', 'time_to_first_preview', 'time_to_ready'):
+                result[key] = summarize([run[key] for run in runs])
+        report['modes'][mode] = result
+        print(f"[{mode}] {json.dumps(result, ensure_ascii=False)}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}")
+    if not deferred:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+워커 간 공유 피쳐 캐시
+/preprocess 완료 후 final_features·ecos_data를 메모리 매핑 파일(.npy)로 한 번 게시하고,
+모든 uvicorn 워커가 같은 페이지를 복사 없이(mmap) 붙여서 읽기 요청을 DB 없이 처리
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: 게시 잠금 없이 동작 (정리는 현재 버전보다 오래된 파일만 삭제하므로 안전)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 캐시 이름
+FINAL_FEATURES = 'final_features'
+ECOS_DATA = 'ecos_data'
+
+def _default_cache_dir() -> str:
+    """tmpfs(/dev/shm)가 있으면 공유 메모리에, 없으면 임시 디렉토리에 저장"""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base, 'ie_project_feature_cache')
+
+CACHE_DIR = os.getenv('FEATURE_CACHE_DIR', _default_cache_dir())
+
+class SharedFrameCache:
+    """
+    버전 스탬프가 붙은 DataFrame 공유 캐시
+    - 파일 구성: {name}-{version}.npy (float64 행렬), {name}-{version}.json (컬럼/인덱스 메타), {name}.current (현재 버전)
+    - 게시: 데이터·메타를 쓴 뒤 .current를 원자적으로 교체 (os.replace), 같은 이름의 게시는 {name}.lock으로 직렬화
+    - 조회: .current가 바뀌었을 때만 새 버전을 mmap으로 붙임 (프로세스 내 재사용)
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        # name -> (pointer stat, version, DataFrame)
+        self._attached: Dict[str, Tuple[Tuple[int, int], str, pd.DataFrame]] = {}
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.cache_dir, filename)
+
+    def publish(self, name: str, df: pd.DataFrame, index_column: Optional[str] = None) -> str:
+        """
+        DataFrame 게시 후 버전 반환
+        - index_column: 행 키로 쓸 문자열 컬럼 (예: final_features의 'date'), None이면 DataFrame 인덱스 사용
+        - 나머지 컬럼은 모두 float64로 저장
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        if index_column is not None:
+            keys = df[index_column].astype(str).tolist()
+            values_df = df.drop(columns=[index_column])
+        else:
+            keys = [str(key) for key in df.index]
+            values_df = df
+        columns = [str(col) for col in values_df.columns]
+        matrix = np.ascontiguousarray(values_df.to_numpy(dtype=np.float64, na_value=np.nan))
+
+        meta = {
+            'name': name,
+            'columns': columns,
+            'index_column': index_column,
+            'index_name': df.index.name if index_column is None else None,
+            'index_is_datetime': index_column is None and isinstance(df.index, pd.DatetimeIndex),
+            'keys': keys,
+            'shape': list(matrix.shape),
+        }
+
+        # 다른 프로세스의 같은 이름 게시와 겹치지 않도록 버전 생성부터 정리까지 잠금
+        with self._publish_lock(name):
+            version = datetime.now().strftime('%Y%m%d%H%M%S%f')
+            meta['version'] = version
+            meta['published_at'] = datetime.now().isoformat()
+
+            data_path = self._path(f'{name}-{version}.npy')
+            meta_path = self._path(f'{name}-{version}.json')
+            np.save(data_path, matrix)
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+
+            # 포인터 원자적 교체 (잠금이 없는 환경에서 더 새 버전이 먼저 게시되었으면 되돌리지 않음)
+            current = self.version(name)
+            if current is None or current < version:
+                pointer_tmp = self._path(f'.{name}.current.{os.getpid()}')
+                with open(pointer_tmp, 'w', encoding='utf-8') as f:
+                    f.write(version)
+                os.replace(pointer_tmp, self._path(f'{name}.current'))
+                current = version
+
+            self._remove_stale(name, current)
+        logger.info(f"피쳐 캐시 게시: {name} v{version} {matrix.shape}")
+        return version
+
+    @contextmanager
+    def _publish_lock(self, name: str):
+        """같은 이름의 게시를 프로세스 간 직렬화 ({name}.lock 파일에 fcntl 배타 잠금)"""
+        if fcntl is None:
+            yield
+            return
+        with open(self._path(f'{name}.lock'), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _remove_stale(self, name: str, current_version: str):
+        """
+        현재 버전보다 오래된 버전 파일만 삭제 (이미 mmap으로 붙어 있는 워커는 POSIX에서 계속 읽을 수 있음)
+        다른 프로세스가 쓰는 중인 더 새 버전은 건드리지 않음 (버전은 같은 길이의 시각 문자열이라 문자열 비교로 순서 판단)
+        """
+        prefix = f'{name}-'
+        for filename in os.listdir(self.cache_dir):
+            if not filename.startswith(prefix):
+                continue
+            file_version = os.path.splitext(filename[len(prefix):])[0]
+            if len(file_version) == len(current_version) and file_version.isdigit() and file_version < current_version:
+                try:
+                    os.remove(self._path(filename))
+                except OSError:
+                    pass
+
+    def version(self, name: str) -> Optional[str]:
+        """현재 게시된 버전 (없으면 None)"""
+        try:
+            with open(self._path(f'{name}.current'), encoding='utf-8') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def attach(self, name: str) -> Optional[pd.DataFrame]:
+        """
+        현재 버전을 읽기 전용 DataFrame으로 반환 (없으면 None)
+        값 블록은 mmap 배열을 그대로 사용하므로 워커 수와 무관하게 물리 메모리는 한 벌만 사용
+        """
+        pointer = self._path(f'{name}.current')
+        try:
+            st = os.stat(pointer)
+        except OSError:
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            attached = self._attached.get(name)
+            if attached is not None and attached[0] == stamp:
+                return attached[2]
+
+            version = self.version(name)
+            if version is None:
+                return None
+            try:
+                with open(self._path(f'{name}-{version}.json'), encoding='utf-8') as f:
+                    meta = json.load(f)
+                matrix = np.load(self._path(f'{name}-{version}.npy'), mmap_mode='r')
+            except (OSError, ValueError) as e:
+                # 게시 도중 교체된 경우 등: 다음 요청에서 다시 시도
+                logger.warning(f"피쳐 캐시 연결 실패 ({name} v{version}): {e}")
+                return None
+
+            frame = self._to_frame(meta, matrix)
+            self._attached[name] = (stamp, version, frame)
+            logger.info(f"피쳐 캐시 연결: {name} v{version} {matrix.shape}")
+            return frame
+
+    @staticmethod
+    def _to_frame(meta: dict, matrix: np.ndarray) -> pd.DataFrame:
+        keys: List[str] = meta['keys']
+        if meta['index_column'] is not None:
+            frame = pd.DataFrame(matrix, columns=meta['columns'], copy=False)
+            frame.insert(0, meta['index_column'], keys)
+        else:
+            index = pd.DatetimeIndex(keys) if meta['index_is_datetime'] else pd.Index(keys)
+            index.name = meta['index_name']
+            frame = pd.DataFrame(matrix, columns=meta['columns'], index=index, copy=False)
+        frame.attrs['cache_version'] = meta['version']
+        return frame
+
+# 프로세스 전역 캐시 인스턴스
+feature_cache = SharedFrameCache()
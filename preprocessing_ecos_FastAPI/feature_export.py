@@ -0,0 +1,128 @@
+"""
+final_features 대량 내보내기 모듈
+청크 단위 컬럼 배열을 Arrow IPC / Parquet / CSV 바이트 스트림으로 변환
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import io
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# pyarrow는 Arrow/Parquet 형식에만 필요 (CSV는 pandas만으로 동작)
+# import 비용이 커서 서버 기동 시가 아니라 첫 Arrow/Parquet 요청 시 로드
+_ARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# 형식별 (media type, 파일 확장자)
+EXPORT_FORMATS = {
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrow'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+}
+
+ColumnChunk = Dict[str, 'np.ndarray']
+
+def arrow_available() -> bool:
+    """pyarrow 설치 여부"""
+    return _ARROW_AVAILABLE
+
+def rows_to_columns(columns: List[str], rows: List[tuple]) -> ColumnChunk:
+    """
+    DB 커서 결과(행 튜플 리스트)를 컬럼별 numpy 배열로 변환
+    date는 문자열(YYYYMM), 나머지는 float64 (DECIMAL/None → float/NaN)
+    """
+    transposed = list(zip(*rows)) if rows else [()] * len(columns)
+    chunk = {}
+    for name, values in zip(columns, transposed):
+        if name == 'date':
+            chunk[name] = np.asarray(values, dtype=object)
+        else:
+            chunk[name] = np.asarray(values, dtype=np.float64)
+    return chunk
+
+def frame_chunks(frame: pd.DataFrame, columns: List[str], start_date: Optional[str] = None,
+                 end_date: Optional[str] = None, chunk_size: int = 5000) -> Iterator[ColumnChunk]:
+    """
+    메모리에 있는(공유 캐시) final_features DataFrame을 청크 단위 컬럼 배열로 분할
+    date 범위는 정렬된 YYYYMM 문자열에 대한 이진 탐색으로 잘라냄
+    """
+    dates = frame['date'].to_numpy(dtype=object)
+    lo = 0 if start_date is None else int(np.searchsorted(dates, start_date, side='left'))
+    hi = len(dates) if end_date is None else int(np.searchsorted(dates, end_date, side='right'))
+    values = {col: frame[col].to_numpy() for col in columns}
+    for start in range(lo, hi, chunk_size):
+        stop = min(start + chunk_size, hi)
+        chunk = {'date': dates[start:stop]}
+        for col in columns:
+            chunk[col] = values[col][start:stop]
+        yield chunk
+
+def _arrow_schema(columns: List[str]):
+    import pyarrow as pa
+    return pa.schema([
+        pa.field(name, pa.string() if name == 'date' else pa.float64())
+        for name in columns
+    ])
+
+def _record_batch(chunk: ColumnChunk, schema):
+    import pyarrow as pa
+    arrays = [
+        pa.array(chunk[field.name], type=field.type, from_pandas=True)
+        for field in schema
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def _drain(sink: io.BytesIO) -> bytes:
+    """버퍼에 쌓인 바이트를 꺼내고 버퍼를 비움 (청크 크기 이상으로 메모리가 늘지 않도록)"""
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+def stream_arrow(chunks: Iterable[ColumnChunk], columns: List[str]) -> Iterator[bytes]:
+    """Arrow IPC 스트림 형식 (청크당 RecordBatch 1개)"""
+    import pyarrow.ipc as pa_ipc
+    schema = _arrow_schema(columns)
+    sink = io.BytesIO()
+    writer = pa_ipc.new_stream(sink, schema)
+    for chunk in chunks:
+        writer.write_batch(_record_batch(chunk, schema))
+        yield _drain(sink)
+    writer.close()
+    yield _drain(sink)
+
+def stream_parquet(chunks: Iterable[ColumnChunk], columns: List[str]) -> Iterator[bytes]:
+    """Parquet 형식 (청크당 row group 1개, footer는 마지막에 기록)"""
+    import pyarrow.parquet as pq
+    schema = _arrow_schema(columns)
+    sink = io.BytesIO()
+    writer = pq.ParquetWriter(sink, schema, compression='snappy')
+    for chunk in chunks:
+        writer.write_batch(_record_batch(chunk, schema))
+        yield _drain(sink)
+    writer.close()
+    yield _drain(sink)
+
+def stream_csv(chunks: Iterable[ColumnChunk], columns: List[str]) -> Iterator[bytes]:
+    """CSV 형식 (헤더는 첫 청크에만 기록)"""
+    header = True
+    for chunk in chunks:
+        frame = pd.DataFrame(chunk, columns=columns, copy=False)
+        yield frame.to_csv(index=False, header=header).encode('utf-8')
+        header = False
+    if header:
+        # 조회 결과가 없어도 헤더는 반환
+        yield (','.join(columns) + '\n').encode('utf-8')
+
+def stream_features(fmt: str, chunks: Iterable[ColumnChunk], columns: List[str]) -> Iterator[bytes]:
+    """형식에 맞는 스트림 생성기 반환"""
+    if fmt == 'arrow':
+        return stream_arrow(chunks, columns)
+    if fmt == 'parquet':
+        return stream_parquet(chunks, columns)
+    if fmt == 'csv':
+        return stream_csv(chunks, columns)
+    raise ValueError(f"지원하지 않는 형식: {fmt}")
@@ -0,0 +1,208 @@
+"""
+LSTM 온라인 추론 모듈
+기동 시 체크포인트를 한 번 로드하고, 동시에 들어온 /predict 요청을 모아(micro-batching) 한 번의 forward로 처리
+결과는 (모델 버전, 피쳐 데이터 버전, 기준월) 단위로 캐시
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import os
+import sys
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# modeling 모듈 경로 (상위 폴더의 modeling 디렉토리), torch는 import 비용이 커서 체크포인트 로드 시점에 import
+MODELING_DIR = os.path.join(os.path.dirname(__file__), '..', 'modeling')
+sys.path.append(MODELING_DIR)
+TORCH_AVAILABLE = importlib.util.find_spec('torch') is not None
+
+if TYPE_CHECKING:
+    from lstm_model import LSTMForecaster
+
+logger = logging.getLogger(__name__)
+
+# 모델 경로: 아티팩트 디렉토리(mmap 로드, pickle 없음)가 있으면 우선 사용, 없으면 기존 torch.save 체크포인트
+ARTIFACT_PATH = os.path.join(MODELING_DIR, 'lstm_model_artifact')
+CHECKPOINT_PATH = os.getenv('LSTM_CHECKPOINT_PATH') or (
+    ARTIFACT_PATH if os.path.isdir(ARTIFACT_PATH) else os.path.join(MODELING_DIR, 'lstm_model_checkpoint.pth'))
+# 추론 런타임 (auto: 내보낸 TorchScript/int8/ONNX 중 가장 빠른 것, eager: PyTorch 그대로) 및 내보내기 디렉토리
+LSTM_RUNTIME = os.getenv('LSTM_RUNTIME', 'auto')
+EXPORT_DIR = os.getenv('LSTM_EXPORT_DIR', os.path.join(MODELING_DIR, 'exported'))
+# 한 번의 forward에 묶을 최대 요청 수 / 첫 요청 이후 추가 요청을 기다리는 최대 시간
+MAX_BATCH_SIZE = int(os.getenv('PREDICT_MAX_BATCH_SIZE', '64'))
+MAX_BATCH_WAIT_MS = float(os.getenv('PREDICT_MAX_BATCH_WAIT_MS', '5'))
+RESULT_CACHE_SIZE = 256
+
+class ModelUnavailable(Exception):
+    """torch 미설치, 체크포인트 없음 등으로 모델을 사용할 수 없음"""
+
+class LSTMPredictor:
+    """
+    마이크로 배칭 추론기
+    - submit(): 입력 윈도우를 큐에 넣고 결과를 기다림
+    - 배치 루프: 첫 요청 이후 MAX_BATCH_WAIT_MS 동안(또는 MAX_BATCH_SIZE까지) 모은 윈도우를 쌓아 스레드에서 한 번에 forward
+    """
+
+    def __init__(self, checkpoint_path: str = CHECKPOINT_PATH, max_batch_size: int = MAX_BATCH_SIZE,
+                 max_wait_ms: float = MAX_BATCH_WAIT_MS):
+        self.checkpoint_path = checkpoint_path
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.forecaster: Optional[LSTMForecaster] = None
+        self.error: Optional[str] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._results: OrderedDict[Tuple, Dict[str, Any]] = OrderedDict()
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self.batch_sizes: List[int] = []
+
+    def load(self, feature_columns: Optional[List[str]] = None) -> bool:
+        """체크포인트 로드 (기동 워밍업에서 한 번 호출)"""
+        if not TORCH_AVAILABLE:
+            self.error = "torch가 설치되어 있지 않습니다."
+            return False
+        if not os.path.exists(self.checkpoint_path):
+            self.error = f"체크포인트가 없습니다: {self.checkpoint_path}"
+            return False
+        try:
+            from model_export import load_fastest
+            self.forecaster = load_fastest(self.checkpoint_path, EXPORT_DIR, feature_columns=feature_columns,
+                                           runtime=LSTM_RUNTIME)
+            self.error = None
+            logger.info(f"LSTM 모델 로드: v{self.forecaster.version} (seq_length={self.forecaster.seq_length}, "
+                        f"runtime={self.forecaster.runtime_name})")
+            return True
+        except Exception as e:
+            self.error = f"체크포인트 로드 실패: {e}"
+            logger.warning(self.error)
+            return False
+
+    @property
+    def ready(self) -> bool:
+        return self.forecaster is not None
+
+    def require(self) -> LSTMForecaster:
+        if self.forecaster is None:
+            raise ModelUnavailable(self.error or "모델이 로드되지 않았습니다.")
+        return self.forecaster
+
+    def cached(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+        return result
+
+    def store(self, key: Tuple, result: Dict[str, Any]):
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > RESULT_CACHE_SIZE:
+            self._results.popitem(last=False)
+
+    async def submit(self, key: Tuple, window: np.ndarray) -> np.ndarray:
+        """
+        윈도우 (seq_length, features) 하나의 차분 예측값 (targets,) 반환
+        같은 key로 진행 중인 요청이 있으면 그 결과를 공유
+        """
+        self.require()
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 큐와 배치 루프는 이벤트 루프에 묶이므로 루프가 바뀌면 (테스트 클라이언트 등) 새로 생성
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = None
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._batch_loop(self._queue))
+
+        future = loop.create_future()
+        self._inflight[key] = future
+        await self._queue.put((window, future))
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _batch_loop(self, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(items) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            windows = np.stack([window for window, _ in items])
+            self.batch_sizes.append(len(items))
+            del self.batch_sizes[:-1000]
+            try:
+                diffs = await asyncio.to_thread(self.forecaster.predict_diffs, windows)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), diff in zip(items, diffs):
+                if not future.done():
+                    future.set_result(diff)
+
+    async def close(self):
+        worker, self._worker = self._worker, None
+        if worker is None or worker.done():
+            return
+        worker.cancel()
+        if worker.get_loop() is asyncio.get_running_loop():
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        sizes = self.batch_sizes
+        return {
+            'batches': len(sizes),
+            'mean_batch_size': round(float(np.mean(sizes)), 3) if sizes else None,
+            'max_batch_size': max(sizes) if sizes else None,
+            'cached_results': len(self._results),
+        }
+
+def build_window(features: pd.DataFrame, feature_columns: List[str], seq_length: int,
+                 as_of: Optional[str] = None) -> Tuple[str, np.ndarray]:
+    """
+    final_features(date 오름차순)에서 기준월까지의 마지막 seq_length개 행으로 입력 윈도우 생성
+    as_of가 None이면 가장 최근 월 기준
+    """
+    dates = features['date'].to_numpy(dtype=object)
+    if len(dates) == 0:
+        raise LookupError("final_features 데이터가 없습니다.")
+    if as_of is None:
+        end = len(dates)
+    else:
+        end = int(np.searchsorted(dates, as_of, side='right'))
+        if end == 0 or dates[end - 1] != as_of:
+            raise LookupError(f"{as_of} 월의 피쳐가 없습니다.")
+    if end < seq_length:
+        raise LookupError(f"입력 윈도우에 필요한 {seq_length}개월 데이터가 부족합니다. (보유: {end}개월)")
+
+    missing = [col for col in feature_columns if col not in features.columns]
+    if missing:
+        raise LookupError(f"모델 입력 피쳐가 final_features에 없습니다: {missing}")
+    window = features[feature_columns].iloc[end - seq_length:end].to_numpy(dtype=np.float64)
+    return str(dates[end - 1]), window
+
+# 프로세스 전역 추론기
+predictor = LSTMPredictor()
@@ -0,0 +1,101 @@
+"""
+지연 import 모듈
+STARTUP_MODE=lazy 이면 무거운 패키지(pandas, numpy, mysql.connector)를 sys.modules에 지연 모듈로 등록해
+서버 기동 시점이 아니라 첫 속성 접근 시점에 실제로 로드되도록 함
+"""
+
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+import time
+import types
+from typing import Dict, List
+
+# lazy: 첫 사용 시 로드 (기본값), eager: 기동 시 바로 로드
+STARTUP_MODE = os.getenv('STARTUP_MODE', 'lazy').lower()
+
+HEAVY_MODULES = ['numpy', 'pandas', 'mysql.connector']
+
+class _LazyModule(types.ModuleType):
+    """
+    실제 모듈 대신 sys.modules에 등록하는 자리표시 모듈
+    import 시스템이 읽는 __spec__ 등은 일반 속성으로 두고, 그 밖의 속성에 처음 접근할 때 실제 모듈을 로드해
+    속성을 복사 (importlib.util.LazyLoader는 `import x`가 __spec__을 읽는 순간 로드되므로 사용하지 않음)
+    """
+
+    def __init__(self, name: str, spec):
+        super().__init__(name)
+        self.__spec__ = spec
+        self.__loader__ = spec.loader
+        self.__package__ = spec.parent
+
+    def _load(self):
+        name = self.__name__
+        if sys.modules.get(name) is self:
+            del sys.modules[name]
+        module = importlib.import_module(name)
+        parent_name, _, child_name = name.rpartition('.')
+        if parent_name:
+            setattr(sys.modules[parent_name], child_name, module)
+        self.__dict__.update(module.__dict__)
+        return module
+
+    def __getattr__(self, attr: str):
+        with _load_lock:
+            module = sys.modules.get(self.__name__)
+            if module is None or module is self:
+                module = self._load()
+        return getattr(module, attr)
+
+_load_lock = threading.RLock()
+
+def lazy_import(name: str):
+    """
+    모듈을 지연 로드 모듈로 sys.modules에 등록 후 반환
+    이미 로드된 모듈이거나 찾을 수 없으면 일반 import와 동일하게 동작
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    parent_name, _, child_name = name.rpartition('.')
+    parent = importlib.import_module(parent_name) if parent_name else None
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        return importlib.import_module(name)
+
+    module = _LazyModule(name, spec)
+    sys.modules[name] = module
+    # `import a.b` 후 a.b 접근이 가능하도록 상위 패키지 속성도 설정
+    if parent is not None:
+        setattr(parent, child_name, module)
+    return module
+
+def is_loaded(name: str) -> bool:
+    """실제 모듈이 로드됐는지 (지연 모듈로만 등록된 상태면 False)"""
+    return name in sys.modules and not isinstance(sys.modules[name], _LazyModule)
+
+def install(mode: str = STARTUP_MODE) -> str:
+    """서비스 모듈 import 전에 호출: lazy 모드면 HEAVY_MODULES를 지연 모듈로 등록"""
+    if mode == 'lazy':
+        for name in HEAVY_MODULES:
+            lazy_import(name)
+    else:
+        for name in HEAVY_MODULES:
+            importlib.import_module(name)
+    return mode
+
+def materialize(names: List[str] = HEAVY_MODULES) -> Dict[str, float]:
+    """지연 모듈을 실제로 로드 (워밍업용), 모듈별 소요 시간(초) 반환"""
+    timings = {}
+    for name in names:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        if isinstance(module, _LazyModule):
+            with _load_lock:
+                if sys.modules.get(name) is module:
+                    module._load()
+        timings[name] = round(time.perf_counter() - start, 6)
+    return timings
@@ -3,20 +3,30 @@ ECOS 데이터 전처리 FastAPI
 DB에서 ECOS 데이터를 불러와 전처리 후 final_features 테이블에 저장하는 API
 """
 
+from __future__ import annotations
+
+import asyncio
+import json
 import os
 import sys
-import pandas as pd
-import numpy as np
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
 import warnings
 from datetime import datetime
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.responses import JSONResponse
-import mysql.connector
-from sklearn.preprocessing import StandardScaler
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Depends, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Match
+from pydantic import BaseModel, Field
 import logging
 
+# 무거운 패키지(pandas, numpy, mysql.connector)는 STARTUP_MODE=lazy(기본값)이면 첫 사용 시 로드
+import lazy_imports
+STARTUP_MODE = lazy_imports.install()
+import pandas as pd
+import numpy as np
+
 # 경고 무시
 warnings.filterwarnings('ignore')
 
@@ -26,15 +36,120 @@ logger = logging.getLogger(__name__)
 
 # DB 모듈 import (상위 폴더의 DB 디렉토리에서)
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'DB'))
-from db_query import DatabaseConnection
+from db_query import DatabaseConnection, FINAL_FEATURE_COLUMNS
+from feature_cache import feature_cache, FINAL_FEATURES, ECOS_DATA
+from feature_export import EXPORT_FORMATS, arrow_available, frame_chunks, rows_to_columns, stream_features
+from service_metrics import MetricsRegistry, PipelineRun
+from inference import ModelUnavailable, build_window, predictor
+from scenarios import FeatureRoller, Scenario, build_scenarios, rollout
+from risk_index import RiskIndexUnavailable, risk_index
+
+# 기동 워밍업 설정
+WARMUP_ENABLED = os.getenv('STARTUP_WARMUP', '1') != '0'
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+
+# 워밍업 상태 (/ready 응답)
+warm_state: Dict[str, Any] = {
+    'mode': STARTUP_MODE,
+    'ready': not WARMUP_ENABLED,
+    'running': False,
+    'steps': {},
+    'error': None,
+    'model_error': None,
+}
+_warm_lock = threading.Lock()
+
+def warm_up():
+    """
+    기동 직후 백그라운드에서 실행하는 워밍업
+    1. 지연 import된 패키지 실제 로드
+    2. DB 연결 풀 생성
+    3. 공유 피쳐 캐시 연결 (없으면 DB에서 읽어 게시) + pandas 첫 사용 비용 선지불
+    4. LSTM 체크포인트 로드 (실패해도 준비 상태에는 영향 없음, /predict만 503)
+    5. 위험점수 인덱스 적재 (실패해도 준비 상태에는 영향 없음, /risk 첫 요청에서 다시 시도)
+    """
+    with _warm_lock:
+        if warm_state['running']:
+            return
+        warm_state['running'] = True
+        warm_state['error'] = None
+    try:
+        start = time.perf_counter()
+        warm_state['steps']['imports'] = lazy_imports.materialize()
+        
+        step = time.perf_counter()
+        DatabaseConnection.init_pool(DB_POOL_SIZE)
+        warm_state['steps']['db_pool'] = round(time.perf_counter() - step, 6)
+        
+        step = time.perf_counter()
+        features_data = load_final_features()
+        if features_data is not None and not features_data.empty:
+            features_data.tail(1).to_dict(orient='records')
+        warm_state['steps']['feature_cache'] = round(time.perf_counter() - step, 6)
+        
+        if not predictor.ready:
+            step = time.perf_counter()
+            predictor.load(feature_columns=FINAL_FEATURE_COLUMNS)
+            warm_state['model_error'] = predictor.error
+            warm_state['steps']['model'] = round(time.perf_counter() - step, 6)
+        
+        if not risk_index.ready:
+            step = time.perf_counter()
+            try:
+                risk_index.refresh()
+            except Exception as e:
+                logger.warning(f"위험점수 인덱스 적재 실패: {e}")
+            warm_state['steps']['risk_index'] = round(time.perf_counter() - step, 6)
+        
+        warm_state['steps']['total'] = round(time.perf_counter() - start, 6)
+        warm_state['ready'] = True
+        logger.info(f"워밍업 완료: {warm_state['steps']}")
+    except Exception as e:
+        warm_state['error'] = str(e.detail if isinstance(e, HTTPException) else e)
+        logger.warning(f"워밍업 실패: {warm_state['error']}")
+    finally:
+        warm_state['running'] = False
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """서버는 바로 요청을 받고, 워밍업은 스레드에서 진행 (/ready로 완료 여부 확인)"""
+    if WARMUP_ENABLED:
+        app.state.warmup_task = asyncio.create_task(asyncio.to_thread(warm_up))
+    yield
+    await predictor.close()
 
 # FastAPI 앱 생성
 app = FastAPI(
     title="ECOS Data Preprocessing API",
     description="ECOS 경제데이터 전처리 API - DB에서 데이터 로드 → 전처리 → final_features 저장",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# 프로세스 단위 메트릭 (uvicorn 워커별로 따로 집계됨)
+metrics_registry = MetricsRegistry()
+
+def _route_path(request: Request) -> str:
+    """메트릭 라벨용 라우트 경로 템플릿, 매칭되지 않으면 'unmatched' (라벨 수 폭증 방지)"""
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, 'path', request.url.path)
+    return 'unmatched'
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """엔드포인트별 요청 지연시간 기록 (스트리밍 응답은 응답 시작까지의 시간)"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics_registry.observe_request(request.method, _route_path(request), status,
+                                         time.perf_counter() - start)
+
 # 응답 모델 정의
 class PreprocessingStatus(BaseModel):
     success: bool
@@ -42,6 +157,78 @@ class PreprocessingStatus(BaseModel):
     processed_rows: Optional[int] = None
     feature_count: Optional[int] = None
     date_range: Optional[Dict[str, str]] = None
+    metrics: Optional[Dict[str, Any]] = None
+
+class PredictionResult(BaseModel):
+    as_of: str
+    forecast_date: str
+    model_version: str
+    data_version: Optional[str] = None
+    predicted_diff: Dict[str, float]
+    predicted_level: Dict[str, Optional[float]]
+    cached: bool
+    latency_ms: float
+
+class ScenarioSpec(BaseModel):
+    name: str
+    level_shocks: Dict[str, float] = {}
+    feature_shocks: Dict[str, float] = {}
+
+class ScenarioRequest(BaseModel):
+    as_of: Optional[str] = None
+    horizon: int = Field(3, ge=1, le=24)
+    scenarios: List[ScenarioSpec] = []
+    include_baseline: bool = True
+
+class ScenarioResult(BaseModel):
+    as_of: str
+    model_version: str
+    forecast_dates: List[str]
+    target_columns: List[str]
+    scenario_names: List[str]
+    levels: List[List[List[float]]]
+    latency_ms: float
+
+# 한 번에 실행할 수 있는 최대 시나리오 수
+MAX_SCENARIOS = 1000
+
+class RiskScore(BaseModel):
+    corp_code: str
+    corp_name: str
+    year: int
+    quarter: str
+    score: float
+    grade: Optional[int] = None
+    grade_name: Optional[str] = None
+    company_size: Optional[str] = None
+    components: Optional[Dict[str, float]] = None
+    contributions: Optional[Dict[str, float]] = None
+
+class RiskScoreResult(RiskScore):
+    index_version: Optional[str] = None
+    latency_ms: float
+
+class RiskKey(BaseModel):
+    corp_code: str
+    year: Optional[int] = None
+    quarter: Optional[str] = Field(None, pattern=r'^Q[1-4]$')
+
+class RiskBatchRequest(BaseModel):
+    items: List[RiskKey] = []
+    corp_codes: List[str] = []
+    year: Optional[int] = None
+    quarter: Optional[str] = Field(None, pattern=r'^Q[1-4]$')
+    include_components: bool = True
+
+class RiskBatchResult(BaseModel):
+    count: int
+    results: List[RiskScore]
+    missing: List[RiskKey]
+    index_version: Optional[str] = None
+    latency_ms: float
+
+# 한 번에 조회할 수 있는 최대 키 수 (corp_codes/items가 비어 있으면 전체 기업 조회는 제한 없음)
+MAX_RISK_KEYS = 10000
 
 class FeatureInfo(BaseModel):
     feature_name: str
@@ -221,18 +408,8 @@ def prepare_final_features(df: pd.DataFrame, final_features: List[str]) -> pd.Da
         df_save.reset_index(inplace=True)
         df_save['date'] = pd.to_datetime(df_save['date']).dt.strftime('%Y%m')
         
-        # DDL 스키마에 맞는 컬럼들 (db_query.py의 save_final_features 함수 참조)
-        schema_columns = [
-            'date', 'construction_bsi_actual_diff', 'housing_sale_price_diff', 
-            'm2_growth_diff', 'credit_spread_diff', 'base_rate_diff',
-            'construction_bsi_mom', 'housing_sale_price_diff_ma3', 'm2_growth_lag1',
-            'base_rate_mdiff_bp', 'credit_spread_diff_ma3', 'construction_bsi_ma3',
-            'leading_index', 'housing_sale_price_diff_lag6', 'construction_bsi_actual_lag3',
-            'construction_bsi_actual_diff_ma3', 'base_rate_diff_ma6', 'term_spread',
-            'construction_bsi_actual_diff_ma6', 'credit_spread_diff_lag1',
-            'market_rate_treasury_bond_3yr', 'credit_spread_diff_ma6', 'base_rate_diff_ma3',
-            'base_rate_lag1', 'esi', 'base_rate_diff_lag3', 'm2_growth_diff_ma6'
-        ]
+        # DDL 스키마에 맞는 컬럼들 (db_query.py의 FINAL_FEATURE_COLUMNS 참조)
+        schema_columns = ['date'] + FINAL_FEATURE_COLUMNS
         
         available_cols = [col for col in schema_columns if col in df_save.columns]
         df_final = df_save[available_cols].copy()
@@ -248,6 +425,111 @@ def prepare_final_features(df: pd.DataFrame, final_features: List[str]) -> pd.Da
         logger.error(f"최종 피쳐 준비 중 오류: {e}")
         raise HTTPException(status_code=500, detail=f"최종 피쳐 준비 오류: {str(e)}")
 
+def normalize_final_features(features_data: pd.DataFrame) -> pd.DataFrame:
+    """DB 조회 결과(DECIMAL → Decimal 객체)를 float 컬럼으로 변환"""
+    features_data = features_data.copy()
+    features_data['date'] = features_data['date'].astype(str)
+    for col in FINAL_FEATURE_COLUMNS:
+        if col in features_data.columns:
+            features_data[col] = pd.to_numeric(features_data[col], errors='coerce')
+    return features_data
+
+def publish_feature_cache(db: DatabaseConnection, ecos_data: pd.DataFrame) -> Optional[str]:
+    """
+    저장된 final_features(DB 기준 값)와 ECOS 프레임을 공유 캐시에 게시
+    캐시 게시 실패는 전처리 결과에 영향을 주지 않음 (읽기 엔드포인트가 DB로 폴백)
+    """
+    try:
+        features_data = db.get_final_features()
+        if features_data is None or features_data.empty:
+            return None
+        version = feature_cache.publish(FINAL_FEATURES, normalize_final_features(features_data), index_column='date')
+        feature_cache.publish(ECOS_DATA, ecos_data)
+        return version
+    except Exception as e:
+        logger.warning(f"피쳐 캐시 게시 실패: {e}")
+        return None
+
+def load_final_features() -> Optional[pd.DataFrame]:
+    """
+    읽기 엔드포인트용 final_features 조회
+    공유 캐시가 있으면 DB에 접속하지 않고, 없으면 DB에서 읽은 뒤 캐시에 게시
+    """
+    cached = feature_cache.attach(FINAL_FEATURES)
+    if cached is not None:
+        return cached
+    
+    db = DatabaseConnection()
+    if not db.connect():
+        raise HTTPException(status_code=500, detail="데이터베이스 연결에 실패했습니다.")
+    try:
+        features_data = db.get_final_features()
+    finally:
+        db.disconnect()
+    
+    if features_data is None or features_data.empty:
+        return features_data
+    
+    features_data = normalize_final_features(features_data)
+    try:
+        feature_cache.publish(FINAL_FEATURES, features_data, index_column='date')
+    except Exception as e:
+        logger.warning(f"피쳐 캐시 게시 실패: {e}")
+    return features_data
+
+def load_ecos_frame() -> Optional[pd.DataFrame]:
+    """ECOS 원본 프레임 조회 (공유 캐시 우선, 없으면 DB에서 읽어 게시)"""
+    cached = feature_cache.attach(ECOS_DATA)
+    if cached is not None:
+        return cached
+    
+    db = DatabaseConnection()
+    if not db.connect():
+        raise HTTPException(status_code=500, detail="데이터베이스 연결에 실패했습니다.")
+    try:
+        ecos_data = load_ecos_data(db)
+    finally:
+        db.disconnect()
+    try:
+        feature_cache.publish(ECOS_DATA, ecos_data)
+    except Exception as e:
+        logger.warning(f"ECOS 캐시 게시 실패: {e}")
+    return ecos_data
+
+def target_levels(target_columns: List[str], as_of: str) -> Dict[str, Optional[float]]:
+    """기준월의 타겟 원시값 (결측이면 직전 값), 없으면 None"""
+    ecos_data = load_ecos_frame()
+    as_of_ts = pd.Timestamp(f"{as_of[:4]}-{as_of[4:]}-01")
+    levels = {col: None for col in target_columns}
+    if ecos_data is None or ecos_data.empty:
+        return levels
+    history = ecos_data.loc[:as_of_ts, [col for col in target_columns if col in ecos_data.columns]]
+    if history.empty:
+        return levels
+    last = history.ffill().iloc[-1]
+    for col, value in last.items():
+        levels[col] = None if pd.isna(value) else float(value)
+    return levels
+
+def target_history(target_columns: List[str], as_of: str, length: int) -> np.ndarray:
+    """
+    기준월까지 최근 length개월 타겟 수준 이력 (length, targets)
+    feature_engineering과 같이 선형 보간 후 사용
+    """
+    ecos_data = load_ecos_frame()
+    missing = [col for col in target_columns if ecos_data is None or col not in ecos_data.columns]
+    if missing:
+        raise LookupError(f"ECOS 데이터에 타겟이 없습니다: {missing}")
+    as_of_ts = pd.Timestamp(f"{as_of[:4]}-{as_of[4:]}-01")
+    history = ecos_data[target_columns].interpolate(method='linear', limit_direction='both').loc[:as_of_ts]
+    if len(history) < length or history.index[-1] != as_of_ts:
+        raise LookupError(f"{as_of} 기준 {length}개월 타겟 이력이 부족합니다.")
+    return history.iloc[-length:].to_numpy(dtype=np.float64)
+
+def next_month(yyyymm: str) -> str:
+    year, month = int(yyyymm[:4]), int(yyyymm[4:])
+    return f"{year + month // 12}{month % 12 + 1:02d}"
+
 @app.get("/")
 async def root():
     """API 상태 확인"""
@@ -262,6 +544,37 @@ async def health_check():
     """헬스 체크"""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    준비 상태 확인 (워밍업 완료 시 200, 진행 중/실패 시 503)
+    실패한 경우 호출 시 워밍업을 다시 시작
+    """
+    if not warm_state['ready'] and not warm_state['running'] and warm_state['error'] is not None:
+        app.state.warmup_task = asyncio.create_task(asyncio.to_thread(warm_up))
+    body = {
+        "ready": warm_state['ready'],
+        "mode": warm_state['mode'],
+        "steps": warm_state['steps'],
+        "error": warm_state['error'],
+        "cache_version": feature_cache.version(FINAL_FEATURES),
+        "model": {
+            "loaded": predictor.ready,
+            "version": predictor.forecaster.version if predictor.ready else None,
+            "runtime": predictor.forecaster.runtime_name if predictor.ready else None,
+            "error": warm_state['model_error'],
+            "batching": predictor.stats(),
+        },
+        "risk_index": risk_index.stats(),
+    }
+    return JSONResponse(status_code=200 if warm_state['ready'] else 503, content=body)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus 텍스트 형식 메트릭 (요청 지연시간 히스토그램, 전처리 단계별 측정값)"""
+    return PlainTextResponse(metrics_registry.render_prometheus(),
+                             media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.post("/preprocess", response_model=PreprocessingStatus)
 async def preprocess_ecos_data(db: DatabaseConnection = Depends(get_db_connection)):
     """
@@ -270,54 +583,72 @@ async def preprocess_ecos_data(db: DatabaseConnection = Depends(get_db_connectio
     2. 피쳐 엔지니어링 수행
     3. final_features 테이블에 저장
     """
+    run = PipelineRun(metrics_registry)
     try:
         logger.info("ECOS 데이터 전처리 시작")
         
         # 1. 데이터 로드
-        df = load_ecos_data(db)
+        with run.stage('load_ecos_data', db) as stage:
+            df = load_ecos_data(db)
+            stage.rows = len(df)
         
         # 2. 피쳐 엔지니어링
-        df_processed, final_features = feature_engineering(df)
+        with run.stage('feature_engineering', db) as stage:
+            df_processed, final_features = feature_engineering(df)
+            stage.rows = len(df_processed)
         
         # 3. 최종 피쳐 준비
-        df_final = prepare_final_features(df_processed, final_features)
+        with run.stage('prepare_final_features', db) as stage:
+            df_final = prepare_final_features(df_processed, final_features)
+            stage.rows = len(df_final)
         
         # 4. DB에 저장
-        success = db.save_final_features(df_final)
+        with run.stage('save_final_features', db) as stage:
+            success = db.save_final_features(df_final)
+            stage.rows = len(df_final) if success else 0
         
         if not success:
             raise HTTPException(status_code=500, detail="DB 저장에 실패했습니다.")
         
+        # 5. 워커 공유 캐시 게시 (읽기 엔드포인트는 이후 DB 없이 응답)
+        with run.stage('publish_cache', db) as stage:
+            cache_version = publish_feature_cache(db, df)
+            stage.rows = len(df_final) if cache_version else 0
+        
         # 날짜 범위 계산
         date_range = {
             "start_date": df_final['date'].min(),
             "end_date": df_final['date'].max()
         }
         
-        logger.info("ECOS 데이터 전처리 완료")
+        run.finish(success=True)
+        logger.info(f"ECOS 데이터 전처리 완료 ({run.summary()['total_duration_seconds']:.3f}s)")
         
         return PreprocessingStatus(
             success=True,
             message="ECOS 데이터 전처리 및 저장 완료",
             processed_rows=len(df_final),
             feature_count=len(df_final.columns) - 1,  # date 컬럼 제외
-            date_range=date_range
+            date_range=date_range,
+            metrics=run.summary()
         )
         
     except HTTPException as he:
+        run.finish(success=False)
         raise he
     except Exception as e:
+        run.finish(success=False)
         logger.error(f"전처리 중 예상치 못한 오류: {e}")
         raise HTTPException(status_code=500, detail=f"전처리 오류: {str(e)}")
 
 @app.get("/features/info")
-async def get_feature_info(db: DatabaseConnection = Depends(get_db_connection)):
+async def get_feature_info():
     """
     저장된 final_features 정보 조회
     """
     try:
-        # DB에서 final_features 조회
-        features_data = db.get_final_features()
+        # 공유 캐시 (없으면 DB)에서 final_features 조회
+        features_data = load_final_features()
         
         if features_data is None or features_data.empty:
             return {"message": "저장된 피쳐 데이터가 없습니다.", "features": []}
@@ -333,6 +664,7 @@ async def get_feature_info(db: DatabaseConnection = Depends(get_db_connection)):
             ))
         
         return {
+            "cache_version": features_data.attrs.get('cache_version'),
             "total_features": len(feature_columns),
             "total_rows": len(features_data),
             "date_range": {
@@ -342,18 +674,20 @@ async def get_feature_info(db: DatabaseConnection = Depends(get_db_connection)):
             "features": features_info
         }
         
+    except HTTPException as he:
+        raise he
     except Exception as e:
         logger.error(f"피쳐 정보 조회 중 오류: {e}")
         raise HTTPException(status_code=500, detail=f"피쳐 정보 조회 오류: {str(e)}")
 
 @app.get("/data/preview")
-async def preview_processed_data(limit: int = 10, db: DatabaseConnection = Depends(get_db_connection)):
+async def preview_processed_data(limit: int = 10):
     """
     전처리된 데이터 미리보기
     """
     try:
-        # DB에서 final_features 조회
-        features_data = db.get_final_features()
+        # 공유 캐시 (없으면 DB)에서 final_features 조회
+        features_data = load_final_features()
         
         if features_data is None or features_data.empty:
             return {"message": "저장된 피쳐 데이터가 없습니다.", "data": []}
@@ -367,10 +701,248 @@ async def preview_processed_data(limit: int = 10, db: DatabaseConnection = Depen
             "data": preview_data.to_dict('records')
         }
         
+    except HTTPException as he:
+        raise he
     except Exception as e:
         logger.error(f"데이터 미리보기 중 오류: {e}")
         raise HTTPException(status_code=500, detail=f"데이터 미리보기 오류: {str(e)}")
 
+def _parse_export_columns(columns: Optional[str]) -> List[str]:
+    """쉼표로 구분된 컬럼 목록 검증 (None이면 전체 피쳐)"""
+    if not columns:
+        return list(FINAL_FEATURE_COLUMNS)
+    
+    requested = [col.strip() for col in columns.split(',') if col.strip() and col.strip() != 'date']
+    unknown = [col for col in requested if col not in FINAL_FEATURE_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 피쳐 컬럼: {unknown}")
+    return requested
+
+def _validate_yyyymm(value: Optional[str], name: str) -> Optional[str]:
+    """YYYYMM 형식 검증"""
+    if value is not None and (len(value) != 6 or not value.isdigit()):
+        raise HTTPException(status_code=400, detail=f"{name}은(는) YYYYMM 형식이어야 합니다: {value}")
+    return value
+
+@app.get("/data/export")
+async def export_features(
+    fmt: str = Query('arrow', alias='format', description="arrow | parquet | csv"),
+    columns: Optional[str] = Query(None, description="쉼표로 구분된 피쳐 컬럼 (date는 항상 포함)"),
+    start_date: Optional[str] = Query(None, description="시작 월 (YYYYMM, 포함)"),
+    end_date: Optional[str] = Query(None, description="종료 월 (YYYYMM, 포함)"),
+    chunk_size: int = Query(5000, ge=1, le=100000, description="청크당 행 수")
+):
+    """
+    final_features 대량 내보내기
+    공유 캐시가 있으면 mmap 배열을, 없으면 DB 커서를 chunk_size 행씩 읽어 컬럼 배열로 바로 스트리밍
+    (응답 전체를 메모리에 올리지 않음)
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 형식: {fmt} (arrow, parquet, csv 중 선택)")
+    if fmt in ('arrow', 'parquet') and not arrow_available():
+        raise HTTPException(status_code=501, detail=f"{fmt} 형식에는 pyarrow가 필요합니다. CSV를 사용하거나 pyarrow를 설치하세요.")
+    
+    feature_columns = _parse_export_columns(columns)
+    start_date = _validate_yyyymm(start_date, 'start_date')
+    end_date = _validate_yyyymm(end_date, 'end_date')
+    output_columns = ['date'] + feature_columns
+    media_type, extension = EXPORT_FORMATS[fmt]
+    headers = {"Content-Disposition": f"attachment; filename=final_features.{extension}"}
+    
+    cached = feature_cache.attach(FINAL_FEATURES)
+    if cached is not None:
+        chunks = frame_chunks(cached, feature_columns, start_date, end_date, chunk_size)
+        return StreamingResponse(stream_features(fmt, chunks, output_columns),
+                                 media_type=media_type, headers=headers)
+    
+    # 스트리밍 중에는 의존성 정리 시점을 보장할 수 없으므로 연결을 직접 관리
+    db = DatabaseConnection()
+    if not db.connect():
+        raise HTTPException(status_code=500, detail="데이터베이스 연결에 실패했습니다.")
+    
+    def column_chunks():
+        try:
+            for names, rows in db.iter_final_features(feature_columns, start_date, end_date, chunk_size):
+                yield rows_to_columns(names, rows)
+        finally:
+            db.disconnect()
+    
+    return StreamingResponse(stream_features(fmt, column_chunks(), output_columns),
+                             media_type=media_type, headers=headers)
+
+@app.get("/predict", response_model=PredictionResult)
+async def predict(as_of: Optional[str] = Query(None, description="기준월 (YYYYMM, 기본값: 최신 월)")):
+    """
+    LSTM 다음 달 예측
+    기준월까지의 seq_length개월 final_features로 입력 윈도우를 만들어 타겟 차분값을 예측하고 기준월 원시값에 더해 복원
+    동시 요청은 한 번의 forward로 묶이고, 결과는 (모델 버전, 피쳐 데이터 버전, 기준월) 단위로 캐시
+    (피쳐가 공유 캐시에 게시되지 않아 데이터 버전을 알 수 없으면 캐시하지 않음)
+    """
+    start = time.perf_counter()
+    as_of = _validate_yyyymm(as_of, 'as_of')
+    try:
+        forecaster = predictor.require()
+    except ModelUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    features_data = load_final_features()
+    if features_data is None or features_data.empty:
+        raise HTTPException(status_code=404, detail="저장된 피쳐 데이터가 없습니다.")
+    try:
+        as_of, window = build_window(features_data, forecaster.feature_columns, forecaster.seq_length, as_of)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    key = (forecaster.version, features_data.attrs.get('cache_version'), as_of)
+    result = predictor.cached(key)
+    cached = result is not None
+    if result is None:
+        diff = await predictor.submit(key, window)
+        levels = target_levels(forecaster.target_columns, as_of)
+        result = {
+            "as_of": as_of,
+            "forecast_date": next_month(as_of),
+            "model_version": forecaster.version,
+            "data_version": key[1],
+            "predicted_diff": {col: float(v) for col, v in zip(forecaster.target_columns, diff)},
+            "predicted_level": {col: (None if levels[col] is None else levels[col] + float(v))
+                                for col, v in zip(forecaster.target_columns, diff)},
+        }
+        if key[1] is not None:
+            predictor.store(key, result)
+    
+    return PredictionResult(**result, cached=cached, latency_ms=round((time.perf_counter() - start) * 1000, 3))
+
+@app.post("/predict/scenarios", response_model=ScenarioResult)
+async def predict_scenarios(request: ScenarioRequest):
+    """
+    다중 시나리오 예측 (스트레스 테스트)
+    기준 윈도우에 시나리오별 충격을 적용한 N개 윈도우를 하나의 배치로 쌓아 horizon개월 동시에 자기회귀 예측
+    응답의 levels는 (시나리오, 예측월, 타겟) 순서의 수준값
+    """
+    start = time.perf_counter()
+    as_of = _validate_yyyymm(request.as_of, 'as_of')
+    scenarios = [Scenario(name='baseline')] if request.include_baseline else []
+    scenarios += [Scenario(name=spec.name, level_shocks=spec.level_shocks, feature_shocks=spec.feature_shocks)
+                  for spec in request.scenarios]
+    if not scenarios:
+        raise HTTPException(status_code=400, detail="실행할 시나리오가 없습니다.")
+    if len(scenarios) > MAX_SCENARIOS:
+        raise HTTPException(status_code=400, detail=f"시나리오는 최대 {MAX_SCENARIOS}개까지 실행할 수 있습니다.")
+    try:
+        forecaster = predictor.require()
+    except ModelUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    features_data = load_final_features()
+    if features_data is None or features_data.empty:
+        raise HTTPException(status_code=404, detail="저장된 피쳐 데이터가 없습니다.")
+    roller = FeatureRoller(forecaster.feature_columns, forecaster.target_columns)
+    try:
+        as_of, window = build_window(features_data, forecaster.feature_columns, forecaster.seq_length, as_of)
+        levels = target_history(forecaster.target_columns, as_of, roller.history_length)
+        windows, level_history = build_scenarios(roller, window, levels, scenarios)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    level_paths, _ = await asyncio.to_thread(rollout, forecaster.predict_diffs, roller, windows,
+                                             level_history, request.horizon)
+    
+    forecast_dates = [next_month(as_of)]
+    while len(forecast_dates) < request.horizon:
+        forecast_dates.append(next_month(forecast_dates[-1]))
+    return ScenarioResult(
+        as_of=as_of,
+        model_version=forecaster.version,
+        forecast_dates=forecast_dates,
+        target_columns=forecaster.target_columns,
+        scenario_names=[scenario.name for scenario in scenarios],
+        levels=level_paths.round(6).tolist(),
+        latency_ms=round((time.perf_counter() - start) * 1000, 3)
+    )
+
+async def ensure_risk_index():
+    """
+    위험점수 인덱스 준비
+    첫 요청은 적재를 기다리고, 이후에는 갱신 주기가 지났을 때 백그라운드에서 새 점수만 병합 (요청은 기다리지 않음)
+    """
+    if not risk_index.ready:
+        try:
+            await asyncio.to_thread(risk_index.refresh)
+        except Exception as e:
+            raise HTTPException(status_code=503, detail=f"위험점수 인덱스를 적재할 수 없습니다: {e}")
+    elif risk_index.stale():
+        def refresh_in_background():
+            try:
+                risk_index.refresh(blocking=False)
+            except Exception as e:
+                logger.warning(f"위험점수 인덱스 갱신 실패: {e}")
+        app.state.risk_refresh_task = asyncio.create_task(asyncio.to_thread(refresh_in_background))
+
+def _validate_risk_period(year: Optional[int], quarter: Optional[str]):
+    if (year is None) != (quarter is None):
+        raise HTTPException(status_code=400, detail="year와 quarter는 함께 지정해야 합니다.")
+
+@app.get("/risk/{corp_code}", response_model=RiskScoreResult)
+async def get_risk_score(corp_code: str,
+                         year: Optional[int] = Query(None, description="연도 (quarter와 함께 지정, 기본값: 최신 분기)"),
+                         quarter: Optional[str] = Query(None, pattern=r'^Q[1-4]$', description="분기 (Q1~Q4)")):
+    """
+    기업의 휴리스틱 위험점수 조회 (최신 분기 또는 지정 분기)
+    점수(0~100), 등급(0~3: 안전/주의/위험/매우위험), 구성 요소 점수와 점수 기여도(구성 요소 점수 × 가중치 × 10)
+    """
+    start = time.perf_counter()
+    _validate_risk_period(year, quarter)
+    await ensure_risk_index()
+    payload = risk_index.get(corp_code, year, quarter)
+    if payload is None:
+        period = f" {year}{quarter}" if year is not None else ""
+        raise HTTPException(status_code=404, detail=f"위험점수가 없습니다: {corp_code}{period}")
+    return RiskScoreResult(**payload, index_version=risk_index.stats()['version'],
+                           latency_ms=round((time.perf_counter() - start) * 1000, 3))
+
+@app.post("/risk", response_model=RiskBatchResult)
+async def get_risk_scores(request: RiskBatchRequest):
+    """
+    위험점수 일괄 조회 (포트폴리오 화면)
+    - items: (corp_code, year, quarter) 목록 (year/quarter 생략 시 최신 분기)
+    - corp_codes: 기업 코드 목록 (요청의 year/quarter 적용)
+    - 둘 다 비어 있으면 인덱스의 전체 기업
+    응답 본문은 인덱스에 미리 직렬화해 둔 행별 JSON 조각을 이어 붙여 만듦 (행별 모델 검증/직렬화 생략)
+    """
+    start = time.perf_counter()
+    _validate_risk_period(request.year, request.quarter)
+    for item in request.items:
+        _validate_risk_period(item.year, item.quarter)
+    if len(request.items) + len(request.corp_codes) > MAX_RISK_KEYS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {MAX_RISK_KEYS}개까지 조회할 수 있습니다.")
+    await ensure_risk_index()
+    
+    corp_codes = request.corp_codes
+    if not request.items and not corp_codes:
+        corp_codes = risk_index.corp_codes()
+    keys = [(item.corp_code, item.year, item.quarter) for item in request.items]
+    keys += [(corp_code, request.year, request.quarter) for corp_code in corp_codes]
+    results, missing = risk_index.lookup(keys, detail=request.include_components, raw=True)
+    tail = json.dumps({
+        "missing": missing,
+        "index_version": risk_index.stats()['version'],
+        "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+    }, ensure_ascii=False).encode()
+    body = b''.join([f'{{"count": {len(results)}, "results": ['.encode(), b', '.join(results), b'], ', tail[1:]])
+    return Response(content=body, media_type="application/json")
+
+@app.post("/risk/refresh")
+async def refresh_risk_index():
+    """위험점수 인덱스 즉시 갱신 (incremental_scoring.py 실행 직후 호출하면 갱신 주기를 기다리지 않음)"""
+    try:
+        applied = await asyncio.to_thread(risk_index.refresh)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"위험점수 인덱스를 갱신할 수 없습니다: {e}")
+    return {"applied_rows": applied, **risk_index.stats()}
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
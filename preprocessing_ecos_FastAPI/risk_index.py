@@ -0,0 +1,248 @@
+"""
+휴리스틱 위험점수 조회 인덱스 (GET /risk/{corp_code}, POST /risk)
+risk_scores 테이블(Heuristic/incremental_scoring.py가 갱신)을 (corp_code, year, quarter) 키의 인메모리 인덱스로 유지
+- 응답 본문(점수, 등급, 구성 요소 점수와 기여도)은 적재 시 dict와 JSON 조각으로 한 번 만들어 두고
+  조회는 dict 조회만, 일괄 응답은 JSON 조각을 이어 붙이기만 함 (행별 직렬화 없음)
+- 새 점수 반영: refresh_interval초가 지나면 마지막으로 반영한 updated_at 이후(같은 초 포함) 갱신된 행만 가져와 병합
+  그 초에 이미 반영한 키는 다시 만들지 않고, 새 행이 없으면 인덱스를 복사하지 않음
+  (인덱스 교체는 copy-on-write, 조회 중인 요청은 이전 인덱스를 그대로 사용)
+- 기여도는 행의 weights_version(점수 계산에 쓴 가중치, risk_score_weights 테이블)으로 계산해 합계가 heuristic_score와 같음
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 구성 요소/가중치 정의 (상위 폴더의 Heuristic 디렉토리)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Heuristic'))
+
+logger = logging.getLogger(__name__)
+
+QUARTERS = ['Q1', 'Q2', 'Q3', 'Q4']
+# 새 점수 확인 주기 (초)
+REFRESH_INTERVAL = float(os.getenv('RISK_INDEX_REFRESH_SECONDS', '60'))
+
+RiskKey = Tuple[str, int, str]
+# 본문: (요약 dict, 상세 dict, 요약 JSON, 상세 JSON)
+Payload = Tuple[dict, dict, bytes, bytes]
+
+def period_code(year: int, quarter: str) -> int:
+    return int(year) * 4 + QUARTERS.index(quarter)
+
+def score_definitions() -> Tuple[List[str], Dict[str, float]]:
+    """
+    risk_score의 (COMPONENTS, DEFAULT_WEIGHTS)
+    risk_score는 risk_flags(numba)까지 로드하므로 모듈 import 시가 아니라 첫 인덱스 적재 시 import
+    """
+    from risk_score import COMPONENTS, DEFAULT_WEIGHTS
+    return COMPONENTS, DEFAULT_WEIGHTS
+
+def _nan_to_none(values: np.ndarray) -> list:
+    return np.where(np.isnan(values), None, values).tolist()
+
+class RiskIndexUnavailable(Exception):
+    """risk_scores 테이블을 읽을 수 없음 (DB 연결 실패, 테이블 없음 등)"""
+
+class RiskIndex:
+    """
+    (corp_code, year, quarter) → 응답 본문 인덱스
+    rows: 전체 키별 본문, latest: 기업별 최신 분기 본문
+    본문은 요약(점수/등급)과 상세(구성 요소 점수, 기여도 = 점수 × 가중치 × 10, 합계가 heuristic_score) 두 가지,
+    각각 dict와 직렬화된 JSON 조각으로 보관
+    weights: weights_version이 없거나 risk_score_weights에서 찾을 수 없는 행에 쓸 가중치 (기본 DEFAULT_WEIGHTS)
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, refresh_interval: float = REFRESH_INTERVAL):
+        self._weights = weights
+        self.weight_sets: Dict[str, Dict[str, float]] = {}
+        self.refresh_interval = refresh_interval
+        self.version: Optional[pd.Timestamp] = None
+        # version과 같은 초에 반영한 키 (>= 조회로 다시 오는 행 제외용)
+        self._version_keys: set = set()
+        self.error: Optional[str] = None
+        self.refresh_count = 0
+        self._rows: Dict[RiskKey, Payload] = {}
+        self._latest: Dict[str, Tuple[int, Payload]] = {}
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def weights(self) -> Dict[str, float]:
+        return self._weights or score_definitions()[1]
+
+    @property
+    def ready(self) -> bool:
+        return self._checked_at is not None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def stale(self) -> bool:
+        return self._checked_at is None or time.monotonic() - self._checked_at >= self.refresh_interval
+
+    def build_payloads(self, frame: pd.DataFrame) -> Dict[RiskKey, Payload]:
+        """risk_scores 조회 결과 → 키별 (요약, 상세) 본문 (DECIMAL은 float로, 구성 요소 연산은 행렬 단위)"""
+        columns = score_definitions()[0]
+        components = frame[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+        # 행별 가중치: weights_version별 가중치 행렬에서 행마다 한 줄 (찾을 수 없는 버전은 self.weights)
+        versions = frame['weights_version'] if 'weights_version' in frame.columns else pd.Series(None, index=frame.index)
+        codes, uniques = pd.factorize(versions)
+        table = np.array([[self.weight_sets.get(version, self.weights)[name] for name in columns]
+                          for version in uniques] + [[self.weights[name] for name in columns]])
+        weights = table[codes]  # 결측(-1)은 마지막 줄(self.weights)
+        # 결측(NULL)은 JSON null로 (NaN은 JSON 표준이 아님)
+        contributions = _nan_to_none(np.round(components * weights * 10, 4))
+        components = _nan_to_none(np.round(components, 4))
+        scores = _nan_to_none(pd.to_numeric(frame['heuristic_score'], errors='coerce').round(4).to_numpy())
+
+        payloads = {}
+        for i, (corp_code, corp_name, year, quarter, size, label, label_name) in enumerate(zip(
+                frame['corp_code'].astype(str), frame['corp_name'], frame['year'].astype(int), frame['quarter'],
+                frame['company_size'], frame['heuristic_label'], frame['heuristic_label_name'])):
+            summary = {
+                'corp_code': corp_code,
+                'corp_name': corp_name,
+                'year': year,
+                'quarter': quarter,
+                'score': scores[i],
+                'grade': None if pd.isna(label) else int(label),
+                'grade_name': label_name,
+                'company_size': size,
+            }
+            detail = {
+                **summary,
+                'components': dict(zip(columns, components[i])),
+                'contributions': dict(zip(columns, contributions[i])),
+            }
+            payloads[(corp_code, year, quarter)] = (
+                summary, detail,
+                json.dumps(summary, ensure_ascii=False).encode(), json.dumps(detail, ensure_ascii=False).encode())
+        return payloads
+
+    def apply(self, frame: pd.DataFrame) -> int:
+        """
+        조회된 행을 인덱스에 병합 (같은 키는 교체), 기업별 최신 분기 갱신
+        updated_at이 version과 같고 이미 반영한 키는 제외, 남은 행이 없으면 인덱스를 복사하지 않음
+        """
+        if frame is None or frame.empty:
+            return 0
+        updated = pd.to_datetime(frame['updated_at']).to_numpy()
+        keys = list(zip(frame['corp_code'].astype(str), frame['year'].astype(int), frame['quarter']))
+        if self._version_keys:
+            seen = np.fromiter((key in self._version_keys for key in keys), dtype=bool, count=len(keys))
+            new = ~(seen & (updated == np.datetime64(self.version)))
+            if not new.all():
+                frame, updated = frame[new], updated[new]
+                keys = [key for key, keep in zip(keys, new) if keep]
+        if frame.empty:
+            return 0
+        payloads = self.build_payloads(frame)
+        rows = dict(self._rows)
+        rows.update(payloads)
+        latest = dict(self._latest)
+        for (corp_code, year, quarter), payload in payloads.items():
+            period = period_code(year, quarter)
+            if corp_code not in latest or period >= latest[corp_code][0]:
+                latest[corp_code] = (period, payload)
+        self._rows, self._latest = rows, latest
+        newest = updated.max()
+        at_newest = {key for key, at in zip(keys, updated == newest) if at}
+        if self.version is None or newest > np.datetime64(self.version):
+            self.version, self._version_keys = pd.Timestamp(newest), at_newest
+        elif newest == np.datetime64(self.version):
+            self._version_keys |= at_newest
+        return len(payloads)
+
+    def refresh(self, db=None, blocking: bool = True) -> int:
+        """
+        마지막 반영 이후 갱신된 risk_scores 행을 병합, 반영한 행 수 반환
+        blocking=False면 다른 스레드가 갱신 중일 때 바로 반환 (요청 경로의 백그라운드 갱신용)
+        """
+        if not self._lock.acquire(blocking=blocking):
+            return 0
+        try:
+            own_connection = db is None
+            if own_connection:
+                from db_query import DatabaseConnection
+                db = DatabaseConnection()
+                if not db.connect():
+                    raise RiskIndexUnavailable("데이터베이스 연결에 실패했습니다.")
+            try:
+                # 가중치 테이블이 없는 기존 DB면 None → 이전 값 유지 (행은 self.weights로 계산)
+                weight_sets = db.get_risk_score_weights()
+                if weight_sets is not None:
+                    self.weight_sets = weight_sets
+                # since와 같은 초에 나중에 커밋된 행까지 포함 (get_risk_scores는 >=, 이미 반영한 키는 apply에서 제외)
+                frame = db.get_risk_scores(since=self.version)
+            finally:
+                if own_connection:
+                    db.disconnect()
+            if frame is None:
+                raise RiskIndexUnavailable("risk_scores 테이블을 조회할 수 없습니다.")
+            applied = self.apply(frame)
+            self._checked_at = time.monotonic()
+            self.refresh_count += 1
+            self.error = None
+            if applied:
+                logger.info(f"위험점수 인덱스 갱신: {applied}행 반영 (전체 {len(self._rows)}행, 버전 {self.version})")
+            return applied
+        except Exception as e:
+            self.error = str(e)
+            raise
+        finally:
+            self._lock.release()
+
+    def get(self, corp_code: str, year: Optional[int] = None, quarter: Optional[str] = None,
+            detail: bool = True) -> Optional[dict]:
+        """기업의 특정 분기(year, quarter 모두 지정 시) 또는 최신 분기 본문"""
+        if year is not None and quarter is not None:
+            payload = self._rows.get((corp_code, int(year), quarter))
+        else:
+            entry = self._latest.get(corp_code)
+            payload = None if entry is None else entry[1]
+        return None if payload is None else payload[1 if detail else 0]
+
+    def lookup(self, keys: Iterable[Tuple[str, Optional[int], Optional[str]]], detail: bool = True,
+               raw: bool = False) -> Tuple[list, List[dict]]:
+        """여러 키 조회 → (본문 목록, 찾지 못한 키 목록), raw=True면 본문 대신 JSON 조각(bytes)"""
+        rows, latest = self._rows, self._latest
+        column = (1 if detail else 0) + (2 if raw else 0)
+        results, missing = [], []
+        for corp_code, year, quarter in keys:
+            if year is not None and quarter is not None:
+                payload = rows.get((corp_code, int(year), quarter))
+            else:
+                entry = latest.get(corp_code)
+                payload = None if entry is None else entry[1]
+            if payload is None:
+                missing.append({'corp_code': corp_code, 'year': year, 'quarter': quarter})
+            else:
+                results.append(payload[column])
+        return results, missing
+
+    def corp_codes(self) -> List[str]:
+        """인덱스에 있는 전체 기업 코드"""
+        return sorted(self._latest)
+
+    def stats(self) -> dict:
+        return {
+            'ready': self.ready,
+            'rows': len(self._rows),
+            'companies': len(self._latest),
+            'version': None if self.version is None else str(self.version),
+            'refresh_count': self.refresh_count,
+            'refresh_interval': self.refresh_interval,
+            'error': self.error,
+        }
+
+# 프로세스 공유 인덱스
+risk_index = RiskIndex()
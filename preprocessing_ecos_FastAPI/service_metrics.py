@@ -0,0 +1,210 @@
+"""
+전처리 서비스 계측 모듈
+/preprocess 단계별 소요시간·행 수·최대 메모리·DB 왕복 횟수와 엔드포인트별 지연시간 히스토그램을 수집하고
+Prometheus 텍스트 형식으로 노출
+"""
+
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+
+# 요청 지연시간 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 단계별 메모리 추적 여부 (tracemalloc은 프로세스 전체 할당마다 비용이 있으므로 기본은 끔, 진단할 때만 1)
+TRACE_MEMORY = os.getenv('METRICS_TRACE_MEMORY', '0') == '1'
+
+# tracemalloc은 프로세스 전역이므로 추적을 시작한 실행 수를 세어 마지막 실행이 끝날 때만 중지
+_tracing_lock = threading.Lock()
+_tracing_runs = 0
+
+class Histogram:
+    """누적 버킷 히스토그램 (Prometheus histogram 의미론)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+@dataclass
+class StageMetrics:
+    """전처리 단계 하나의 측정값"""
+    stage: str
+    duration_seconds: float = 0.0
+    rows: Optional[int] = None
+    peak_memory_bytes: Optional[int] = None
+    db_round_trips: int = 0
+
+class MetricsRegistry:
+    """프로세스 단위 메트릭 저장소 (uvicorn 워커마다 별도로 존재)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_latency: Dict[Tuple[str, str], Histogram] = {}
+        self.request_count: Dict[Tuple[str, str, str], int] = {}
+        self.stage_latency: Dict[str, Histogram] = {}
+        self.last_stages: Dict[str, StageMetrics] = {}
+        self.run_count: Dict[str, int] = {}
+
+    def observe_request(self, method: str, path: str, status: int, seconds: float):
+        with self._lock:
+            self.request_latency.setdefault((method, path), Histogram()).observe(seconds)
+            key = (method, path, str(status))
+            self.request_count[key] = self.request_count.get(key, 0) + 1
+
+    def record_stage(self, stage: StageMetrics):
+        with self._lock:
+            self.stage_latency.setdefault(stage.stage, Histogram()).observe(stage.duration_seconds)
+            self.last_stages[stage.stage] = stage
+
+    def record_run(self, success: bool):
+        with self._lock:
+            result = 'success' if success else 'failure'
+            self.run_count[result] = self.run_count.get(result, 0) + 1
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        lines: List[str] = []
+        with self._lock:
+            lines += [
+                '# HELP http_request_duration_seconds 엔드포인트별 요청 처리 시간',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for (method, path), hist in sorted(self.request_latency.items()):
+                lines += _histogram_lines('http_request_duration_seconds', hist,
+                                          {'method': method, 'path': path})
+
+            lines += [
+                '# HELP http_requests_total 엔드포인트/상태코드별 요청 수',
+                '# TYPE http_requests_total counter',
+            ]
+            for (method, path, status), count in sorted(self.request_count.items()):
+                lines.append(f'http_requests_total{_labels({"method": method, "path": path, "status": status})} {count}')
+
+            lines += [
+                '# HELP preprocess_stage_duration_seconds 전처리 단계별 소요 시간',
+                '# TYPE preprocess_stage_duration_seconds histogram',
+            ]
+            for stage, hist in sorted(self.stage_latency.items()):
+                lines += _histogram_lines('preprocess_stage_duration_seconds', hist, {'stage': stage})
+
+            gauges = [
+                ('preprocess_stage_last_duration_seconds', '마지막 실행의 단계별 소요 시간', 'duration_seconds'),
+                ('preprocess_stage_last_rows', '마지막 실행의 단계별 출력 행 수', 'rows'),
+                ('preprocess_stage_last_peak_memory_bytes', '마지막 실행의 단계별 최대 추가 메모리', 'peak_memory_bytes'),
+                ('preprocess_stage_last_db_round_trips', '마지막 실행의 단계별 DB 왕복 횟수', 'db_round_trips'),
+            ]
+            for name, help_text, attr in gauges:
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+                for stage, metrics in sorted(self.last_stages.items()):
+                    value = getattr(metrics, attr)
+                    if value is not None:
+                        lines.append(f'{name}{_labels({"stage": stage})} {value}')
+
+            lines += [
+                '# HELP preprocess_runs_total /preprocess 실행 결과별 횟수',
+                '# TYPE preprocess_runs_total counter',
+            ]
+            for result, count in sorted(self.run_count.items()):
+                lines.append(f'preprocess_runs_total{_labels({"result": result})} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+def _labels(labels: Dict[str, str]) -> str:
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+def _histogram_lines(name: str, hist: Histogram, labels: Dict[str, str]) -> List[str]:
+    lines = []
+    for upper, count in zip(hist.buckets, hist.counts):
+        lines.append(f'{name}_bucket{_labels({**labels, "le": repr(upper)})} {count}')
+    lines.append(f'{name}_bucket{_labels({**labels, "le": "+Inf"})} {hist.count}')
+    lines.append(f'{name}_sum{_labels(labels)} {hist.total}')
+    lines.append(f'{name}_count{_labels(labels)} {hist.count}')
+    return lines
+
+def _acquire_tracing() -> bool:
+    """실행 시작 시 추적 참여 (이미 외부에서 켠 추적은 건드리지 않음), 반환: 종료 시 _release_tracing 필요 여부"""
+    global _tracing_runs
+    with _tracing_lock:
+        if _tracing_runs == 0:
+            if tracemalloc.is_tracing():
+                return False
+            tracemalloc.start()
+        _tracing_runs += 1
+        return True
+
+def _release_tracing():
+    global _tracing_runs
+    with _tracing_lock:
+        _tracing_runs -= 1
+        if _tracing_runs == 0:
+            tracemalloc.stop()
+
+class PipelineRun:
+    """
+    /preprocess 한 번의 실행 계측
+    stage() 블록마다 StageMetrics를 만들고 종료 시 레지스트리에 기록
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.stages: List[StageMetrics] = []
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self._started_tracing = TRACE_MEMORY and _acquire_tracing()
+
+    @contextmanager
+    def stage(self, name: str, db=None):
+        """
+        단계 측정 (블록 안에서 metrics.rows를 설정)
+        최대 메모리는 프로세스 전역 값이므로 동시에 실행 중인 다른 요청의 할당이 섞일 수 있음
+        """
+        metrics = StageMetrics(stage=name)
+        trips_before = getattr(db, 'round_trips', 0)
+        mem_before = None
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            mem_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            metrics.duration_seconds = round(time.perf_counter() - start, 6)
+            metrics.db_round_trips = getattr(db, 'round_trips', 0) - trips_before
+            if mem_before is not None and tracemalloc.is_tracing():
+                metrics.peak_memory_bytes = max(0, tracemalloc.get_traced_memory()[1] - mem_before)
+            self.stages.append(metrics)
+            self.registry.record_stage(metrics)
+
+    def finish(self, success: bool):
+        if self.finished_at is not None:
+            return
+        self.finished_at = time.perf_counter()
+        if self._started_tracing:
+            _release_tracing()
+        self.registry.record_run(success)
+
+    def summary(self) -> Dict:
+        """응답 본문용 요약"""
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return {
+            'total_duration_seconds': round(end - self.started_at, 6),
+            'stages': {stage.stage: {k: v for k, v in asdict(stage).items() if k != 'stage'}
+                       for stage in self.stages},
+        }
@@ -50,6 +50,10 @@ def test_api_endpoints():
             print(f"  처리된 행 수: {result.get('processed_rows')}")
             print(f"  피쳐 개수: {result.get('feature_count')}")
             print(f"  날짜 범위: {result.get('date_range')}")
+            stages = (result.get('metrics') or {}).get('stages', {})
+            for stage, stage_metrics in stages.items():
+                print(f"  {stage}: {stage_metrics.get('duration_seconds')}s, "
+                      f"DB 왕복 {stage_metrics.get('db_round_trips')}회")
         else:
             print(f"✗ 전처리 실패: {response.status_code}")
             try:
@@ -93,6 +97,61 @@ def test_api_endpoints():
     except Exception as e:
         print(f"✗ 데이터 미리보기 오류: {e}")
     
+    # 6. 대량 내보내기 (CSV)
+    print("\n6. 피쳐 대량 내보내기 (CSV)")
+    try:
+        response = requests.get(f"{BASE_URL}/data/export", params={"format": "csv"}, stream=True)
+        if response.status_code == 200:
+            lines = response.text.strip().splitlines()
+            print("✓ 대량 내보내기 성공")
+            print(f"  컬럼 수: {len(lines[0].split(','))}")
+            print(f"  데이터 행 수: {len(lines) - 1}")
+        else:
+            print(f"✗ 대량 내보내기 실패: {response.status_code}")
+    except Exception as e:
+        print(f"✗ 대량 내보내기 오류: {e}")
+    
+    # 7. 메트릭
+    print("\n7. 메트릭 조회")
+    try:
+        response = requests.get(f"{BASE_URL}/metrics")
+        if response.status_code == 200:
+            samples = [line for line in response.text.splitlines() if line and not line.startswith('#')]
+            print("✓ 메트릭 조회 성공")
+            print(f"  샘플 수: {len(samples)}")
+        else:
+            print(f"✗ 메트릭 조회 실패: {response.status_code}")
+    except Exception as e:
+        print(f"✗ 메트릭 조회 오류: {e}")
+    
+    # 8. 준비 상태
+    print("\n8. 준비 상태 확인")
+    try:
+        response = requests.get(f"{BASE_URL}/ready")
+        result = response.json()
+        if response.status_code == 200:
+            print("✓ 워밍업 완료")
+        else:
+            print(f"✗ 준비 안 됨: {response.status_code} (오류: {result.get('error')})")
+        print(f"  기동 모드: {result.get('mode')}, 단계: {result.get('steps')}")
+    except Exception as e:
+        print(f"✗ 준비 상태 확인 오류: {e}")
+    
+    # 9. LSTM 예측
+    print("\n9. LSTM 예측")
+    try:
+        response = requests.get(f"{BASE_URL}/predict")
+        if response.status_code == 200:
+            result = response.json()
+            print("✓ 예측 성공")
+            print(f"  기준월: {result.get('as_of')} → 예측월: {result.get('forecast_date')} (모델 v{result.get('model_version')})")
+            print(f"  예측값: {result.get('predicted_level')}")
+            print(f"  지연시간: {result.get('latency_ms')}ms (캐시: {result.get('cached')})")
+        else:
+            print(f"✗ 예측 실패: {response.status_code} - {response.text}")
+    except Exception as e:
+        print(f"✗ 예측 오류: {e}")
+    
     print("\n" + "=" * 60)
     print("API 테스트 완료")
     print("=" * 60)